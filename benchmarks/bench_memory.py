@@ -0,0 +1,96 @@
+# benchmarks/bench_memory.py
+"""
+Reports bytes per job and per node, comparing the original dict-based layout
+with the slotted, fixed-width one.
+
+Run from the repository root:
+    python benchmarks/bench_memory.py [--count 200000]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cluster_table import Cluster
+from src.tutorial_manager import Job, JobStatus, JobType, Node
+
+
+class DictJob:
+    """The original Job layout: a per-instance __dict__ and a requirements dict."""
+
+    def __init__(self, number, job_type, requirements, deadline, pytorch_version=None):
+        self.id = f"job-{number}"
+        self.type = job_type
+        self.requirements = requirements
+        self.deadline = deadline
+        self.pytorch_version = pytorch_version
+        self.status = JobStatus.PENDING
+        self.assigned_node = None
+        self.progress = 0
+        self.error_message = None
+        self.submission_time = None
+        self.completion_time = None
+
+
+class DictNode:
+    """The original Node layout: two resource dicts and a running-jobs list."""
+
+    def __init__(self, name, cpu, gpu, ram, pytorch_version, unmanaged=False):
+        self.id = name
+        self.resources = {"cpu": cpu, "gpu": gpu, "ram": ram}
+        self.available_resources = {"cpu": cpu, "gpu": gpu, "ram": ram}
+        self.pytorch_version = pytorch_version
+        self.running_jobs = []
+        self.unmanaged = unmanaged
+
+
+def measure(build, count: int) -> float:
+    """Bytes allocated per object while building `count` objects."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    keep = build(count)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del keep
+    return allocated / count
+
+
+def dict_jobs(count):
+    return [DictJob(i, JobType.INFERENCE, {"cpu": 1, "gpu": 0, "ram": 8}, 50, "2.0") for i in range(count)]
+
+
+def slotted_jobs(count):
+    return [Job(JobType.INFERENCE, {"cpu": 1, "gpu": 0, "ram": 8}, 50, "2.0") for _ in range(count)]
+
+
+def dict_nodes(count):
+    return {f"node-{i}": DictNode(f"node-{i}", 8, 2, 64, "2.0") for i in range(count)}
+
+
+def table_nodes(count):
+    cluster = Cluster()
+    for i in range(count):
+        node = Node.in_table(cluster.table, f"node-{i}", 8, 2, 64, "2.0")
+        cluster[node.id] = node
+    return cluster
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=200_000, help="Objects to build per measurement")
+    args = parser.parse_args()
+
+    rows = [
+        ("job", measure(dict_jobs, args.count), measure(slotted_jobs, args.count)),
+        ("node", measure(dict_nodes, args.count), measure(table_nodes, args.count)),
+    ]
+    print(f"{'object':>8} {'before (B)':>12} {'after (B)':>12} {'saved':>8}")
+    for name, before, after in rows:
+        print(f"{name:>8} {before:>12.0f} {after:>12.0f} {1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/bench_startup.py
+"""
+Compares tutorial catalog startup time: the original eager loader, which
+executes every tutorial module, against the lazy catalog, which only reads
+metadata until a tutorial is started, with and without its on-disk cache.
+
+The catalog is the repository's own tutorials copied --copies times with
+renamed ids, to stand in for a catalog of hundreds of files.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [--copies 20] [--repeat 5]
+"""
+import argparse
+import importlib.util
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tutorial_catalog import load_catalog
+
+SOURCE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'tutorials'))
+TUTORIAL_ID = re.compile(r'^(\s{4})"(\w+)": \{', re.MULTILINE)
+CATEGORY = re.compile(r'^TUTORIAL_CATEGORY = "(.*)"', re.MULTILINE)
+
+
+def eager_load(tutorial_dir: str):
+    """The original `_load_tutorials`: executes every module up front."""
+    tutorials = {}
+    for filename in os.listdir(tutorial_dir):
+        if filename.endswith(".py") and not filename.startswith("__"):
+            module_name = filename[:-3]
+            file_path = os.path.join(tutorial_dir, filename)
+            spec = importlib.util.spec_from_file_location(module_name, file_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            if hasattr(module, 'TUTORIAL_CATEGORY') and hasattr(module, 'TUTORIALS'):
+                category = tutorials.setdefault(module.TUTORIAL_CATEGORY, {})
+                for tutorial_id, tutorial_info in module.TUTORIALS.items():
+                    tutorial_entry = tutorial_info.copy()
+                    tutorial_entry["module"] = module
+                    category[tutorial_id] = tutorial_entry
+    return tutorials
+
+
+def build_catalog(directory: str, copies: int) -> int:
+    """Copies every repository tutorial file `copies` times; returns the file count."""
+    sources = [f for f in os.listdir(SOURCE_DIR) if f.endswith(".py") and not f.startswith("__")]
+    for copy in range(copies):
+        for filename in sources:
+            with open(os.path.join(SOURCE_DIR, filename), encoding="utf-8") as f:
+                text = f.read()
+            text = TUTORIAL_ID.sub(lambda m: f'{m.group(1)}"{m.group(2)}_{copy}": {{', text)
+            text = CATEGORY.sub(lambda m: f'TUTORIAL_CATEGORY = "{m.group(1)} #{copy}"', text)
+            with open(os.path.join(directory, f"{filename[:-3]}_{copy}.py"), "w", encoding="utf-8") as f:
+                f.write(text)
+    return len(sources) * copies
+
+
+def best_of(repeat: int, function, *args) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def first_entry(catalog):
+    return next(iter(next(iter(catalog.values())).values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--copies", type=int, default=20, help="Copies of the repository's tutorial files")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per loader; the fastest is kept")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench-startup-")
+    try:
+        files = build_catalog(directory, args.copies)
+        # Without a bytecode cache every eager load compiles each module, as on a first run.
+        sys.dont_write_bytecode = True
+        eager_cold = best_of(args.repeat, eager_load, directory)
+        sys.dont_write_bytecode = False
+        eager_load(directory)
+        eager = best_of(args.repeat, eager_load, directory)
+        lazy = best_of(args.repeat, lambda: load_catalog(directory, use_cache=False))
+        cache_dir = os.path.join(directory, ".cache")
+        load_catalog(directory, cache_dir)
+        cached = best_of(args.repeat, load_catalog, directory, cache_dir)
+        entry = first_entry(load_catalog(directory, use_cache=False))
+        first_start = best_of(1, lambda: entry["steps"])
+        first_entry(load_catalog(directory, cache_dir))["steps"]  # Caches the module's code
+        catalog = load_catalog(directory, cache_dir)
+        entry = first_entry(catalog)
+        first_start_cached = best_of(1, lambda: entry["steps"])
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    tutorials = sum(len(category) for category in catalog.values())
+    print(f"{files} files, {tutorials} tutorials")
+    print(f"{'eager load, no .pyc':<28} {eager_cold * 1e3:>10.1f} ms")
+    print(f"{'eager load, cached .pyc':<28} {eager * 1e3:>10.1f} ms")
+    print(f"{'lazy metadata load':<28} {lazy * 1e3:>10.1f} ms  ({eager_cold / lazy:.1f}x / {eager / lazy:.1f}x vs eager)")
+    print(f"{'lazy load, warm cache':<28} {cached * 1e3:>10.1f} ms  ({eager_cold / cached:.1f}x / {eager / cached:.1f}x vs eager)")
+    print(f"{'first steps access (1 file)':<28} {first_start * 1e3:>10.1f} ms")
+    print(f"{'  with cached code':<28} {first_start_cached * 1e3:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
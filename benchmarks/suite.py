@@ -0,0 +1,411 @@
+# benchmarks/suite.py
+"""
+Scaling benchmarks for the simulator's hot paths, with regression checks.
+
+Each benchmark builds a state of a given size (10, 100, ... up to --max) and
+times a batch of operations against it, reporting nanoseconds per operation.
+Results are saved as JSON; --compare checks them against a stored baseline
+and exits non-zero if any benchmark slowed down by more than --threshold.
+
+Run from the repository root:
+    python benchmarks/suite.py [--max 1000000] [--only get_job,submit_job] [--output results.json]
+    python benchmarks/suite.py --compare baseline.json [--threshold 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.commands import get_command_handlers
+from src.commands.base_command import CommandExecutor
+from src.terraform_state import TerraformState
+from src.tutorial_manager import Job, JobType, Node, TutorialManager
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BATCH = 1_000  # operations timed per run for the per-call benchmarks
+
+# A benchmark takes (manager, size) and returns (run, operations): `run` is timed
+# once per repeat and performs `operations` operations against a state of `size`.
+Benchmark = Callable[[TutorialManager, int], Tuple[Callable[[], object], int]]
+BENCHMARKS: Dict[str, Tuple[Benchmark, int, int]] = {}
+
+
+def benchmark(name: str, max_size: int = 1_000_000, min_size: int = 10):
+    """Registers a benchmark. Sizes outside `min_size`..`max_size` are skipped for it."""
+    def register(setup: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = (setup, max_size, min_size)
+        return setup
+    return register
+
+
+def fill_jobs(manager: TutorialManager, count: int):
+    """A large node and `count` pending jobs, without any clock events."""
+    manager.setup_tutorial_state(jobs=0, nodes=0)
+    node = Node.in_table(manager.cluster.table, "bench-node", 10**9, 10**9, 10**9, "2.0")
+    manager.cluster[node.id] = node
+    ids = []
+    for _ in range(count):
+        job = Job(JobType.INFERENCE, {"cpu": 1, "gpu": 0, "ram": 1}, manager.time + 50)
+        manager.jobs.add(job)
+        ids.append(job.id)
+    return node, ids
+
+
+def terraform_config(count: int) -> str:
+    return f'''
+resource "cluster_node" "bench" {{
+  count = {count}
+  cpu = 8
+  gpu = 2
+  ram = 64
+  pytorch_version = "2.0"
+}}
+'''
+
+
+def terraform_blocks(count: int) -> str:
+    """A config of `count` separate, named cluster_node resources."""
+    return "".join(
+        f'resource "cluster_node" "n{i}" {{\n  cpu = 8\n  gpu = 2\n  ram = 64\n  pytorch_version = "2.0"\n}}\n'
+        for i in range(count)
+    )
+
+
+@benchmark("get_job")
+def bench_get_job(manager: TutorialManager, size: int):
+    _, ids = fill_jobs(manager, size)
+    sample = [ids[i] for i in np.random.default_rng(0).integers(0, size, BATCH)]
+
+    def run():
+        for job_id in sample:
+            manager.get_job(job_id)
+    return run, len(sample)
+
+
+@benchmark("submit_job", min_size=BATCH)
+def bench_submit_job(manager: TutorialManager, size: int):
+    """Submits BATCH of `size` pending jobs; smaller sizes would time too few submissions to compare."""
+    node, ids = fill_jobs(manager, size)
+    batch = ids[:BATCH]
+
+    def run():
+        for job_id in batch:
+            manager.submit_job(job_id, node.id)
+    return run, len(batch)
+
+
+@benchmark("terraform_apply")
+def bench_terraform_apply(manager: TutorialManager, size: int):
+    manager.setup_tutorial_state(jobs=0, nodes=0)
+    manager.set_terraform_config(terraform_config(size))
+    return manager.terraform_apply, size
+
+
+@benchmark("terraform_reapply")
+def bench_terraform_reapply(manager: TutorialManager, size: int):
+    """`terraform apply` of a config that is already applied: a diff that finds nothing to do."""
+    manager.setup_tutorial_state(jobs=0, nodes=0)
+    manager.set_terraform_config(terraform_config(size))
+    manager.terraform_apply()
+    return manager.terraform_apply, size
+
+
+@benchmark("terraform_plan", max_size=100_000)
+def bench_terraform_plan(manager: TutorialManager, size: int):
+    """`terraform plan` over `size` resource blocks; the config is already parsed."""
+    manager.setup_tutorial_state(jobs=0, nodes=0)
+    manager.set_terraform_config(terraform_blocks(size))
+    manager.terraform_plan()
+    return manager.terraform_plan, size
+
+
+@benchmark("terraform_show")
+def bench_terraform_show(manager: TutorialManager, size: int):
+    manager.setup_tutorial_state(jobs=0, nodes=0)
+    manager.set_terraform_config(terraform_config(size))
+    manager.terraform_apply()
+    return lambda: sum(1 for _ in manager.terraform_show()), size
+
+
+@benchmark("terraform_show_json")
+def bench_terraform_show_json(manager: TutorialManager, size: int):
+    manager.setup_tutorial_state(jobs=0, nodes=0)
+    manager.set_terraform_config(terraform_config(size))
+    manager.terraform_apply()
+    return lambda: sum(1 for _ in manager.terraform_show(json_output=True)), size
+
+
+@benchmark("terraform_state_list")
+def bench_terraform_state_list(manager: TutorialManager, size: int):
+    """`terraform state list` with a glob that every node matches."""
+    manager.setup_tutorial_state(jobs=0, nodes=0)
+    manager.set_terraform_config(terraform_config(size))
+    manager.terraform_apply()
+    return lambda: sum(1 for _ in manager.terraform_state_list("bench-*")), size
+
+
+@benchmark("setup_tutorial_state")
+def bench_setup_tutorial_state(manager: TutorialManager, size: int):
+    return lambda: manager.setup_tutorial_state(jobs=size, nodes=size), size
+
+
+@benchmark("snapshot_restore")
+def bench_snapshot_restore(manager: TutorialManager, size: int):
+    """Restores a snapshot of `size` nodes and `size` pending jobs."""
+    manager.setup_tutorial_state(jobs=size, nodes=size)
+    snapshot = manager.snapshot()
+    return lambda: manager.restore(snapshot), size
+
+
+def write_tutorial_catalog(directory: str, size: int, files: int) -> str:
+    """Writes `size` three-step tutorials spread over `files` modules; returns the tutorial dir."""
+    tutorial_dir = os.path.join(directory, "src", "tutorials")
+    os.makedirs(tutorial_dir)
+    for f in range(files):
+        with open(os.path.join(tutorial_dir, f"bench_{f}.py"), "w") as module:
+            module.write(f'from src.tutorial_manager import JobType\n\nTUTORIAL_CATEGORY = "Bench {f}"\nTUTORIALS = {{\n')
+            for t in range(f, size, files):
+                module.write(
+                    f'    "bench_{t}": {{"name": "Bench {t}", "description": "d", "skills_learned": ["s"], "steps": [\n'
+                    '        {"text": "a", "expected_command": "status"},\n'
+                    '        {"text": "b", "expected_command": "next", "trigger": lambda game: None},\n'
+                    '        {"text": "c", "type": "mcq", "answers": ["a) x"], "correct_answer": "a"},\n'
+                    '    ]},\n'
+                )
+            module.write('}\n')
+    return tutorial_dir
+
+
+@benchmark("load_tutorials", max_size=100_000)
+def bench_load_tutorials(manager: TutorialManager, size: int):
+    """Loads a synthetic tutorial directory holding `size` tutorials of three steps each.
+
+    The catalog cache lives in the work directory, so runs after the first measure a warm start.
+    """
+    workdir = tempfile.mkdtemp(prefix="bench-tutorials-")
+    write_tutorial_catalog(workdir, size, max(1, min(size // 100, 100)))
+
+    def run():
+        previous = os.getcwd(), os.environ.get("AI_OPS_SIMULATOR_CACHE")
+        os.chdir(workdir)
+        os.environ["AI_OPS_SIMULATOR_CACHE"] = os.path.join(workdir, "cache")
+        try:
+            manager._load_tutorials()
+        finally:
+            os.chdir(previous[0])
+            if previous[1] is None:
+                del os.environ["AI_OPS_SIMULATOR_CACHE"]
+            else:
+                os.environ["AI_OPS_SIMULATOR_CACHE"] = previous[1]
+    run.cleanup = lambda: shutil.rmtree(workdir, ignore_errors=True)
+    return run, size
+
+
+@benchmark("tfstate_attach", max_size=100_000)
+def bench_tfstate_attach(manager: TutorialManager, size: int):
+    """Opens a terraform.tfstate of `size` nodes and adds them to an empty cluster."""
+    workdir = tempfile.mkdtemp(prefix="bench-tfstate-")
+    path = os.path.join(workdir, "terraform.tfstate")
+    state = TerraformState(path)
+    state.resources = {f"node-{i}": (8, 2, 64, "2.0") for i in range(size)}
+    state.compact()
+
+    def run():
+        manager.attach_terraform_state(path)
+    run.cleanup = lambda: shutil.rmtree(workdir, ignore_errors=True)
+    return run, size
+
+
+@benchmark("tfstate_commit", max_size=100_000)
+def bench_tfstate_commit(manager: TutorialManager, size: int):
+    """Journaled `terraform destroy` against an attached state of `size` nodes, compactions included."""
+    workdir = tempfile.mkdtemp(prefix="bench-tfstate-")
+    manager.set_terraform_config(terraform_config(size))
+    manager.attach_terraform_state(os.path.join(workdir, "terraform.tfstate"))
+    manager.terraform_apply()
+    batch = [f"bench-{i}" for i in range(min(size, 100))]
+
+    def run():
+        for node_id in batch:
+            manager.terraform_destroy(node_id)
+    run.cleanup = lambda: shutil.rmtree(workdir, ignore_errors=True)
+    return run, len(batch)
+
+
+@benchmark("find_tutorial", max_size=100_000)
+def bench_find_tutorial(manager: TutorialManager, size: int):
+    """Tutorial lookup and completion checks with `size` tutorials in 100-tutorial categories, all completed."""
+    manager.tutorials = {
+        f"Category {c}": {f"t_{t}": {"name": f"T {t}", "steps": []} for t in range(c, size, max(1, size // 100))}
+        for c in range(max(1, size // 100))
+    }
+    manager._index_tutorials()
+    for tutorial_id in manager.tutorial_index:
+        manager._completed_ids.add(tutorial_id)
+        manager.completed_tutorials.append(tutorial_id)
+    ids = [f"t_{i % size}" for i in range(BATCH)]
+
+    def run():
+        for tutorial_id in ids:
+            manager.find_tutorial(tutorial_id)
+            manager.is_tutorial_completed(tutorial_id)
+    return run, len(ids)
+
+
+@benchmark("command_execute", min_size=BATCH)
+def bench_command_execute(manager: TutorialManager, size: int):
+    """`job submit <id>` through the full command dispatcher, BATCH times with `size` pending jobs."""
+    _, ids = fill_jobs(manager, size)
+    executor = CommandExecutor(manager)
+    executor.set_command_handlers(get_command_handlers(manager, executor))
+    commands = [f"job submit {job_id}" for job_id in ids[:BATCH]]
+
+    def run():
+        for command in commands:
+            executor.execute(command)
+    return run, len(commands)
+
+
+@benchmark("metrics_render", max_size=100_000)
+def bench_metrics_render(manager: TutorialManager, size: int):
+    """Renders /metrics for a cluster of `size` nodes, per node."""
+    manager.setup_tutorial_state(jobs=size, nodes=size)
+    return manager.metrics.render, size
+
+
+@benchmark("tsdb_scrape", max_size=1_000)
+def bench_tsdb_scrape(manager: TutorialManager, size: int):
+    """Scrapes `size` busy nodes (3 series each) and their running jobs, per scrape."""
+    manager.setup_tutorial_state(jobs=size, nodes=size)
+    manager.schedule_all()
+    scrapes = 100
+    return lambda: manager.tick(manager.tsdb.step * scrapes), scrapes
+
+
+@benchmark("tsdb_query", max_size=1_000)
+def bench_tsdb_query(manager: TutorialManager, size: int):
+    """`avg by (resource) (avg_over_time(...[1h]))` over 6 hours at 1-minute steps, per series read."""
+    manager.setup_tutorial_state(nodes=size)
+    manager.tick(6 * 3600)
+    query = "avg by (resource) (avg_over_time(ai_ops_node_utilization[1h]))"
+    return lambda: list(manager.query_metrics(query, duration=5 * 3600, step=60)), 3 * size
+
+
+def silence_consoles():
+    """Keeps command output out of the timings and the report."""
+    for name, module in list(sys.modules.items()):
+        console = getattr(module, "console", None) if name.startswith("src.") else None
+        if console is not None and hasattr(console, "quiet"):
+            console.quiet = True
+
+
+def measure(name: str, size: int, repeat: int) -> float:
+    """Best nanoseconds per operation over `repeat` freshly built states."""
+    setup = BENCHMARKS[name][0]
+    best = None
+    for _ in range(repeat):
+        manager = TutorialManager()
+        run, operations = setup(manager, size)
+        try:
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+        finally:
+            getattr(run, "cleanup", lambda: None)()
+        per_op = elapsed * 1e9 / max(operations, 1)
+        best = per_op if best is None else min(best, per_op)
+    return best
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> int:
+    """Prints the change against a baseline and returns how many results regressed."""
+    regressions = 0
+    print(f"\n{'benchmark':<22} {'size':>9} {'baseline ns':>13} {'now ns':>13} {'change':>8}")
+    for name, sizes in results.items():
+        for size, value in sizes.items():
+            old = baseline.get(name, {}).get(size)
+            if old is None:
+                continue
+            change = value / old - 1.0 if old > 0 else 0.0
+            flag = ""
+            if change > threshold:
+                regressions += 1
+                flag = "  REGRESSION"
+            print(f"{name:<22} {size:>9} {old:>13.0f} {value:>13.0f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max", type=int, default=1_000_000, help="Largest size to measure")
+    parser.add_argument("--min", type=int, default=10, help="Smallest size to measure")
+    parser.add_argument("--only", help="Comma-separated benchmark names (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the fastest is kept")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before flagging (0.25 = 25%%)")
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    # _load_tutorials reads src/tutorials relative to the working directory.
+    os.chdir(REPO_ROOT)
+    silence_consoles()
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'benchmark':<22} {'size':>9} {'ns/op':>13}")
+    for name in names:
+        results[name] = {}
+        _, max_size, min_size = BENCHMARKS[name]
+        size = args.min
+        while size <= min(args.max, max_size):
+            if size < min_size:
+                size *= 10
+                continue
+            value = measure(name, size, args.repeat)
+            results[name][str(size)] = value
+            print(f"{name:<22} {size:>9} {value:>13.0f}", flush=True)
+            size *= 10
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{regressions} result(s) regressed by more than {args.threshold:.0%}.")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
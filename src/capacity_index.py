@@ -0,0 +1,183 @@
+# src/capacity_index.py
+"""
+Sorted index of nodes by free capacity, for best-fit placement.
+
+Nodes are grouped into buckets per PyTorch version code, keyed by their free
+(gpu, ram, cpu). Each version keeps its distinct free capacities as nested
+sorted levels: the GPU values, the RAM values seen at each GPU value, and the
+CPU values seen at each (gpu, ram). The last entry of a level is its maximum,
+so a lookup skips a whole GPU level that is short on RAM, or a RAM level that
+is short on CPU, without looking inside it, and bisects for the CPU value.
+
+A lookup costs O(G + R log C) for G GPU levels and R RAM levels at the GPU
+levels it visits, and an update bisects and inserts into one level of each
+kind. Free capacities are small integers, so the levels stay short compared
+to the number of nodes or of distinct (gpu, ram, cpu) keys.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Key = Tuple[int, int, int]  # free (gpu, ram, cpu)
+
+
+class _Levels:
+    """The distinct free capacities of one version's nodes, as nested sorted lists."""
+
+    __slots__ = ("gpus", "rams", "cpus")
+
+    def __init__(self):
+        self.gpus: List[int] = []
+        self.rams: Dict[int, List[int]] = {}  # gpu -> sorted ram values
+        self.cpus: Dict[Tuple[int, int], List[int]] = {}  # (gpu, ram) -> sorted cpu values
+
+    def add(self, key: Key):
+        gpu, ram, cpu = key
+        rams = self.rams.get(gpu)
+        if rams is None:
+            rams = self.rams[gpu] = []
+            insort(self.gpus, gpu)
+        cpus = self.cpus.get((gpu, ram))
+        if cpus is None:
+            cpus = self.cpus[gpu, ram] = []
+            insort(rams, ram)
+        insort(cpus, cpu)
+
+    def discard(self, key: Key):
+        gpu, ram, cpu = key
+        cpus = self.cpus[gpu, ram]
+        del cpus[bisect_left(cpus, cpu)]
+        if cpus:
+            return
+        del self.cpus[gpu, ram]
+        rams = self.rams[gpu]
+        del rams[bisect_left(rams, ram)]
+        if rams:
+            return
+        del self.rams[gpu]
+        del self.gpus[bisect_left(self.gpus, gpu)]
+
+    def first_fit(self, need_cpu: int, need_gpu: int, need_ram: int) -> Optional[Key]:
+        """The smallest (gpu, ram, cpu) that covers the request, or None."""
+        gpus = self.gpus
+        for g in range(bisect_left(gpus, need_gpu), len(gpus)):
+            gpu = gpus[g]
+            rams = self.rams[gpu]
+            if rams[-1] < need_ram:
+                continue
+            for r in range(bisect_left(rams, need_ram), len(rams)):
+                cpus = self.cpus[gpu, rams[r]]
+                if cpus[-1] >= need_cpu:
+                    return gpu, rams[r], cpus[bisect_left(cpus, need_cpu)]
+        return None
+
+    def last_fit(self, need_cpu: int, need_gpu: int, need_ram: int) -> Optional[Key]:
+        """The largest (gpu, ram, cpu) that covers the request, or None."""
+        gpus = self.gpus
+        for g in range(len(gpus) - 1, bisect_left(gpus, need_gpu) - 1, -1):
+            gpu = gpus[g]
+            rams = self.rams[gpu]
+            for r in range(len(rams) - 1, bisect_left(rams, need_ram) - 1, -1):
+                cpus = self.cpus[gpu, rams[r]]
+                if cpus[-1] >= need_cpu:
+                    return gpu, rams[r], cpus[-1]
+        return None
+
+
+class CapacityIndex:
+    """Buckets of nodes keyed by free (gpu, ram, cpu), with sorted levels per version code."""
+
+    def __init__(self):
+        self._buckets: Dict[int, Dict[Key, Dict[object, None]]] = {}
+        self._levels: Dict[int, _Levels] = {}
+        self._entry: Dict[object, Tuple[int, Key]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entry)
+
+    def clear(self):
+        self._buckets.clear()
+        self._levels.clear()
+        self._entry.clear()
+
+    def update(self, node, code: int, cpu: int, gpu: int, ram: int):
+        """Files the node under its current free capacity, moving it if needed."""
+        entry = (code, (gpu, ram, cpu))
+        old = self._entry.get(node)
+        if old == entry:
+            return
+        if old is not None:
+            self._unlink(node, *old)
+        self._entry[node] = entry
+        buckets = self._buckets.setdefault(code, {})
+        bucket = buckets.get(entry[1])
+        if bucket is None:
+            bucket = buckets[entry[1]] = {}
+            levels = self._levels.get(code)
+            if levels is None:
+                levels = self._levels[code] = _Levels()
+            levels.add(entry[1])
+        bucket[node] = None
+
+    def load(self, nodes: List[object], codes: List[int], cpus: List[int], gpus: List[int], rams: List[int]):
+        """Replaces the index contents with the given nodes in one pass."""
+        self.clear()
+        buckets, entries = self._buckets, self._entry
+        for node, code, cpu, gpu, ram in zip(nodes, codes, cpus, gpus, rams):
+            key = (gpu, ram, cpu)
+            entries[node] = (code, key)
+            version = buckets.get(code)
+            if version is None:
+                version = buckets[code] = {}
+            bucket = version.get(key)
+            if bucket is None:
+                bucket = version[key] = {}
+            bucket[node] = None
+        for code, version in buckets.items():
+            levels = self._levels[code] = _Levels()
+            # Sorted keys append in order, so no level needs an insertion.
+            for gpu, ram, cpu in sorted(version):
+                level_rams = levels.rams.get(gpu)
+                if level_rams is None:
+                    level_rams = levels.rams[gpu] = []
+                    levels.gpus.append(gpu)
+                level_cpus = levels.cpus.get((gpu, ram))
+                if level_cpus is None:
+                    level_cpus = levels.cpus[gpu, ram] = []
+                    level_rams.append(ram)
+                level_cpus.append(cpu)
+
+    def remove(self, node):
+        old = self._entry.pop(node, None)
+        if old is not None:
+            self._unlink(node, *old)
+
+    def versions(self) -> List[int]:
+        return list(self._levels)
+
+    def best_fit(self, requirements: Tuple[int, int, int], versions: Iterable[int]):
+        """The node with the least free GPU, then RAM, then CPU that still fits, or None."""
+        best_key, best_version = None, None
+        for version in versions:
+            levels = self._levels.get(version)
+            key = levels.first_fit(*requirements) if levels is not None else None
+            if key is not None and (best_key is None or key < best_key):
+                best_key, best_version = key, version
+        return None if best_key is None else next(iter(self._buckets[best_version][best_key]))
+
+    def worst_fit(self, requirements: Tuple[int, int, int], versions: Iterable[int]):
+        """The node with the most free GPU, then RAM, then CPU that fits, or None."""
+        best_key, best_version = None, None
+        for version in versions:
+            levels = self._levels.get(version)
+            key = levels.last_fit(*requirements) if levels is not None else None
+            if key is not None and (best_key is None or key > best_key):
+                best_key, best_version = key, version
+        return None if best_key is None else next(iter(self._buckets[best_version][best_key]))
+
+    def _unlink(self, node, code: int, key: Key):
+        buckets = self._buckets[code]
+        bucket = buckets[key]
+        del bucket[node]
+        if not bucket:
+            del buckets[key]
+            self._levels[code].discard(key)
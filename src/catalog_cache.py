@@ -0,0 +1,146 @@
+# src/catalog_cache.py
+"""
+On-disk cache for the tutorial catalog.
+
+For every tutorial file the cache keeps the file's mtime, size and content
+hash along with the metadata read from it, and, once the module has been
+loaded, its compiled code. A file whose mtime and size are unchanged is taken
+from the cache without being read; a file that was touched but has the same
+content is matched by hash. Anything that cannot be read back, was written by
+another Python version or no longer matches its source is treated as a miss
+and rebuilt from the source.
+
+Each tutorial directory gets its own subdirectory of the cache, under
+`$AI_OPS_SIMULATOR_CACHE`, `$XDG_CACHE_HOME/ai-ops-simulator` or
+`~/.cache/ai-ops-simulator`. Writes go to a temporary file that is renamed
+into place, and a cache that cannot be written is simply not used.
+"""
+import hashlib
+import importlib.util
+import marshal
+import os
+import tempfile
+import types
+from typing import Any, Dict, Optional, Tuple
+
+FORMAT_VERSION = 1
+INDEX_FILE = "index.marshal"
+CODE_SUFFIX = ".code"
+
+# path -> (mtime_ns, size, content hash, scanned metadata or None)
+CacheEntry = Tuple[int, int, str, Any]
+
+
+def default_cache_dir() -> str:
+    override = os.environ.get("AI_OPS_SIMULATOR_CACHE")
+    if override:
+        return override
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ai-ops-simulator")
+
+
+def source_hash(source: bytes) -> str:
+    return hashlib.sha256(source).hexdigest()
+
+
+class CatalogCache:
+    """The cached metadata and code for the tutorial files of one directory."""
+
+    def __init__(self, cache_dir: str, tutorial_dir: str):
+        tutorial_dir = os.path.abspath(tutorial_dir)
+        key = hashlib.sha256(tutorial_dir.encode("utf-8")).hexdigest()[:16]
+        self.directory = os.path.join(cache_dir, "tutorials", key)
+        self._entries: Dict[str, CacheEntry] = self._read_index()
+        self._seen: Dict[str, CacheEntry] = {}
+        self._dirty = False
+
+    def _read_index(self) -> Dict[str, CacheEntry]:
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), "rb") as f:
+                version, magic, entries = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}
+        if version != FORMAT_VERSION or magic != importlib.util.MAGIC_NUMBER or not isinstance(entries, dict):
+            return {}
+        return entries
+
+    def lookup(self, path: str, stat: os.stat_result) -> Optional[CacheEntry]:
+        """The entry for `path` if the file's mtime and size are unchanged."""
+        entry = self._entries.get(path)
+        if not _valid(entry) or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+            return None
+        self._seen[path] = entry
+        return entry
+
+    def match(self, path: str, stat: os.stat_result, digest: str) -> Optional[CacheEntry]:
+        """The entry for `path` if its content hash is unchanged, refreshed to the new mtime."""
+        entry = self._entries.get(path)
+        if not _valid(entry) or entry[2] != digest:
+            return None
+        return self.store(path, stat, digest, entry[3])
+
+    def store(self, path: str, stat: os.stat_result, digest: str, scanned) -> CacheEntry:
+        entry = (stat.st_mtime_ns, stat.st_size, digest, scanned)
+        self._seen[path] = entry
+        self._dirty = True
+        return entry
+
+    def save(self):
+        """Writes the entries looked up or stored since loading, if any changed, and drops stale code."""
+        if not self._dirty and self._seen.keys() == self._entries.keys():
+            return
+        if not self._write(INDEX_FILE, marshal.dumps((FORMAT_VERSION, importlib.util.MAGIC_NUMBER, self._seen))):
+            return
+        self._entries, self._dirty = dict(self._seen), False
+        live = {entry[2] + CODE_SUFFIX for entry in self._entries.values()}
+        try:
+            for name in os.listdir(self.directory):
+                if name.endswith(CODE_SUFFIX) and name not in live:
+                    os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+    def code(self, path: str, digest: Optional[str]) -> types.CodeType:
+        """The compiled module for `path`, from the cache if present, otherwise compiled and cached."""
+        if digest is not None:
+            try:
+                with open(os.path.join(self.directory, digest + CODE_SUFFIX), "rb") as f:
+                    data = f.read()
+                if data[:len(importlib.util.MAGIC_NUMBER)] == importlib.util.MAGIC_NUMBER:
+                    code = marshal.loads(data[len(importlib.util.MAGIC_NUMBER):])
+                    if isinstance(code, types.CodeType) and code.co_filename == path:
+                        return code
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+        with open(path, "rb") as f:
+            source = f.read()
+        code = compile(source, path, "exec")
+        # Only cache code compiled from the content the index entry describes.
+        if digest is not None and source_hash(source) == digest:
+            self._write(digest + CODE_SUFFIX, importlib.util.MAGIC_NUMBER + marshal.dumps(code))
+        return code
+
+    def _write(self, name: str, data: bytes) -> bool:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, os.path.join(self.directory, name))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            return False
+        return True
+
+
+def _valid(entry) -> bool:
+    if not isinstance(entry, tuple) or len(entry) != 4 or not isinstance(entry[2], str):
+        return False
+    scanned = entry[3]
+    return scanned is None or (
+        isinstance(scanned, tuple) and len(scanned) == 2 and isinstance(scanned[1], dict)
+        and all(isinstance(info, dict) for info in scanned[1].values())
+    )
@@ -0,0 +1,144 @@
+# src/checkpoints.py
+"""
+Per-step checkpoints of tutorial state, for undo and rewind.
+
+Each checkpoint keeps the cluster and the jobs as persistent maps from id to
+an immutable record. A new checkpoint starts from the previous one and only
+replaces the records that differ, so unchanged nodes and jobs, and the trie
+nodes holding them, are shared between every checkpoint that contains them.
+Keeping a checkpoint per step therefore costs memory for what each step
+changed, not for a full copy of the state.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.event_clock import ARRIVAL
+from src.persistent_map import PersistentMap
+from src.snapshot import restore_state
+from src.tutorial_manager import Job
+
+
+class Checkpoint:
+    """Simulator state at the start of one tutorial step."""
+
+    __slots__ = ("step", "nodes", "node_order", "jobs", "job_order", "events", "scalars")
+
+    def __init__(self, step: int, nodes: PersistentMap, node_order: Tuple[str, ...], jobs: PersistentMap,
+                 job_order: Tuple[str, ...], events: PersistentMap, scalars: tuple):
+        self.step = step
+        self.nodes = nodes            # node id -> (capacity, available, version, unmanaged)
+        self.node_order = node_order
+        self.jobs = jobs              # job id -> (type, requirements, deadline, version, status, node, ...)
+        self.job_order = job_order
+        self.events = events          # pending (time, kind, job id) clock events as keys, arrivals excluded
+        self.scalars = scalars        # time, seed, history limit, configs, job id counter, auto schedule
+
+
+_EMPTY = Checkpoint(-1, PersistentMap(), (), PersistentMap(), (), PersistentMap(), ())
+
+
+def _node_record(node) -> tuple:
+    capacity, available, version = node._table.row_values(node._row)
+    return capacity, available, version, node.unmanaged
+
+
+def _job_record(job) -> tuple:
+    return (job.type, tuple(job.requirements), job.deadline, job.pytorch_version, job.status, job.assigned_node,
+            job.progress, job.error_message, job.submission_time, job.completion_time, job.duration)
+
+
+def _updated(previous: PersistentMap, current: Dict[str, object], record) -> PersistentMap:
+    """`previous` with the records of `current` applied, reusing records that did not change."""
+    records = previous
+    for key, item in current.items():
+        new = record(item)
+        if records.get(key) != new:
+            records = records.set(key, new)
+    if len(records) != len(current):
+        for key in [key for key in previous if key not in current]:
+            records = records.delete(key)
+    return records
+
+
+class CheckpointLog:
+    """Checkpoints for the steps of the active tutorial, oldest first."""
+
+    def __init__(self):
+        self._checkpoints: List[Checkpoint] = []
+
+    def __len__(self) -> int:
+        return len(self._checkpoints)
+
+    def clear(self):
+        self._checkpoints.clear()
+
+    def steps(self) -> List[int]:
+        return [checkpoint.step for checkpoint in self._checkpoints]
+
+    def get(self, step: int) -> Optional[Checkpoint]:
+        for checkpoint in self._checkpoints:
+            if checkpoint.step == step:
+                return checkpoint
+        return None
+
+    def truncate(self, step: int):
+        """Forgets the checkpoints of every step after `step`."""
+        while self._checkpoints and self._checkpoints[-1].step > step:
+            self._checkpoints.pop()
+
+    def record(self, manager, step: int) -> Checkpoint:
+        """Checkpoints the manager's state as the start of `step`, replacing any later checkpoints."""
+        self.truncate(step - 1)
+        previous = self._checkpoints[-1] if self._checkpoints else _EMPTY
+        cluster = manager.cluster
+        jobs = {job.id: job for job in manager.jobs}
+        node_order = tuple(cluster.keys())
+        job_order = tuple(jobs)
+        events = {(time, kind, payload.id): True for time, kind, _, payload in manager.clock._events if kind != ARRIVAL}
+        scalars = (manager.time, manager.seed, manager.history_limit, manager.terraform_config,
+                   manager.prometheus_config, Job._job_id_counter, manager.clock.auto_schedule)
+        checkpoint = Checkpoint(
+            step,
+            _updated(previous.nodes, dict(cluster.items()), _node_record),
+            previous.node_order if node_order == previous.node_order else node_order,
+            _updated(previous.jobs, jobs, _job_record),
+            previous.job_order if job_order == previous.job_order else job_order,
+            _updated(previous.events, events, lambda value: value),
+            previous.scalars if scalars == previous.scalars else scalars,
+        )
+        self._checkpoints.append(checkpoint)
+        return checkpoint
+
+    def restore(self, manager, checkpoint: Checkpoint):
+        """Puts the manager back into the checkpointed state and forgets later checkpoints."""
+        self.truncate(checkpoint.step)
+        node_records = dict(checkpoint.nodes.items())
+        nodes = [node_records[node_id] for node_id in checkpoint.node_order]
+        versions: Dict[str, int] = {}
+        version_codes = [versions.setdefault(record[2], len(versions)) for record in nodes]
+        job_records = dict(checkpoint.jobs.items())
+        jobs = [job_records[job_id] for job_id in checkpoint.job_order]
+        time, seed, history_limit, terraform_config, prometheus_config, job_id_counter, auto_schedule = checkpoint.scalars
+        restore_state(manager, {
+            "time": time,
+            "seed": seed,
+            "history_limit": history_limit,
+            "terraform_config": terraform_config,
+            "prometheus_config": prometheus_config,
+            "job_id_counter": job_id_counter,
+            "auto_schedule": auto_schedule,
+            "node_ids": list(checkpoint.node_order),
+            "node_order": list(range(len(nodes))),
+            "unmanaged": [record[3] for record in nodes],
+            "versions": list(versions),
+            "capacity": np.array([record[0] for record in nodes], dtype=np.int64).reshape(-1, 3).T.copy(),
+            "available": np.array([record[1] for record in nodes], dtype=np.int64).reshape(-1, 3).T.copy(),
+            "version": np.array(version_codes, dtype=np.int32),
+            "jobs": [
+                (job_id, record[0].value, record[2], record[3], record[4].value) + record[5:]
+                for job_id, record in zip(checkpoint.job_order, jobs)
+            ],
+            "requirements": np.array([record[1] for record in jobs], dtype=np.int64).reshape(-1, 3),
+            "events": sorted(checkpoint.events),
+        })
@@ -0,0 +1,314 @@
+# src/cluster_table.py
+"""
+Column-oriented, NumPy-backed storage for cluster nodes.
+
+Every node's cpu/gpu/ram capacity and availability lives in a shared table,
+together with an interned code for its PyTorch version. `Node` objects are
+thin views over one row of the table, so bulk questions such as "which nodes
+can run this job?" are answered with a handful of array operations instead of
+a Python loop over the cluster.
+"""
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.capacity_index import CapacityIndex
+
+RESOURCE_KEYS = ("cpu", "gpu", "ram")
+RESOURCE_INDEX = {key: i for i, key in enumerate(RESOURCE_KEYS)}
+
+ANY_VERSION = -1      # Job code: runs on any PyTorch version
+UNKNOWN_VERSION = -2  # Job code: needs a version no node in the table has
+
+# Upper bound on the size of the job x node boolean matrix built per chunk.
+PAIR_CHUNK_CELLS = 1 << 24
+
+
+class ClusterTable:
+    """Capacity, availability and version columns for a set of nodes."""
+
+    def __init__(self, capacity: int = 16, indexed: bool = False):
+        capacity = max(capacity, 1)
+        self.capacity = np.zeros((len(RESOURCE_KEYS), capacity), dtype=np.int64)
+        self.available = np.zeros((len(RESOURCE_KEYS), capacity), dtype=np.int64)
+        self.version = np.full(capacity, UNKNOWN_VERSION, dtype=np.int32)
+        self.nodes: List[Any] = []
+        self._version_codes: Dict[str, int] = {}
+        self._versions: List[str] = []
+        self.index: Optional[CapacityIndex] = CapacityIndex() if indexed else None
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    # --- Version interning ---
+    def intern_version(self, version: str) -> int:
+        code = self._version_codes.get(version)
+        if code is None:
+            code = self._version_codes[version] = len(self._versions)
+            self._versions.append(version)
+        return code
+
+    def version_code(self, version: Optional[str]) -> int:
+        """The code a job's version requirement matches against, without interning it."""
+        if not version:
+            return ANY_VERSION
+        return self._version_codes.get(version, UNKNOWN_VERSION)
+
+    def version_name(self, code: int) -> str:
+        return self._versions[code]
+
+    # --- Row management ---
+    def append(self, node, capacity: Sequence[int], available: Sequence[int], version: str) -> int:
+        """Adds a row for the node and points the node at it."""
+        row = len(self.nodes)
+        if row == self.version.shape[0]:
+            self._grow(row * 2)
+        self.capacity[:, row] = capacity
+        self.available[:, row] = available
+        self.version[row] = self.intern_version(version)
+        self.nodes.append(node)
+        node._table = self
+        node._row = row
+        self.reindex(row)
+        return row
+
+    def extend(self, nodes: Sequence, capacities: Sequence[Sequence[int]], versions: Sequence[str]):
+        """Appends rows for many fresh nodes at once, fully available, and refiles the index once."""
+        start = len(self.nodes)
+        end = start + len(nodes)
+        if end > self.version.shape[0]:
+            self._grow(max(end, start * 2))
+        block = np.array(capacities, dtype=np.int64).reshape(-1, len(RESOURCE_KEYS)).T
+        self.capacity[:, start:end] = block
+        self.available[:, start:end] = block
+        self.version[start:end] = [self.intern_version(version) for version in versions]
+        for row, node in enumerate(nodes, start):
+            node._table = self
+            node._row = row
+        self.nodes.extend(nodes)
+        self.rebuild_index()
+
+    def remove(self, row: int):
+        """Removes a row by moving the last row into its place."""
+        if self.index is not None:
+            self.index.remove(self.nodes[row])
+        last = len(self.nodes) - 1
+        if row != last:
+            self.capacity[:, row] = self.capacity[:, last]
+            self.available[:, row] = self.available[:, last]
+            self.version[row] = self.version[last]
+            moved = self.nodes[last]
+            self.nodes[row] = moved
+            moved._row = row
+        self.nodes.pop()
+
+    def reindex(self, row: int):
+        """Refreshes the capacity index entry for a row after its availability or version changed."""
+        if self.index is not None:
+            cpu, gpu, ram = self.available[:, row].tolist()
+            self.index.update(self.nodes[row], int(self.version[row]), cpu, gpu, ram)
+
+    def rebuild_index(self):
+        """Refiles every row in the capacity index, e.g. after the columns were loaded in bulk."""
+        if self.index is not None:
+            size = len(self.nodes)
+            cpus, gpus, rams = self.available[:, :size].tolist()
+            self.index.load(self.nodes, self.version[:size].tolist(), cpus, gpus, rams)
+
+    def row_values(self, row: int) -> Tuple[Tuple[int, ...], Tuple[int, ...], str]:
+        return (
+            tuple(int(v) for v in self.capacity[:, row]),
+            tuple(int(v) for v in self.available[:, row]),
+            self._versions[self.version[row]],
+        )
+
+    def _grow(self, capacity: int):
+        size = len(self.nodes)
+        for name in ("capacity", "available"):
+            old = getattr(self, name)
+            new = np.zeros((old.shape[0], capacity), dtype=old.dtype)
+            new[:, :size] = old[:, :size]
+            setattr(self, name, new)
+        version = np.full(capacity, UNKNOWN_VERSION, dtype=self.version.dtype)
+        version[:size] = self.version[:size]
+        self.version = version
+
+    # --- Bulk queries ---
+    def fitting_rows(self, requirements: Sequence[int], version: Optional[str] = None) -> np.ndarray:
+        """Row indices of every node with enough free resources and a matching version."""
+        size = len(self.nodes)
+        available = self.available[:, :size]
+        mask = available[0] >= requirements[0]
+        mask &= available[1] >= requirements[1]
+        mask &= available[2] >= requirements[2]
+        code = self.version_code(version)
+        if code != ANY_VERSION:
+            mask &= self.version[:size] == code
+        return np.flatnonzero(mask)
+
+    def best_fit_row(self, requirements: Sequence[int], code: int) -> Optional[int]:
+        """Row of the node with the least free GPU, then RAM, that fits, using the capacity index."""
+        node = self.index.best_fit(tuple(requirements), self._index_versions(code))
+        return None if node is None else node._row
+
+    def worst_fit_row(self, requirements: Sequence[int], code: int) -> Optional[int]:
+        """Row of the node with the most free GPU, then RAM, that fits, using the capacity index."""
+        node = self.index.worst_fit(tuple(requirements), self._index_versions(code))
+        return None if node is None else node._row
+
+    def _index_versions(self, code: int) -> List[int]:
+        if code == ANY_VERSION:
+            return self.index.versions()
+        if code == UNKNOWN_VERSION:
+            return []
+        return [code]
+
+    def feasible_pairs(self, requirements: np.ndarray, version_codes: np.ndarray) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yields (job_index, row) array pairs for every job/node combination that fits.
+
+        `requirements` is an (m, 3) array of cpu/gpu/ram requests and `version_codes`
+        holds the matching codes from `version_code`. The job x node matrix is built
+        in chunks of jobs so memory stays bounded for large clusters.
+        """
+        size = len(self.nodes)
+        if size == 0 or len(requirements) == 0:
+            return
+        available = self.available[:, :size]
+        versions = self.version[:size]
+        step = max(1, PAIR_CHUNK_CELLS // size)
+        for start in range(0, len(requirements), step):
+            req = requirements[start:start + step]
+            codes = version_codes[start:start + step]
+            mask = available[0][None, :] >= req[:, 0, None]
+            mask &= available[1][None, :] >= req[:, 1, None]
+            mask &= available[2][None, :] >= req[:, 2, None]
+            mask &= (codes[:, None] == ANY_VERSION) | (versions[None, :] == codes[:, None])
+            job_index, rows = np.nonzero(mask)
+            yield job_index + start, rows
+
+
+class ResourceVector(tuple):
+    """A fixed-width (cpu, gpu, ram) tuple with read-only dict-style access."""
+
+    __slots__ = ()
+
+    def __new__(cls, cpu: int = 0, gpu: int = 0, ram: int = 0):
+        return tuple.__new__(cls, (cpu, gpu, ram))
+
+    @classmethod
+    def from_mapping(cls, values: Mapping) -> 'ResourceVector':
+        if isinstance(values, cls):
+            return values
+        return cls(values.get("cpu", 0), values.get("gpu", 0), values.get("ram", 0))
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            key = RESOURCE_INDEX[key]
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default: int = 0) -> int:
+        index = RESOURCE_INDEX.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def keys(self):
+        return RESOURCE_KEYS
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(RESOURCE_KEYS, self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class ResourceView(MutableMapping):
+    """A dict-like view of one node's cpu/gpu/ram column in a ClusterTable."""
+
+    __slots__ = ("_node", "_column")
+
+    def __init__(self, node, column: str):
+        self._node = node
+        self._column = column
+
+    def __getitem__(self, key: str) -> int:
+        node = self._node
+        return int(getattr(node._table, self._column)[RESOURCE_INDEX[key], node._row])
+
+    def __setitem__(self, key: str, value: int):
+        node = self._node
+        getattr(node._table, self._column)[RESOURCE_INDEX[key], node._row] = value
+        node._table.reindex(node._row)
+
+    def __delitem__(self, key: str):
+        raise TypeError("Node resources cannot be removed.")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RESOURCE_KEYS)
+
+    def __len__(self) -> int:
+        return len(RESOURCE_KEYS)
+
+    def copy(self) -> Dict[str, int]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
+
+
+class Cluster(MutableMapping):
+    """Node id -> Node mapping whose nodes all live in one shared ClusterTable."""
+
+    def __init__(self):
+        self._nodes: Dict[str, Any] = {}
+        self.table = ClusterTable(indexed=True)
+
+    def __getitem__(self, node_id: str):
+        return self._nodes[node_id]
+
+    def __setitem__(self, node_id: str, node):
+        old = self._nodes.get(node_id)
+        if old is not None and old is not node:
+            self._detach(old)
+        if node._table is not self.table:
+            capacity, available, version = node._table.row_values(node._row)
+            self.table.append(node, capacity, available, version)
+        self._nodes[node_id] = node
+
+    def __delitem__(self, node_id: str):
+        self._detach(self._nodes.pop(node_id))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node_id) -> bool:
+        return node_id in self._nodes
+
+    def get(self, node_id: str, default=None):
+        return self._nodes.get(node_id, default)
+
+    def keys(self):
+        return self._nodes.keys()
+
+    def values(self):
+        return self._nodes.values()
+
+    def items(self):
+        return self._nodes.items()
+
+    def clear(self):
+        # Nodes that are still referenced elsewhere keep reading the old table,
+        # which is no longer written to, so they stay valid without copying.
+        self._nodes = {}
+        self.table = ClusterTable(indexed=True)
+
+    def _detach(self, node):
+        """Moves a node out of the shared table into a private one-row table."""
+        capacity, available, version = self.table.row_values(node._row)
+        self.table.remove(node._row)
+        ClusterTable(1).append(node, capacity, available, version)
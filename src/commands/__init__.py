@@ -2,16 +2,19 @@
 # src/commands/__init__.py
 
 from .general_commands import GeneralCommands, ExitCommand, HelpCommand
-from .tutorial_commands import TutorialCommands, NextCommand
+from .tutorial_commands import TutorialCommands, NextCommand, UndoCommand, RewindCommand
 from .job_commands import JobCommands
-from .terraform_commands import TerraformCommands
+from .terraform_commands import TerraformCommands, EditTerraformConfigCommand
 from .kubernetes_commands import KubernetesCommands
 from .kubeflow_commands import KubeflowCommands
 from .jax_commands import JAXCommands
 from .onnx_commands import ONNXCommands
 from .pytorch_commands import PyTorchCommands
 from .cuda_commands import CUDACommands
-from .prometheus_commands import PrometheusCommands
+from .prometheus_commands import PrometheusCommands, QueryCommand
+from .clock_commands import ClockCommands
+from .snapshot_commands import SnapshotCommands
+from .metrics_commands import MetricsCommands
 
 def get_command_handlers(tutorial_manager, command_executor):
     return [
@@ -20,8 +23,11 @@ def get_command_handlers(tutorial_manager, command_executor):
         HelpCommand(tutorial_manager, command_executor),
         TutorialCommands(tutorial_manager),
         NextCommand(tutorial_manager),
+        UndoCommand(tutorial_manager),
+        RewindCommand(tutorial_manager),
         JobCommands(tutorial_manager),
         TerraformCommands(tutorial_manager),
+        EditTerraformConfigCommand(tutorial_manager),
         KubernetesCommands(tutorial_manager),
         KubeflowCommands(tutorial_manager),
         JAXCommands(tutorial_manager),
@@ -29,4 +35,8 @@ def get_command_handlers(tutorial_manager, command_executor):
         PyTorchCommands(tutorial_manager),
         CUDACommands(tutorial_manager),
         PrometheusCommands(tutorial_manager),
+        QueryCommand(tutorial_manager),
+        ClockCommands(tutorial_manager),
+        SnapshotCommands(tutorial_manager),
+        MetricsCommands(tutorial_manager),
     ]
@@ -1,6 +1,8 @@
 
 # src/commands/base_command.py
 
+import time
+
 from rich.console import Console
 from src.tutorial_manager import TutorialManager
 from typing import List
@@ -25,10 +27,15 @@ class CommandExecutor:
         command = parts[0]
         args = parts[1:]
 
-        if command in self.commands:
-            self.commands[command].execute(*args)
-        else:
+        handler = self.commands.get(command)
+        if handler is None:
             console.print(f"[bold red]Unknown command: '{command}'[/bold red]")
+            return
+        start = time.perf_counter()
+        try:
+            handler.execute(*args)
+        finally:
+            self.tutorial_manager.metrics.command_seconds.labels(command).observe(time.perf_counter() - start)
 
 class BaseCommand:
     def __init__(self, name: str, description: str):
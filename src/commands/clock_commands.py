@@ -0,0 +1,53 @@
+# src/commands/clock_commands.py
+
+from rich.console import Console
+from .base_command import BaseCommand
+
+console = Console()
+
+class ClockCommands(BaseCommand):
+    def __init__(self, tutorial_manager):
+        super().__init__("clock", "Advance simulated time")
+        self.tutorial_manager = tutorial_manager
+        self.add_subcommand("tick", "Advances simulated time by N ticks (default 1)", self._tick)
+        self.add_subcommand("run-until", "Advances simulated time to an absolute timestamp", self._run_until)
+
+    def execute(self, *args):
+        if not args:
+            self.show_help()
+            return
+
+        subcommand = args[0]
+        if subcommand in self.subcommands:
+            handler = self.subcommands[subcommand]["handler"]
+            handler(*args[1:])
+        else:
+            console.print(f"[bold red]Unknown subcommand: {subcommand}[/bold red]")
+            self.show_help()
+
+    def _tick(self, *args):
+        """Advances simulated time by N ticks."""
+        if len(args) > 1 or (args and not args[0].isdigit()):
+            console.print("[bold red]Usage: tick \\[N][/bold red]")
+            return
+        fired = self.tutorial_manager.tick(int(args[0]) if args else 1)
+        self._report(fired)
+
+    def _run_until(self, *args):
+        """Advances simulated time to an absolute timestamp."""
+        if len(args) != 1 or not args[0].isdigit():
+            console.print("[bold red]Usage: run-until <t>[/bold red]")
+            return
+        try:
+            fired = self.tutorial_manager.run_until(int(args[0]))
+        except ValueError as e:
+            console.print(f"[bold red]{e}[/bold red]")
+            return
+        self._report(fired)
+
+    def _report(self, fired):
+        manager = self.tutorial_manager
+        console.print(
+            f"Time is now t={manager.time}. {fired} events processed "
+            f"({len(manager.job_queue)} pending, {len(manager.completed_jobs)} completed, {len(manager.failed_jobs)} failed)."
+        )
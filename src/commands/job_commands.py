@@ -4,6 +4,8 @@ from rich.console import Console
 from rich.table import Table
 from .base_command import BaseCommand
 from src.tutorial_manager import JobStatus
+from src.scheduler import POLICIES, FirstFitDecreasing
+from src.workload import ARRIVAL_PROCESSES, POISSON
 
 console = Console()
 
@@ -11,8 +13,11 @@ class JobCommands(BaseCommand):
     def __init__(self, tutorial_manager):
         super().__init__("job", "Manage simulated jobs")
         self.tutorial_manager = tutorial_manager
-        self.add_subcommand("ls-jobs", "Lists all pending jobs", self._ls_jobs)
-        self.add_subcommand("submit", "Submits a job to a node", self._submit)
+        self.add_subcommand("ls-jobs", "Lists pending jobs by deadline (--top <k> for the most urgent only)", self._ls_jobs)
+        self.add_subcommand("submit", "Submits a job to a node (best-fitting node if omitted)", self._submit)
+        self.add_subcommand("schedule", "Places every pending job using a bin-packing policy", self._schedule)
+        self.add_subcommand("generate-workload", "Streams a seeded synthetic workload into the simulation clock", self._generate_workload)
+        self.add_subcommand("replay", "Replays a CSV/JSONL job trace through the simulation clock", self._replay)
         self.add_subcommand("show-job", "Shows detailed information about a job", self._show_job)
         self.add_subcommand("debug", "Shows the error log for a failed job", self._debug)
 
@@ -29,9 +34,15 @@ class JobCommands(BaseCommand):
             console.print(f"[bold red]Unknown subcommand: {subcommand}[/bold red]")
             self.show_help()
 
-    def _ls_jobs(self, args):
-        """Lists all pending jobs."""
-        job_queue = self.tutorial_manager.ls_jobs()
+    def _ls_jobs(self, *args):
+        """Lists pending jobs, most urgent deadline first."""
+        top = None
+        if args:
+            if len(args) != 2 or args[0] != "--top" or not args[1].isdigit():
+                console.print("[bold red]Usage: ls-jobs \\[--top <k>][/bold red]")
+                return
+            top = int(args[1])
+        job_queue = self.tutorial_manager.ls_jobs(top=top)
         if not job_queue:
             console.print("[bold yellow]No pending jobs.[/bold yellow]")
             return
@@ -56,14 +67,88 @@ class JobCommands(BaseCommand):
             )
         console.print(table)
 
-    def _submit(self, args):
-        """Submits a job to a node."""
-        if len(args) != 2:
-            console.print("[bold red]Usage: submit <job_id> <node_id>[/bold red]")
+    def _submit(self, *args):
+        """Submits a job to a node, or to the best-fitting node if none is given."""
+        if len(args) not in (1, 2):
+            console.print("[bold red]Usage: submit <job_id> \\[node_id][/bold red]")
             return
-        result = self.tutorial_manager.submit_job(args[0], args[1])
+        result = self.tutorial_manager.submit_job(*args)
         console.print(result)
 
+    def _schedule(self, *args):
+        """Places every pending job using a bin-packing policy."""
+        if len(args) > 1:
+            console.print(f"[bold red]Usage: schedule \\[{'|'.join(POLICIES)}][/bold red]")
+            return
+        policy = args[0] if args else FirstFitDecreasing.name
+        try:
+            result = self.tutorial_manager.schedule_all(policy=policy)
+        except ValueError as e:
+            console.print(f"[bold red]{e}[/bold red]")
+            return
+        console.print(str(result))
+
+    def _generate_workload(self, *args):
+        """Streams a seeded synthetic workload into the simulation clock."""
+        usage = ("[bold red]Usage: generate-workload <count|inf> \\[--rate R] \\[--seed S] "
+                 f"\\[--arrival {'|'.join(ARRIVAL_PROCESSES)}] \\[--schedule POLICY] \\[--history N][/bold red]")
+        if not args or len(args) % 2 != 1:
+            console.print(usage)
+            return
+        options = dict(zip(args[1::2], args[2::2]))
+        try:
+            count = None if args[0] == "inf" else int(args[0])
+            rate = float(options.pop("--rate", 1.0))
+            seed = int(options.pop("--seed")) if "--seed" in options else None
+            history = int(options.pop("--history")) if "--history" in options else None
+        except ValueError:
+            console.print(usage)
+            return
+        arrival = options.pop("--arrival", POISSON)
+        policy = options.pop("--schedule", None)
+        if options or (policy is not None and policy not in POLICIES):
+            console.print(usage)
+            return
+        try:
+            workload = self.tutorial_manager.generate_workload(count=count, rate=rate, seed=seed, arrival=arrival, auto_schedule=policy)
+        except ValueError as e:
+            console.print(f"[bold red]{e}[/bold red]")
+            return
+        if history is not None:
+            self.tutorial_manager.history_limit = history
+        console.print(
+            f"Streaming {'an endless' if count is None else count} {arrival} workload "
+            f"(rate {rate}/tick, seed {workload.seed}). Use `clock tick` or `clock run-until` to advance time."
+        )
+
+    def _replay(self, *args):
+        """Streams a recorded job trace through the simulation clock and reports throughput."""
+        usage = ("[bold red]Usage: replay <trace-file> \\[--format csv|jsonl] \\[--schedule POLICY] "
+                 "\\[--until T] \\[--history N][/bold red]")
+        if not args or len(args) % 2 != 1:
+            console.print(usage)
+            return
+        options = dict(zip(args[1::2], args[2::2]))
+        try:
+            until = int(options.pop("--until")) if "--until" in options else None
+            history = int(options.pop("--history")) if "--history" in options else None
+        except ValueError:
+            console.print(usage)
+            return
+        trace_format = options.pop("--format", None)
+        policy = options.pop("--schedule", FirstFitDecreasing.name)
+        if options or policy not in POLICIES:
+            console.print(usage)
+            return
+        if history is not None:
+            self.tutorial_manager.history_limit = history
+        try:
+            report = self.tutorial_manager.replay_trace(args[0], trace_format=trace_format, auto_schedule=policy, until=until)
+        except (OSError, ValueError) as e:
+            console.print(f"[bold red]{e}[/bold red]")
+            return
+        console.print(str(report))
+
     def _show_job(self, args):
         """Shows detailed information about a job."""
         if len(args) != 1:
@@ -87,7 +172,7 @@ class JobCommands(BaseCommand):
             table.add_row("PyTorch Version", job.pytorch_version)
         if job.status == JobStatus.RUNNING:
             table.add_row("Assigned Node", job.assigned_node)
-            table.add_row("Progress", f"{job.progress}%")
+            table.add_row("Progress", f"{self.tutorial_manager.update_progress(job)}%")
         if job.status == JobStatus.FAILED:
             table.add_row("Error", job.error_message)
         console.print(table)
@@ -0,0 +1,59 @@
+# src/commands/metrics_commands.py
+
+from typing import Optional
+
+from rich.console import Console
+from .base_command import BaseCommand
+from src.metrics import DEFAULT_PORT, MetricsServer
+
+console = Console()
+
+class MetricsCommands(BaseCommand):
+    def __init__(self, tutorial_manager):
+        super().__init__("metrics", "Prometheus metrics for the simulator itself")
+        self.tutorial_manager = tutorial_manager
+        self.server: Optional[MetricsServer] = None
+        self.add_subcommand("serve", f"Serves /metrics on localhost (port {DEFAULT_PORT} unless given)", self._serve)
+        self.add_subcommand("stop", "Stops serving /metrics", self._stop)
+        self.add_subcommand("show", "Prints the current metrics in the Prometheus text format", self._show)
+
+    def execute(self, *args):
+        if not args:
+            self.show_help()
+            return
+
+        subcommand = args[0]
+        if subcommand in self.subcommands:
+            handler = self.subcommands[subcommand]["handler"]
+            handler(*args[1:])
+        else:
+            console.print(f"[bold red]Unknown subcommand: {subcommand}[/bold red]")
+            self.show_help()
+
+    def _serve(self, *args):
+        """Starts the /metrics endpoint on a localhost port."""
+        if len(args) > 1 or (args and not args[0].isdigit()):
+            console.print("[bold red]Usage: metrics serve \\[port][/bold red]")
+            return
+        if self.server is not None:
+            console.print(f"[bold yellow]Already serving {self.server.url}[/bold yellow]")
+            return
+        try:
+            self.server = MetricsServer(self.tutorial_manager.metrics, int(args[0]) if args else DEFAULT_PORT).start()
+        except OSError as e:
+            console.print(f"[bold red]Could not start the metrics endpoint: {e}[/bold red]")
+            return
+        console.print(f"[bold green]Serving metrics on {self.server.url}[/bold green]")
+
+    def _stop(self, *args):
+        """Stops the /metrics endpoint."""
+        if self.server is None:
+            console.print("[bold yellow]The metrics endpoint is not running.[/bold yellow]")
+            return
+        self.server.stop()
+        self.server = None
+        console.print("[bold green]Stopped serving metrics.[/bold green]")
+
+    def _show(self, *args):
+        """Prints the metrics a scrape would return."""
+        console.out(self.tutorial_manager.metrics.render(), highlight=False, end="")
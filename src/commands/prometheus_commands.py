@@ -1,11 +1,38 @@
 # src/commands/prometheus_commands.py
 
+from typing import Dict, List, Optional, Tuple
+
 from rich.console import Console
 from rich.prompt import Prompt
 from .base_command import BaseCommand
+from src.promql import PromQLError
+from src.timeseries import parse_duration
 
 console = Console()
 
+PRINT_BATCH = 500 # Lines handed to the console at a time when streaming query results
+
+QUERY_USAGE = "Usage: query <promql> \\[--time T] \\[--range DURATION] \\[--step DURATION]"
+
+
+def _query_options(args) -> Optional[Tuple[str, Dict[str, int]]]:
+    """Splits `--time`, `--range` and `--step` from the query text; None if any is malformed."""
+    words: List[str] = []
+    options: Dict[str, int] = {}
+    args = iter(args)
+    for arg in args:
+        if arg in ("--time", "--range", "--step"):
+            value = next(args, "")
+            try:
+                options[arg[2:]] = int(value) if value.isdigit() else parse_duration(value)
+            except ValueError:
+                return None
+        else:
+            words.append(arg)
+    if not words:
+        return None
+    return " ".join(words), options
+
 class PrometheusCommands(BaseCommand):
     def __init__(self, tutorial_manager):
         super().__init__("prometheus", "Simulated Prometheus commands")
@@ -27,14 +54,14 @@ class PrometheusCommands(BaseCommand):
             console.print(f"[bold red]Unknown subcommand: {subcommand}[/bold red]")
             self.show_help()
 
-    def _cat(self, args):
+    def _cat(self, *args):
         """Simulates the cat command for prometheus.yml."""
         if len(args) == 1 and args[0] == "prometheus.yml":
             console.print(self.tutorial_manager.get_prometheus_config())
         else:
             console.print("[bold red]Usage: cat prometheus.yml[/bold red]")
 
-    def _edit_prometheus_config(self, args):
+    def _edit_prometheus_config(self, *args):
         """Allows direct editing of the mock Prometheus configuration."""
         current_config = self.tutorial_manager.get_prometheus_config()
         console.print("[bold yellow]Current prometheus.yml:[/bold yellow]")
@@ -49,6 +76,34 @@ class PrometheusCommands(BaseCommand):
         self.tutorial_manager.set_prometheus_config("\n".join(new_config_lines))
         console.print("[bold green]prometheus.yml updated.[/bold green]")
 
-    def _restart_prometheus(self, args):
-        """Simulates restarting Prometheus."""
-        console.print("Simulated restarting Prometheus.")
+    def _restart_prometheus(self, *args):
+        """Simulates restarting Prometheus, picking up a changed scrape_interval."""
+        console.print(self.tutorial_manager.restart_prometheus())
+
+
+class QueryCommand(BaseCommand):
+    def __init__(self, tutorial_manager):
+        super().__init__("query", "Runs a PromQL query against the metrics scraped from the simulation")
+        self.tutorial_manager = tutorial_manager
+
+    def execute(self, *args):
+        """Evaluates a query now, at `--time`, or over `--range` in steps of `--step`."""
+        parsed = _query_options(args)
+        if parsed is None:
+            console.print(f"[bold red]{QUERY_USAGE}[/bold red]")
+            return
+        expression, options = parsed
+        try:
+            lines = self.tutorial_manager.query_metrics(
+                expression, options.get("time"), options.get("range", 0), options.get("step"))
+        except PromQLError as e:
+            console.print(f"[bold red]Error: {e}[/bold red]")
+            return
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) == PRINT_BATCH:
+                console.out("\n".join(batch), highlight=False)
+                batch = []
+        if batch:
+            console.out("\n".join(batch), highlight=False)
@@ -0,0 +1,81 @@
+# src/commands/snapshot_commands.py
+
+import time
+
+from rich.console import Console
+from rich.table import Table
+from .base_command import BaseCommand
+from src.snapshot import Snapshot
+
+console = Console()
+
+class SnapshotCommands(BaseCommand):
+    def __init__(self, tutorial_manager):
+        super().__init__("snapshot", "Save and restore simulator state")
+        self.tutorial_manager = tutorial_manager
+        self.add_subcommand("save", "Snapshots the current state under a name, optionally writing it to a file", self._save)
+        self.add_subcommand("restore", "Restores a named snapshot, or one read from a file", self._restore)
+        self.add_subcommand("list", "Lists the named snapshots", self._list)
+
+    def execute(self, *args):
+        if not args:
+            self.show_help()
+            return
+
+        subcommand = args[0]
+        if subcommand in self.subcommands:
+            handler = self.subcommands[subcommand]["handler"]
+            handler(*args[1:])
+        else:
+            console.print(f"[bold red]Unknown subcommand: {subcommand}[/bold red]")
+            self.show_help()
+
+    def _save(self, *args):
+        """Snapshots the current state under a name."""
+        if len(args) not in (1, 2):
+            console.print("[bold red]Usage: snapshot save <name> \\[file][/bold red]")
+            return
+        start = time.perf_counter()
+        snapshot = self.tutorial_manager.snapshot()
+        self.tutorial_manager.snapshots[args[0]] = snapshot
+        if len(args) == 2:
+            try:
+                snapshot.save(args[1])
+            except OSError as e:
+                console.print(f"[bold red]{e}[/bold red]")
+                return
+        where = f" and wrote it to {args[1]}" if len(args) == 2 else ""
+        console.print(f"Saved snapshot '{args[0]}' ({len(snapshot):,} bytes){where} in {(time.perf_counter() - start) * 1e3:.1f} ms.")
+
+    def _restore(self, *args):
+        """Restores a named snapshot, or one read from a file."""
+        if len(args) != 1:
+            console.print("[bold red]Usage: snapshot restore <name|file>[/bold red]")
+            return
+        snapshot = self.tutorial_manager.snapshots.get(args[0])
+        if snapshot is None:
+            try:
+                snapshot = Snapshot.load(args[0])
+            except (OSError, ValueError) as e:
+                console.print(f"[bold red]No snapshot named '{args[0]}' and it could not be read as a file: {e}[/bold red]")
+                return
+        start = time.perf_counter()
+        try:
+            self.tutorial_manager.restore(snapshot)
+        except ValueError as e:
+            console.print(f"[bold red]Could not restore '{args[0]}': {e}[/bold red]")
+            return
+        console.print(f"Restored '{args[0]}' at t={self.tutorial_manager.time} in {(time.perf_counter() - start) * 1e3:.1f} ms.")
+
+    def _list(self, *args):
+        """Lists the named snapshots."""
+        snapshots = self.tutorial_manager.snapshots
+        if not snapshots:
+            console.print("No snapshots saved.")
+            return
+        table = Table(title="Snapshots")
+        table.add_column("Name", style="cyan")
+        table.add_column("Size", justify="right")
+        for name, snapshot in snapshots.items():
+            table.add_row(name, f"{len(snapshot):,} bytes")
+        console.print(table)
@@ -1,11 +1,46 @@
 # src/commands/terraform_commands.py
 
+from typing import Iterable, List, Optional, Tuple
+
 from rich.console import Console
 from rich.prompt import Prompt
 from .base_command import BaseCommand
 
 console = Console()
 
+PRINT_BATCH = 500 # Lines of streamed output written to the console at a time
+
+
+def _paging(args) -> Optional[Tuple[List[str], Optional[int], int]]:
+    """Splits `--limit N` and `--offset N` from the other arguments; None if either is malformed."""
+    rest, limit, offset = [], None, 0
+    args = iter(args)
+    for arg in args:
+        if arg in ("--limit", "--offset"):
+            value = next(args, "")
+            if not value.isdigit():
+                return None
+            if arg == "--limit":
+                limit = int(value)
+            else:
+                offset = int(value)
+        else:
+            rest.append(arg)
+    return rest, limit, offset
+
+
+def _stream(lines: Iterable[str]):
+    """Prints lines as they are generated, a batch at a time, as plain text without markup."""
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) == PRINT_BATCH:
+            console.out("\n".join(batch), highlight=False)
+            batch = []
+    if batch:
+        console.out("\n".join(batch), highlight=False)
+
+
 class TerraformCommands(BaseCommand):
     def __init__(self, tutorial_manager):
         super().__init__("terraform", "Simulated Terraform commands")
@@ -23,10 +58,10 @@ class TerraformCommands(BaseCommand):
             handler = self.subcommands[subcommand]["handler"]
             handler(*args[1:])
         else:
-            console.print(f"[bold red]Unknown subcommand: {subcommand}[/bold red]")
-            self.show_help()
+            # `terraform plan`, `terraform apply`, ... arrive here with the terraform subcommand first
+            self._terraform(*args)
 
-    def _terraform(self, args):
+    def _terraform(self, *args):
         """Handles terraform commands (plan, apply, destroy, show, import)."""
         if not args:
             console.print("[bold red]Usage: terraform <plan|apply|destroy|show|import|state> [args][/bold red]")
@@ -34,14 +69,22 @@ class TerraformCommands(BaseCommand):
 
         subcommand = args[0]
 
-        if subcommand == "plan":
-            result = self.tutorial_manager.terraform_plan()
-            console.print(result)
-        elif subcommand == "apply":
+        if subcommand in ("plan", "apply"):
             target_node = None
-            if len(args) > 1 and args[1].startswith("-target="):
-                target_node = args[1].split("=")[1]
-            result = self.tutorial_manager.terraform_apply(target=target_node)
+            parallelism = None
+            for arg in args[1:]:
+                if arg.startswith("-target="):
+                    target_node = arg.split("=")[1]
+                elif subcommand == "apply" and arg.startswith("-parallelism=") and arg.split("=")[1].isdigit() and int(arg.split("=")[1]) > 0:
+                    parallelism = int(arg.split("=")[1])
+                else:
+                    usage = "\\[-target=<node_id>]" if subcommand == "plan" else "\\[-target=<node_id>] \\[-parallelism=N]"
+                    console.print(f"[bold red]Usage: terraform {subcommand} {usage}[/bold red]")
+                    return
+            if subcommand == "plan":
+                result = self.tutorial_manager.terraform_plan(target=target_node)
+            else:
+                result = self.tutorial_manager.terraform_apply(target=target_node, parallelism=parallelism)
             console.print(result)
         elif subcommand == "destroy":
             if len(args) < 2:
@@ -51,8 +94,12 @@ class TerraformCommands(BaseCommand):
             result = self.tutorial_manager.terraform_destroy(node_id)
             console.print(result)
         elif subcommand == "show":
-            result = self.tutorial_manager.terraform_show()
-            console.print(result)
+            paging = _paging(args[1:])
+            if paging is None or paging[0] not in ([], ["-json"]):
+                console.print("[bold red]Usage: terraform show \\[-json] \\[--limit N] \\[--offset N][/bold red]")
+                return
+            flags, limit, offset = paging
+            _stream(self.tutorial_manager.terraform_show(json_output=bool(flags), limit=limit, offset=offset))
         elif subcommand == "import":
             if len(args) < 2:
                 console.print("[bold red]Usage: terraform import <node_id>[/bold red]")
@@ -60,22 +107,29 @@ class TerraformCommands(BaseCommand):
             node_id = args[1]
             result = self.tutorial_manager.terraform_import(node_id)
             console.print(result)
-        elif subcommand == "init": # Added for tutorial
+        elif subcommand == "init":
+            if len(args) > 1 and args[1].startswith("-state="):
+                result = self.tutorial_manager.attach_terraform_state(args[1].split("=", 1)[1])
+                if result.startswith("Error"):
+                    console.print(f"[bold red]{result}[/bold red]")
+                    return
+                console.print(result)
             console.print("Terraform has been initialized.")
         elif subcommand == "validate": # Added for tutorial
-            console.print("Terraform configuration is valid.")
+            console.print(self.tutorial_manager.terraform_validate())
         elif subcommand == "fmt": # Added for tutorial
             console.print("Terraform configuration formatted.")
         elif subcommand == "state":
-            if len(args) > 1 and args[1] == "list":
-                result = self.tutorial_manager.terraform_state_list()
-                console.print(result)
-            else:
-                console.print("[bold red]Usage: terraform state list[/bold red]")
+            paging = _paging(args[2:]) if len(args) > 1 and args[1] == "list" else None
+            if paging is None or len(paging[0]) > 1:
+                console.print("[bold red]Usage: terraform state list \\[<glob>] \\[--limit N] \\[--offset N][/bold red]")
+                return
+            patterns, limit, offset = paging
+            _stream(self.tutorial_manager.terraform_state_list(patterns[0] if patterns else None, limit=limit, offset=offset))
         else:
             console.print(f"[bold red]Unknown terraform subcommand: '{subcommand}'[/bold red]")
 
-    def _edit_terraform_config(self, args):
+    def _edit_terraform_config(self, *args):
         """Allows direct editing of the mock Terraform configuration."""
         current_config = self.tutorial_manager.get_terraform_config()
         console.print("[bold yellow]Current TERRAFORM_CONFIG:[/bold yellow]")
@@ -89,3 +143,11 @@ class TerraformCommands(BaseCommand):
             new_config_lines.append(line)
         self.tutorial_manager.set_terraform_config("\n".join(new_config_lines))
         console.print("[bold green]TERRAFORM_CONFIG updated.[/bold green]")
+
+class EditTerraformConfigCommand(BaseCommand):
+    def __init__(self, tutorial_manager):
+        super().__init__("edit-terraform-config", "Allows direct editing of the mock Terraform configuration.")
+        self.terraform_commands = TerraformCommands(tutorial_manager)
+
+    def execute(self, *args):
+        self.terraform_commands._edit_terraform_config(*args)
@@ -1,8 +1,12 @@
 # src/commands/tutorial_commands.py
 
+import time
+
 from rich.console import Console
+from rich.markup import escape
 from rich.table import Table
 from .base_command import BaseCommand
+from src.tutorial_validation import summarize, validate_catalog
 
 
 console = Console()
@@ -14,6 +18,7 @@ class TutorialCommands(BaseCommand):
         self.add_subcommand("list", "List all available tutorials", self._list_tutorials)
         self.add_subcommand("show", "Show details of a tutorial by its ID", self._show_tutorial)
         self.add_subcommand("start", "Start a tutorial by its ID", self._start_tutorial)
+        self.add_subcommand("validate", "Check every tutorial file and report per-file timings", self._validate_tutorials)
 
     def execute(self, *args):
         if not args:
@@ -34,6 +39,9 @@ class TutorialCommands(BaseCommand):
             console.print("No tutorials available.")
             return
 
+        is_completed = self.tutorial_manager.is_tutorial_completed
+        active_id = self.tutorial_manager.get_active_tutorial_id()
+
         console.print("\nAvailable Tutorials\n")
         for category, category_tutorials in tutorials.items():
             console.print(f"Category: {category}")
@@ -42,10 +50,7 @@ class TutorialCommands(BaseCommand):
             table.add_column("Name", width=50)
             table.add_column("Status")
             for tid, t in category_tutorials.items():
-                completed = self.tutorial_manager.get_completed_tutorials()
-                active_id = self.tutorial_manager.get_active_tutorial_id()
-
-                if tid in completed:
+                if is_completed(tid):
                     status = "[bold green]Completed[/bold green]"
                 elif active_id and active_id == tid:
                     status = "[bold yellow]In Progress[/bold yellow]"
@@ -61,13 +66,8 @@ class TutorialCommands(BaseCommand):
             console.print("[bold red]Usage: tutorial show <ID>[/bold red]")
             return
         tutorial_id = args[0]
-        found_tutorial = None
-        tutorials = self.tutorial_manager.get_all_tutorials()
-        for category, category_tutorials in tutorials.items():
-            if tutorial_id in category_tutorials:
-                found_tutorial = category_tutorials[tutorial_id]
-                break
-            
+        found_tutorial = self.tutorial_manager.get_tutorial(tutorial_id)
+
         if found_tutorial:
             console.print(f"\n[bold]Skills for tutorial:[/bold]")
             console.print(f"- {found_tutorial['name']}")
@@ -85,16 +85,42 @@ class TutorialCommands(BaseCommand):
             return
         tutorial_id = args[0]
         if self.tutorial_manager.start_tutorial(tutorial_id):
-            # Find name for confirmation message
-            tutorials = self.tutorial_manager.get_all_tutorials()
-            for category, category_tutorials in tutorials.items():
-                if tutorial_id in category_tutorials:
-                    name = category_tutorials[tutorial_id]["name"]
-                    console.print(f"[bold green]Starting tutorial: '{name}'...[/bold green]")
-                    break
+            name = self.tutorial_manager.active_tutorial["name"]
+            console.print(f"[bold green]Starting tutorial: '{name}'...[/bold green]")
         else:
             console.print("[bold red]Tutorial not found.[/bold red]")
 
+    def _validate_tutorials(self, *args):
+        workers = None
+        if args:
+            if len(args) != 2 or args[0] != "--workers" or not args[1].isdigit() or int(args[1]) < 1:
+                console.print("[bold red]Usage: tutorial validate \\[--workers N][/bold red]")
+                return
+            workers = int(args[1])
+
+        start = time.perf_counter()
+        reports = validate_catalog(workers=workers)
+        elapsed = time.perf_counter() - start
+
+        table = Table(show_header=True, header_style="bold cyan")
+        table.add_column("File")
+        table.add_column("Tutorials", justify="right")
+        table.add_column("Steps", justify="right")
+        table.add_column("Time (ms)", justify="right")
+        table.add_column("Result")
+        for report in reports:
+            result = "[bold green]OK[/bold green]" if report.ok else f"[bold red]{len(report.problems)} problem(s)[/bold red]"
+            table.add_row(report.filename, str(report.tutorials), str(report.steps), f"{report.seconds * 1e3:.1f}", result)
+        console.print(table)
+        for report in reports:
+            for problem in report.problems:
+                console.print(f"[bold red]{report.filename}:[/bold red] {escape(problem)}")
+
+        totals = summarize(reports)
+        color = "green" if not totals["problems"] else "red"
+        console.print(f"[bold {color}]{totals['problems']} problem(s)[/bold {color}] in {totals['files']} files, "
+                      f"{totals['tutorials']} tutorials, {totals['steps']} steps ({elapsed * 1e3:.1f} ms)")
+
     def _quit_tutorial(self, *args):
         """Exits the current tutorial and returns to the main prompt."""
         self.tutorial_manager.end_tutorial()
@@ -107,3 +133,22 @@ class NextCommand(BaseCommand):
 
     def execute(self, *args):
         self.tutorial_manager.advance_tutorial()
+
+class UndoCommand(BaseCommand):
+    def __init__(self, tutorial_manager):
+        super().__init__("undo", "Goes back to the start of the previous tutorial step")
+        self.tutorial_manager = tutorial_manager
+
+    def execute(self, *args):
+        console.print(self.tutorial_manager.undo())
+
+class RewindCommand(BaseCommand):
+    def __init__(self, tutorial_manager):
+        super().__init__("rewind", "Restores the state from the start of an earlier tutorial step")
+        self.tutorial_manager = tutorial_manager
+
+    def execute(self, *args):
+        if len(args) != 1 or not args[0].isdigit() or int(args[0]) < 1:
+            console.print("[bold red]Usage: rewind <step>[/bold red]")
+            return
+        console.print(self.tutorial_manager.rewind(int(args[0]) - 1))
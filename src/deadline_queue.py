@@ -0,0 +1,124 @@
+# src/deadline_queue.py
+"""
+Indexed binary heap of pending jobs ordered by deadline.
+
+The queue exposes the small dict-style interface the job registry uses for
+its status buckets (`queue[job_id] = job`, `pop`, `get`, `values`), so it can
+stand in for the pending bucket directly. Each job's heap position is tracked,
+which keeps removal of an arbitrary job at O(log n), and iteration streams
+jobs in deadline order without sorting the whole queue.
+"""
+import heapq
+import itertools
+import math
+from typing import Dict, Iterator, List
+
+
+class DeadlineQueue:
+    """Min-heap of jobs keyed by (deadline, arrival order) with O(log n) removal by id."""
+
+    def __init__(self):
+        self._heap: List[tuple] = []         # ((deadline, sequence), job)
+        self._position: Dict[str, int] = {}  # job id -> index in _heap
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._position
+
+    def __setitem__(self, job_id: str, job):
+        if job_id in self._position:
+            self.pop(job_id)
+        deadline = job.deadline if job.deadline is not None else math.inf
+        self._heap.append(((deadline, next(self._sequence)), job))
+        self._position[job_id] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def get(self, job_id: str, default=None):
+        index = self._position.get(job_id)
+        return default if index is None else self._heap[index][1]
+
+    def pop(self, job_id: str, default=None):
+        """Removes a job by id in O(log n)."""
+        index = self._position.pop(job_id, None)
+        if index is None:
+            return default
+        heap = self._heap
+        entry = heap[index]
+        last = heap.pop()
+        if index < len(heap):
+            heap[index] = last
+            self._position[last[1].id] = index
+            self._sift_up(index)
+            self._sift_down(self._position[last[1].id])
+        return entry[1]
+
+    def peek(self):
+        """The job with the earliest deadline, or None."""
+        return self._heap[0][1] if self._heap else None
+
+    def pop_earliest(self):
+        """Removes and returns the job with the earliest deadline, or None."""
+        job = self.peek()
+        if job is not None:
+            self.pop(job.id)
+        return job
+
+    def clear(self):
+        self._heap.clear()
+        self._position.clear()
+
+    def values(self) -> Iterator:
+        """Streams jobs in deadline order. The first k jobs cost O(k log k).
+
+        The queue must not be modified while the iterator is being consumed.
+        """
+        heap = self._heap
+        if not heap:
+            return
+        frontier = [(heap[0][0], 0)]
+        while frontier:
+            _, index = heapq.heappop(frontier)
+            yield heap[index][1]
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child][0], child))
+
+    def __iter__(self) -> Iterator[str]:
+        return (job.id for job in self.values())
+
+    def _sift_up(self, index: int):
+        heap, position = self._heap, self._position
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if heap[parent][0] <= entry[0]:
+                break
+            heap[index] = heap[parent]
+            position[heap[index][1].id] = index
+            index = parent
+        heap[index] = entry
+        position[entry[1].id] = index
+
+    def _sift_down(self, index: int):
+        heap, position = self._heap, self._position
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1][0] < heap[child][0]:
+                child += 1
+            if heap[child][0] >= entry[0]:
+                break
+            heap[index] = heap[child]
+            position[heap[index][1].id] = index
+            index = child
+        heap[index] = entry
+        position[entry[1].id] = index
@@ -0,0 +1,449 @@
+# src/hcl.py
+"""
+Parser for the subset of HCL used by the simulator's Terraform configs.
+
+Supported: `resource "<type>" "<name>" { ... }` and `variable "<name>" { default = ... }`
+blocks (other blocks such as `provider` or `output` are parsed and kept, but
+not interpreted), attributes holding numbers, strings with `${...}`
+interpolation, booleans, null, lists, objects and references such as
+`var.gpus`, `count.index` or `cluster_node.base`, plus `#`, `//` and `/* */`
+comments.
+
+`parse_config` returns a `TerraformConfig` and caches it by the hash of the
+config text, so asking again for an unchanged config is a dict lookup.
+"""
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+CACHE_SIZE = 32
+
+# One token per match, classified by its first character; `.` catches anything unexpected.
+_TOKEN = re.compile(r"""[ \t\r]*(
+    \n | \#[^\n]* | //[^\n]* | /\*.*?\*/ | \\\n    # line ends, comments, line continuations
+  | -?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?               # numbers
+  | "(?:[^"\\\n]|\\.)*"                            # strings
+  | [A-Za-z_][\w-]*                                # identifiers
+  | [{}\[\]()=,.:*] | .                            # punctuation, anything else
+)""", re.VERBOSE | re.DOTALL)
+_IDENT_START = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_")
+_PUNCT = frozenset("{}[]()=,.:*")
+_INTERPOLATION = re.compile(r"\$\{([^}]*)\}")
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\", "$": "$"}
+
+
+class HCLError(ValueError):
+    """A config that does not parse or evaluate; carries the line it was found on."""
+
+    def __init__(self, message: str, line: Optional[int] = None):
+        super().__init__(f"line {line}: {message}" if line else message)
+        self.line = line
+
+
+# --- Expressions -------------------------------------------------------------
+
+class Literal:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def evaluate(self, scope: Dict[str, Any]):
+        return self.value
+
+
+class Reference:
+    """A dotted name such as `var.gpus` or `cluster_node.base.id`, with optional `[index]` parts."""
+
+    __slots__ = ("parts", "line")
+
+    def __init__(self, parts: Tuple, line: int):
+        self.parts = parts
+        self.line = line
+
+    @property
+    def name(self) -> str:
+        return ".".join(str(part) for part in self.parts)
+
+    def evaluate(self, scope: Dict[str, Any]):
+        value = scope
+        for part in self.parts:
+            try:
+                value = value[part]
+            except (KeyError, IndexError, TypeError):
+                raise HCLError(f"unknown reference '{self.name}'", self.line) from None
+        return value
+
+
+class ListExpr:
+    __slots__ = ("items",)
+
+    def __init__(self, items: List):
+        self.items = items
+
+    def evaluate(self, scope: Dict[str, Any]) -> list:
+        return [item.evaluate(scope) for item in self.items]
+
+
+class ObjectExpr:
+    __slots__ = ("items",)
+
+    def __init__(self, items: List[Tuple[str, Any]]):
+        self.items = items
+
+    def evaluate(self, scope: Dict[str, Any]) -> dict:
+        return {key: value.evaluate(scope) for key, value in self.items}
+
+
+class Template:
+    """A string with `${...}` interpolations; a lone interpolation keeps its value's type."""
+
+    __slots__ = ("parts",)
+
+    def __init__(self, parts: List):
+        self.parts = parts
+
+    def evaluate(self, scope: Dict[str, Any]):
+        if len(self.parts) == 1 and not isinstance(self.parts[0], str):
+            return self.parts[0].evaluate(scope)
+        return "".join(part if isinstance(part, str) else _text(part.evaluate(scope)) for part in self.parts)
+
+
+def _text(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "" if value is None else str(value)
+
+
+def references(expression) -> Iterator[Reference]:
+    """Every reference inside an expression."""
+    if isinstance(expression, Reference):
+        yield expression
+    elif isinstance(expression, ListExpr):
+        for item in expression.items:
+            yield from references(item)
+    elif isinstance(expression, ObjectExpr):
+        for _, item in expression.items:
+            yield from references(item)
+    elif isinstance(expression, Template):
+        for part in expression.parts:
+            if not isinstance(part, str):
+                yield from references(part)
+
+
+# --- Structure ---------------------------------------------------------------
+
+class Block:
+    """`<kind> "<label>"... { <attributes and nested blocks> }`."""
+
+    __slots__ = ("kind", "labels", "attributes", "blocks", "line")
+
+    def __init__(self, kind: str, labels: Tuple[str, ...], attributes: Dict[str, Any], blocks: List['Block'], line: int):
+        self.kind = kind
+        self.labels = labels
+        self.attributes = attributes
+        self.blocks = blocks
+        self.line = line
+
+
+class Resource:
+    """A `resource` block: its type, name and unevaluated attributes."""
+
+    __slots__ = ("type", "name", "attributes", "line")
+
+    def __init__(self, type: str, name: str, attributes: Dict[str, Any], line: int):
+        self.type = type
+        self.name = name
+        self.attributes = attributes
+        self.line = line
+
+    @property
+    def address(self) -> str:
+        return f"{self.type}.{self.name}"
+
+    def evaluate(self, variables: Dict[str, Any], index: Optional[int] = None,
+                 resources: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """The resource's attribute values, `count`, `depends_on` and other meta-arguments excluded.
+
+        `resources` maps resource type -> name -> values for the resources it may reference.
+        """
+        scope = dict(resources) if resources else {}
+        scope["var"] = variables
+        scope["count"] = {"index": index}
+        return {
+            name: expression.evaluate(scope)
+            for name, expression in self.attributes.items()
+            if name not in META_ARGUMENTS
+        }
+
+    def count(self, variables: Dict[str, Any], resources: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """The evaluated `count`, or None when the block has none."""
+        expression = self.attributes.get("count")
+        if expression is None:
+            return None
+        scope = dict(resources) if resources else {}
+        scope["var"] = variables
+        value = expression.evaluate(scope)
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            raise HCLError(f"count of {self.address} must be a whole number, not {value!r}", self.line)
+        return value
+
+
+META_ARGUMENTS = frozenset(("count", "depends_on", "lifecycle", "provider"))
+
+
+class TerraformConfig:
+    """A parsed config: variable defaults, resource blocks in file order, and every top-level block."""
+
+    __slots__ = ("variables", "resources", "blocks")
+
+    def __init__(self, blocks: List[Block]):
+        self.blocks = blocks
+        self.variables: Dict[str, Any] = {}
+        self.resources: Dict[str, Resource] = {}
+        for block in blocks:
+            if block.kind == "variable" and len(block.labels) == 1:
+                default = block.attributes.get("default")
+                self.variables[block.labels[0]] = default.evaluate({}) if default is not None else None
+            elif block.kind == "resource":
+                if len(block.labels) != 2:
+                    raise HCLError('resource blocks need a type and a name: resource "<type>" "<name>"', block.line)
+                resource = Resource(block.labels[0], block.labels[1], block.attributes, block.line)
+                if resource.address in self.resources:
+                    raise HCLError(f"duplicate resource {resource.address}", block.line)
+                self.resources[resource.address] = resource
+
+    def variable_values(self, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        values = dict(self.variables)
+        if overrides:
+            values.update(overrides)
+        return values
+
+
+# --- Parser ------------------------------------------------------------------
+
+class _Parser:
+    """Recursive descent over (kind, text, line) tokens; line ends are found by comparing lines."""
+
+    def __init__(self, text: str):
+        self.tokens = self._tokenize(text)
+        self.position = 0
+
+    @staticmethod
+    def _tokenize(text: str) -> List[Tuple[str, str, int]]:
+        tokens = []
+        append = tokens.append
+        line = 1
+        for value in _TOKEN.findall(text):
+            first = value[0]
+            if first == "\n":
+                line += 1
+            elif first in _IDENT_START:
+                append(("ident", value, line))
+            elif value in _PUNCT:
+                append(("punct", value, line))
+            elif first == '"' and len(value) > 1:
+                append(("string", value, line))
+            elif first.isdigit() or (first == "-" and len(value) > 1):
+                append(("number", value, line))
+            elif first == "#" or value[:2] in ("//", "/*", "\\\n"):
+                line += value.count("\n")
+            else:
+                raise HCLError(f"unexpected character {first!r}", line)
+        append(("end", "", line))
+        return tokens
+
+    def peek(self) -> Tuple[str, str, int]:
+        return self.tokens[self.position]
+
+    def take(self) -> Tuple[str, str, int]:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def expect(self, value: str) -> Tuple[str, str, int]:
+        token = self.take()
+        if token[1] != value or token[0] != "punct":
+            raise HCLError(f"expected '{value}', found {token[1]!r}" if token[0] != "end" else f"expected '{value}' before the end", token[2])
+        return token
+
+    def parse(self) -> List[Block]:
+        attributes, blocks = self.body(top_level=True)
+        if attributes:
+            name, _ = next(iter(attributes.items()))
+            raise HCLError(f"attribute '{name}' outside of a block")
+        return blocks
+
+    def body(self, top_level: bool = False) -> Tuple[Dict[str, Any], List[Block]]:
+        attributes: Dict[str, Any] = {}
+        blocks: List[Block] = []
+        tokens = self.tokens
+        while True:
+            kind, value, line = tokens[self.position]
+            if kind == "end":
+                if not top_level:
+                    raise HCLError("missing '}' before the end", line)
+                return attributes, blocks
+            if value == "}" and kind == "punct" and not top_level:
+                return attributes, blocks
+            if kind != "ident":
+                raise HCLError(f"expected an attribute or block, found {value!r}", line)
+            self.position += 1
+            if tokens[self.position][1] == "=":
+                self.position += 1
+                if value in attributes:
+                    raise HCLError(f"attribute '{value}' is set twice", line)
+                attributes[value] = self.expression()
+                self.end_of_line()
+            else:
+                blocks.append(self.block(value, line))
+
+    def end_of_line(self):
+        kind, value, line = self.tokens[self.position]
+        if line == self.tokens[self.position - 1][2] and kind != "end" and value != "}":
+            raise HCLError(f"expected a new line, found {value!r}", line)
+
+    def block(self, kind: str, line: int) -> Block:
+        labels = []
+        while True:
+            token_kind, value, token_line = self.take()
+            if token_kind == "string":
+                labels.append(_unquote(value, token_line))
+            elif token_kind == "ident":
+                labels.append(value)
+            elif value == "{":
+                break
+            else:
+                raise HCLError(f"expected a block label or '{{', found {value!r}", token_line)
+        attributes, blocks = self.body()
+        self.expect("}")
+        return Block(kind, tuple(labels), attributes, blocks, line)
+
+    def expression(self):
+        kind, value, line = self.take()
+        if kind == "number":
+            return Literal(float(value) if any(c in value for c in ".eE") else int(value))
+        if kind == "string":
+            return _template(_unquote(value, line), line)
+        if kind == "ident":
+            if value in ("true", "false"):
+                return Literal(value == "true")
+            if value == "null":
+                return Literal(None)
+            return self.reference(value, line)
+        if value == "[":
+            items = []
+            while self.peek()[1] != "]":
+                items.append(self.expression())
+                if self.peek()[1] != "]":
+                    self.expect(",")
+            self.expect("]")
+            return ListExpr(items)
+        if value == "{":
+            items = []
+            while self.peek()[1] != "}":
+                key_kind, key, key_line = self.take()
+                if key_kind not in ("ident", "string"):
+                    raise HCLError(f"expected an object key, found {key!r}", key_line)
+                separator = self.take()
+                if separator[1] not in ("=", ":"):
+                    raise HCLError(f"expected '=' after '{key}'", separator[2])
+                items.append((_unquote(key, key_line) if key_kind == "string" else key, self.expression()))
+                if self.peek()[1] == ",":
+                    self.take()
+            self.expect("}")
+            return ObjectExpr(items)
+        raise HCLError(f"expected a value, found {value!r}" if kind != "end" else "expected a value before the end", line)
+
+    def reference(self, first: str, line: int) -> Reference:
+        parts: List[Any] = [first]
+        while True:
+            kind, value, token_line = self.peek()
+            if token_line != line or kind != "punct":
+                return Reference(tuple(parts), line)
+            if value == ".":
+                self.take()
+                name_kind, name, name_line = self.take()
+                if name_kind not in ("ident", "number") and name != "*":
+                    raise HCLError(f"expected a name after '.', found {name!r}", name_line)
+                parts.append(int(name) if name_kind == "number" else name)
+            elif value == "[":
+                self.take()
+                index_kind, index, index_line = self.take()
+                if index_kind == "number":
+                    parts.append(int(index))
+                elif index_kind == "string":
+                    parts.append(_unquote(index, index_line))
+                else:
+                    raise HCLError(f"expected an index, found {index!r}", index_line)
+                self.expect("]")
+            else:
+                return Reference(tuple(parts), line)
+
+
+def _unquote(token: str, line: int) -> str:
+    text = token[1:-1]
+    if "\\" not in text:
+        return text
+    out, i = [], 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\":
+            escaped = text[i + 1:i + 2]
+            if escaped not in _ESCAPES:
+                raise HCLError(f"unknown escape '\\{escaped}'", line)
+            out.append(_ESCAPES[escaped])
+            i += 2
+        else:
+            out.append(char)
+            i += 1
+    return "".join(out)
+
+
+def _template(text: str, line: int):
+    if "${" not in text:
+        return Literal(text)
+    parts: List[Any] = []
+    position = 0
+    for found in _INTERPOLATION.finditer(text):
+        if found.start() > position:
+            parts.append(text[position:found.start()])
+        inner = _Parser(found.group(1))
+        try:
+            expression = inner.expression()
+        except HCLError as e:
+            raise HCLError(f"in '${{{found.group(1)}}}': {e}", line) from None
+        if inner.peek()[0] != "end":
+            raise HCLError(f"unsupported expression '${{{found.group(1)}}}'", line)
+        parts.append(expression)
+        position = found.end()
+    if position < len(text):
+        parts.append(text[position:])
+    return Template(parts)
+
+
+# --- Cache -------------------------------------------------------------------
+
+_cache: 'OrderedDict[bytes, TerraformConfig]' = OrderedDict()
+
+
+def config_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def parse_config(text: str) -> TerraformConfig:
+    """The parsed config for `text`, from the cache when the same text was parsed before.
+
+    Raises HCLError if the text does not parse.
+    """
+    key = config_hash(text)
+    config = _cache.get(key)
+    if config is not None:
+        _cache.move_to_end(key)
+        return config
+    config = TerraformConfig(_Parser(text).parse())
+    _cache[key] = config
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return config
@@ -0,0 +1,143 @@
+# src/job_registry.py
+"""
+Indexed storage for simulated jobs.
+
+The registry keeps every job keyed by its id, with secondary indexes by
+status and by assigned node. Jobs report their own status and node changes
+back to the registry they belong to, so the indexes stay consistent no matter
+which code path moves a job around.
+"""
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+class JobView:
+    """A live, read-only view over one bucket of jobs, in the bucket's own order."""
+
+    __slots__ = ("_bucket",)
+
+    def __init__(self, bucket: Dict[str, Any]):
+        self._bucket = bucket
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._bucket.values())
+
+    def __len__(self) -> int:
+        return len(self._bucket)
+
+    def __bool__(self) -> bool:
+        return bool(self._bucket)
+
+    def __contains__(self, job) -> bool:
+        return self._bucket.get(getattr(job, "id", None)) is job
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += len(self._bucket)
+        if index < 0 or index >= len(self._bucket):
+            raise IndexError("job index out of range")
+        return next(islice(self._bucket.values(), index, None))
+
+    def get(self, job_id: str):
+        return self._bucket.get(job_id)
+
+
+class JobRegistry:
+    """Jobs keyed by id, with secondary indexes by status and by assigned node.
+
+    `bucket_types` maps a status to the container used for its bucket. Anything
+    with the dict-style `[id] = job`, `pop`, `get`, `values` and `clear` methods
+    works, which lets the pending bucket be kept in deadline order.
+    """
+
+    def __init__(self, bucket_types: Optional[Dict[Any, Callable[[], Any]]] = None):
+        self._bucket_types = bucket_types or {}
+        self._jobs: Dict[str, Any] = {}
+        self._by_status: Dict[Any, Dict[str, Any]] = {}
+        self._by_node: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._jobs.values())
+
+    def add(self, job):
+        """Registers a job and indexes it under its current status and node."""
+        if job.id in self._jobs:
+            raise ValueError(f"Job '{job.id}' is already registered.")
+        self._jobs[job.id] = job
+        self._status_bucket(job.status)[job.id] = job
+        if job.assigned_node is not None:
+            self._node_bucket(job.assigned_node)[job.id] = job
+        job._registry = self
+        return job
+
+    def discard(self, job):
+        """Removes a job and all of its index entries, if present."""
+        if self._jobs.get(job.id) is not job:
+            return
+        del self._jobs[job.id]
+        self._status_bucket(job.status).pop(job.id, None)
+        if job.assigned_node is not None:
+            self._node_bucket(job.assigned_node).pop(job.id, None)
+        job._registry = None
+
+    def clear(self):
+        """Drops every job. Existing views stay valid and become empty."""
+        for job in self._jobs.values():
+            job._registry = None
+        self._jobs.clear()
+        for bucket in self._by_status.values():
+            bucket.clear()
+        self._by_node.clear()
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def trim(self, status, keep: int):
+        """Forgets the oldest jobs with the given status until at most `keep` remain."""
+        bucket = self._by_status.get(status)
+        while bucket and len(bucket) > keep:
+            self.discard(next(iter(bucket.values())))
+
+    def with_status(self, status) -> JobView:
+        return JobView(self._status_bucket(status))
+
+    def on_node(self, node_id: str) -> JobView:
+        """All registered jobs that have been assigned to the given node."""
+        return JobView(self._node_bucket(node_id))
+
+    def count(self, status) -> int:
+        bucket = self._by_status.get(status)
+        return len(bucket) if bucket else 0
+
+    # --- Hooks called by Job when its indexed attributes change ---
+    def _status_changed(self, job, old_status, new_status):
+        if old_status is new_status:
+            return
+        self._status_bucket(old_status).pop(job.id, None)
+        self._status_bucket(new_status)[job.id] = job
+
+    def _node_changed(self, job, old_node: Optional[str], new_node: Optional[str]):
+        if old_node == new_node:
+            return
+        if old_node is not None:
+            self._node_bucket(old_node).pop(job.id, None)
+        if new_node is not None:
+            self._node_bucket(new_node)[job.id] = job
+
+    def _status_bucket(self, status) -> Dict[str, Any]:
+        bucket = self._by_status.get(status)
+        if bucket is None:
+            bucket = self._by_status[status] = self._bucket_types.get(status, dict)()
+        return bucket
+
+    def _node_bucket(self, node_id: str) -> Dict[str, Any]:
+        bucket = self._by_node.get(node_id)
+        if bucket is None:
+            bucket = self._by_node[node_id] = {}
+        return bucket
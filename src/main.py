@@ -18,6 +18,18 @@ from src.tutorial_manager import TutorialManager
 
 console = Console()
 
+def complete_step(tutorial_manager: TutorialManager, step):
+    """Takes a step's transition once it has been answered: the next step, or the end of the tutorial."""
+    if tutorial_manager.current_step is not step:
+        return # The command itself moved the tutorial on, as `next` does
+    if step.is_last:
+        if step.final_message:
+            console.print(step.final_message)
+        tutorial_manager.end_tutorial()
+        console.print("[bold green]Tutorial complete! Select another tutorial to continue learning.[/bold green]")
+    else:
+        tutorial_manager.advance_tutorial()
+
 def main():
     """Initializes the tutorial system and starts the main loop."""
     console.print("[bold green]Welcome to the AI Ops Simulator Tutorials![/bold green]")
@@ -32,62 +44,31 @@ def main():
     while True:
         try:
             if tutorial_manager.active_tutorial:
-                tutorial_id = tutorial_manager.get_active_tutorial_id()
-                prompt_parts = [('bold cyan', f'\n({tutorial_id}) '), ('', 'Enter command: ')]
-                step_data = tutorial_manager.active_tutorial["steps"][tutorial_manager.tutorial_step]
+                step = tutorial_manager.current_step
+                console.print(step.prompt)
 
-                if step_data.get("type") == "mcq":
-                    console.print(f"\n[bold cyan]QUESTION:[/bold cyan] {step_data['text']}")
-                    for answer in step_data['answers']:
+                if step.is_mcq:
+                    for answer in step.answers:
                         console.print(answer)
-                    
-                    answer_input = prompt("Enter your answer (a, b, c, etc.): ").strip().lower()
-                    if answer_input == step_data['correct_answer']:
-                        console.print("[bold green]Correct![/bold green]")
-                        tutorial_manager.advance_tutorial()
-                    else:
-                        console.print("[bold red]Incorrect. Try again.[/bold red]")
-                    continue
-
-                prompt_text = step_data["text"]
-                console.print(f"\n[bold cyan]TUTORIAL:[/bold cyan] {prompt_text}")
-                
-                doc_prompt = ""
-                if step_data.get("doc_link"):
-                    doc_prompt += f"[dim]For more info, see:[/dim] [link={step_data['doc_link']}]{step_data['doc_link']}[/link]"
-                if step_data.get("doc_quote"):
-                    doc_prompt += " [dim](Type [bold]docs[/bold] to see a quote)[/dim]"
-                if doc_prompt:
-                    console.print(doc_prompt)
 
-                if step_data.get("type") == "mcq":
-                    console.print(f"\n[bold cyan]QUESTION:[/bold cyan] {step_data['text']}")
-                    for answer in step_data['answers']:
-                        console.print(answer)
-                    
-                    answer_input = prompt("Enter your answer (a, b, c, etc.): ").strip().lower()
-                    if answer_input == step_data['correct_answer']:
+                    answer_input = prompt("Enter your answer (a, b, c, etc.): ")
+                    if step.matcher(answer_input):
                         console.print("[bold green]Correct![/bold green]")
-                        if step_data.get("final_step"):
-                            console.print(f"[bold green]{step_data.get('final_message', '')}[/bold green]")
-                            tutorial_manager.end_tutorial()
-                            console.print("[bold green]Tutorial complete! Select another tutorial to continue learning.[/bold green]")
-                        else:
-                            tutorial_manager.advance_tutorial()
+                        complete_step(tutorial_manager, step)
                     else:
                         console.print("[bold red]Incorrect. Try again.[/bold red]")
                     continue
 
-                command_input = prompt(prompt_parts, history=history)
-                if tutorial_manager.check_tutorial_input(command_input):
-                    command_executor.execute(command_input)
+                if step.doc:
+                    console.print(step.doc)
 
-                    if step_data.get("final_step"):
-                        console.print(f"[bold green]{step_data.get('final_message', '')}[/bold green]")
-                        tutorial_manager.end_tutorial()
-                        console.print("[bold green]Tutorial complete! Select another tutorial to continue learning.[/bold green]")
-                    else:
-                        tutorial_manager.advance_tutorial()
+                command_input = prompt(tutorial_manager.active_steps.input_prompt, history=history)
+                if command_input.strip().split()[:1] in (["undo"], ["rewind"]):
+                    # Recovery commands work at any step and do not count as an answer.
+                    command_executor.execute(command_input)
+                elif step.matcher(command_input):
+                    command_executor.execute(command_input)
+                    complete_step(tutorial_manager, step)
                 else:
                     console.print("[bold red]That's not the right command. Try following the instructions carefully.[/bold red]")
             else:
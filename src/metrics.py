@@ -0,0 +1,191 @@
+# src/metrics.py
+"""
+Prometheus metrics for the simulator itself, and a localhost /metrics endpoint.
+
+Two kinds of metric are kept. Histograms that are observed as things happen —
+command latency per command and tutorial step transition time per tutorial —
+are plain lists of bucket counts that the REPL thread increments without a
+lock; the server thread only reads them, and a scrape that races an update
+at worst sees it one scrape late. Everything else — the job queue depth, job
+counts by status and node utilisation — is read from the manager when
+`/metrics` is scraped, so keeping it costs nothing between scrapes.
+
+`MetricsServer` serves the text exposition format from a daemon thread using
+only the standard library, and only binds to loopback addresses.
+"""
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.cluster_table import RESOURCE_KEYS
+
+# Seconds; commands and step transitions range from microseconds to whole scenario setups.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LOOPBACK = ("127.0.0.1", "localhost")
+DEFAULT_PORT = 9464
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """Cumulative-on-export bucket counts, a sum and a count."""
+
+    __slots__ = ("bounds", "counts", "total")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1) # The last bucket is +Inf
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def samples(self, name: str, labels: str) -> Iterator[str]:
+        counts, total = list(self.counts), self.total
+        cumulative = 0
+        prefix = labels + "," if labels else ""
+        for bound, count in zip(self.bounds, counts):
+            cumulative += count
+            yield f'{name}_bucket{{{prefix}le="{bound:g}"}} {cumulative}'
+        cumulative += counts[-1]
+        yield f'{name}_bucket{{{prefix}le="+Inf"}} {cumulative}'
+        braces = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{braces} {total:.9g}"
+        yield f"{name}_count{braces} {cumulative}"
+
+
+class LabelledHistogram:
+    """One Histogram per value of a single label."""
+
+    __slots__ = ("name", "help", "label", "children", "bounds")
+
+    def __init__(self, name: str, help: str, label: str, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.bounds = bounds
+        self.children: Dict[str, Histogram] = {}
+
+    def labels(self, value: str) -> Histogram:
+        child = self.children.get(value)
+        if child is None:
+            child = self.children.setdefault(value, Histogram(self.bounds))
+        return child
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for value, child in list(self.children.items()):
+            yield from child.samples(self.name, f'{self.label}="{_escape(value)}"')
+
+
+class SimulatorMetrics:
+    """The simulator's metrics, for one TutorialManager."""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.command_seconds = LabelledHistogram(
+            "ai_ops_command_duration_seconds", "Time taken to execute a REPL command.", "command")
+        self.step_transition_seconds = LabelledHistogram(
+            "ai_ops_tutorial_step_transition_seconds",
+            "Time taken to enter a tutorial step: its trigger and the step checkpoint.", "tutorial")
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        return "\n".join(self.lines()) + "\n"
+
+    def lines(self) -> Iterator[str]:
+        yield from self.command_seconds.render()
+        yield from self.step_transition_seconds.render()
+        yield from self._job_lines()
+        yield from self._node_lines()
+
+    def _job_lines(self) -> Iterator[str]:
+        from src.tutorial_manager import JobStatus # The manager module imports this one
+        jobs = self.manager.jobs # Only read with count(): with_status() would create buckets from this thread
+        yield "# HELP ai_ops_job_queue_depth Pending jobs waiting in the job queue."
+        yield "# TYPE ai_ops_job_queue_depth gauge"
+        yield f"ai_ops_job_queue_depth {jobs.count(JobStatus.PENDING)}"
+        yield "# HELP ai_ops_jobs Tracked jobs by status."
+        yield "# TYPE ai_ops_jobs gauge"
+        for status in JobStatus:
+            yield f'ai_ops_jobs{{status="{status.value}"}} {jobs.count(status)}'
+
+    def _node_lines(self) -> Iterator[str]:
+        table = self.manager.cluster.table
+        nodes = table.nodes[:] # A copy, so the REPL may add or remove nodes during a scrape
+        size = len(nodes)
+        capacity = table.capacity[:, :size].astype(np.float64)
+        used = capacity - table.available[:, :size]
+        yield "# HELP ai_ops_cluster_capacity Total node capacity by resource."
+        yield "# TYPE ai_ops_cluster_capacity gauge"
+        for key, total in zip(RESOURCE_KEYS, capacity.sum(axis=1).tolist()):
+            yield f'ai_ops_cluster_capacity{{resource="{key}"}} {total:g}'
+        yield "# HELP ai_ops_cluster_used Resources in use by running jobs, summed over nodes."
+        yield "# TYPE ai_ops_cluster_used gauge"
+        for key, total in zip(RESOURCE_KEYS, used.sum(axis=1).tolist()):
+            yield f'ai_ops_cluster_used{{resource="{key}"}} {total:g}'
+        yield "# HELP ai_ops_node_utilization Fraction of a node's capacity in use, by resource."
+        yield "# TYPE ai_ops_node_utilization gauge"
+        with np.errstate(divide="ignore", invalid="ignore"):
+            utilization = np.where(capacity > 0, used / capacity, 0.0).tolist()
+        for key, values in zip(RESOURCE_KEYS, utilization):
+            for node, value in zip(nodes, values):
+                yield f'ai_ops_node_utilization{{node="{_escape(node.id)}",resource="{key}"}} {value:.6g}'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    metrics: SimulatorMetrics # Set on the per-server subclass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404, "Only /metrics is served")
+            return
+        body = self.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Keep scrapes out of the REPL
+
+
+class MetricsServer:
+    """Serves `/metrics` for a SimulatorMetrics on a loopback address, from a daemon thread."""
+
+    def __init__(self, metrics: SimulatorMetrics, port: int = DEFAULT_PORT, host: str = "127.0.0.1"):
+        if host not in LOOPBACK:
+            raise ValueError(f"the metrics endpoint only binds to loopback addresses, not {host!r}")
+        handler = type("MetricsHandler", (_Handler,), {"metrics": metrics})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> 'MetricsServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
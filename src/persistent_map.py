@@ -0,0 +1,204 @@
+# src/persistent_map.py
+"""
+Immutable hash map with structural sharing (a hash array mapped trie).
+
+`set` and `delete` return a new map and leave the original untouched. The
+new map shares every trie node off the path to the changed key, so keeping
+many versions of a large map costs memory roughly in proportion to the number
+of changes between them, not to the size of the map.
+"""
+from typing import Any, Iterator, Optional, Tuple
+
+SHIFT = 5
+MASK = (1 << SHIFT) - 1
+HASH_MASK = (1 << 64) - 1
+
+_MISSING = object()
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _popcount(value: int) -> int:
+        return bin(value).count("1")
+
+
+def _hash(key) -> int:
+    return hash(key) & HASH_MASK
+
+
+class _Bitmap:
+    """A trie node holding up to 32 slots: (key, value) leaf pairs or child nodes."""
+
+    __slots__ = ("bitmap", "slots")
+
+    def __init__(self, bitmap: int, slots: tuple):
+        self.bitmap = bitmap
+        self.slots = slots
+
+    def get(self, key, h: int, shift: int, default):
+        bit = 1 << ((h >> shift) & MASK)
+        if not self.bitmap & bit:
+            return default
+        slot = self.slots[_popcount(self.bitmap & (bit - 1))]
+        if type(slot) is tuple:
+            return slot[1] if slot[0] is key or slot[0] == key else default
+        return slot.get(key, h, shift + SHIFT, default)
+
+    def set(self, key, value, h: int, shift: int) -> Tuple['_Bitmap', bool]:
+        """The node with key set to value, and whether the key was new."""
+        bit = 1 << ((h >> shift) & MASK)
+        index = _popcount(self.bitmap & (bit - 1))
+        slots = self.slots
+        if not self.bitmap & bit:
+            return _Bitmap(self.bitmap | bit, slots[:index] + ((key, value),) + slots[index:]), True
+        slot = slots[index]
+        if type(slot) is tuple:
+            if slot[0] is key or slot[0] == key:
+                if slot[1] is value:
+                    return self, False
+                new_slot, added = (key, value), False
+            else:
+                new_slot, added = _branch(slot, _hash(slot[0]), (key, value), h, shift + SHIFT), True
+        else:
+            new_slot, added = slot.set(key, value, h, shift + SHIFT)
+            if new_slot is slot:
+                return self, False
+        return _Bitmap(self.bitmap, slots[:index] + (new_slot,) + slots[index + 1:]), added
+
+    def delete(self, key, h: int, shift: int):
+        """The node without key: self if absent, None if now empty, or a lone leaf pair to inline."""
+        bit = 1 << ((h >> shift) & MASK)
+        if not self.bitmap & bit:
+            return self
+        index = _popcount(self.bitmap & (bit - 1))
+        slots = self.slots
+        slot = slots[index]
+        if type(slot) is tuple:
+            if not (slot[0] is key or slot[0] == key):
+                return self
+            new_slot = None
+        else:
+            new_slot = slot.delete(key, h, shift + SHIFT)
+            if new_slot is slot:
+                return self
+        if new_slot is None:
+            remaining = slots[:index] + slots[index + 1:]
+            if not remaining:
+                return None
+            if len(remaining) == 1 and type(remaining[0]) is tuple and shift:
+                return remaining[0]
+            return _Bitmap(self.bitmap & ~bit, remaining)
+        if len(slots) == 1 and type(new_slot) is tuple and shift:
+            return new_slot
+        return _Bitmap(self.bitmap, slots[:index] + (new_slot,) + slots[index + 1:])
+
+    def items(self) -> Iterator[tuple]:
+        for slot in self.slots:
+            if type(slot) is tuple:
+                yield slot
+            else:
+                yield from slot.items()
+
+
+class _Collision:
+    """Leaf pairs whose keys share a full 64-bit hash."""
+
+    __slots__ = ("hash", "pairs")
+
+    def __init__(self, h: int, pairs: tuple):
+        self.hash = h
+        self.pairs = pairs
+
+    def get(self, key, h: int, shift: int, default):
+        for pair in self.pairs:
+            if pair[0] is key or pair[0] == key:
+                return pair[1]
+        return default
+
+    def set(self, key, value, h: int, shift: int):
+        if h != self.hash:
+            return _branch_node(self, self.hash, (key, value), h, shift), True
+        for i, pair in enumerate(self.pairs):
+            if pair[0] is key or pair[0] == key:
+                if pair[1] is value:
+                    return self, False
+                return _Collision(h, self.pairs[:i] + ((key, value),) + self.pairs[i + 1:]), False
+        return _Collision(h, self.pairs + ((key, value),)), True
+
+    def delete(self, key, h: int, shift: int):
+        for i, pair in enumerate(self.pairs):
+            if pair[0] is key or pair[0] == key:
+                remaining = self.pairs[:i] + self.pairs[i + 1:]
+                return remaining[0] if len(remaining) == 1 else _Collision(h, remaining)
+        return self
+
+    def items(self) -> Iterator[tuple]:
+        return iter(self.pairs)
+
+
+def _branch(pair: tuple, pair_hash: int, new_pair: tuple, new_hash: int, shift: int):
+    """The smallest subtree holding two leaf pairs whose keys differ."""
+    if pair_hash == new_hash:
+        return _Collision(pair_hash, (pair, new_pair))
+    return _branch_node(pair, pair_hash, new_pair, new_hash, shift)
+
+
+def _branch_node(old, old_hash: int, new_pair: tuple, new_hash: int, shift: int) -> _Bitmap:
+    old_fragment = (old_hash >> shift) & MASK
+    new_fragment = (new_hash >> shift) & MASK
+    if old_fragment == new_fragment:
+        return _Bitmap(1 << old_fragment, (_branch_node(old, old_hash, new_pair, new_hash, shift + SHIFT),))
+    slots = (old, new_pair) if old_fragment < new_fragment else (new_pair, old)
+    return _Bitmap((1 << old_fragment) | (1 << new_fragment), slots)
+
+
+_EMPTY_ROOT = _Bitmap(0, ())
+
+
+class PersistentMap:
+    """An immutable mapping; `set` and `delete` return new maps that share structure."""
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, root: Optional[_Bitmap] = None, size: int = 0):
+        self._root = root if root is not None else _EMPTY_ROOT
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key) -> bool:
+        return self._root.get(key, _hash(key), 0, _MISSING) is not _MISSING
+
+    def __getitem__(self, key):
+        value = self._root.get(key, _hash(key), 0, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[Any]:
+        return (key for key, _ in self._root.items())
+
+    def get(self, key, default=None):
+        return self._root.get(key, _hash(key), 0, default)
+
+    def items(self) -> Iterator[tuple]:
+        return self._root.items()
+
+    def values(self) -> Iterator[Any]:
+        return (value for _, value in self._root.items())
+
+    def set(self, key, value) -> 'PersistentMap':
+        root, added = self._root.set(key, value, _hash(key), 0)
+        if root is self._root:
+            return self
+        return PersistentMap(root, self._size + added)
+
+    def delete(self, key) -> 'PersistentMap':
+        root = self._root.delete(key, _hash(key), 0)
+        if root is self._root:
+            return self
+        return PersistentMap(root, self._size - 1)
+
+    def __repr__(self) -> str:
+        return f"PersistentMap({dict(self.items())!r})"
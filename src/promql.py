@@ -0,0 +1,364 @@
+# src/promql.py
+"""
+A PromQL subset evaluated against the simulator's TimeSeriesStore.
+
+Supported: instant selectors with label matchers (`=`, `!=`, `=~`, `!~`),
+`rate`, `increase`, `avg_over_time`, `sum_over_time` and `count_over_time`
+over range selectors such as `ai_ops_job_progress[5m]`, and the `sum`, `avg`,
+`min`, `max` and `count` aggregations with an optional `by (<labels>)` clause
+before or after their argument. `rate` and `increase` treat a drop as a
+counter reset and, unlike Prometheus, do not extrapolate to the window edges.
+
+Every expression is evaluated at all of a query's steps at once: each series
+is read out of the store as one row of a (series x time) matrix, range
+functions become differences of cumulative sums along it, and aggregations
+reduce over groups of rows, so a range query costs a few array passes however
+many steps it has. Rows are processed in chunks to bound the matrices.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.timeseries import TimeSeriesStore, parse_duration
+
+LOOKBACK = 300 # Seconds an instant selector looks back for a sample, as in Prometheus
+MAX_POINTS = 11_000 # Steps per range query, as in Prometheus
+ROW_CHUNK = 1_024 # Series read out of the store at a time
+AGGREGATIONS = frozenset(("sum", "avg", "min", "max", "count"))
+FUNCTIONS = frozenset(("rate", "increase", "avg_over_time", "sum_over_time", "count_over_time"))
+
+_TOKEN = re.compile(r"""\s*(
+    [A-Za-z_:][\w:]*                           # names
+  | "(?:[^"\\]|\\.)*" | '(?:[^'\\]|\\.)*'      # strings
+  | \[[^\]]*\]                                 # range durations
+  | =~ | !~ | != | [{}(),=] | \S               # punctuation, anything else
+)""", re.VERBOSE)
+
+
+class PromQLError(ValueError):
+    """A query that does not parse or cannot be evaluated."""
+
+
+class Series:
+    """Label sets and a (series x steps) matrix of values; NaN where a series has no value."""
+
+    __slots__ = ("labels", "values")
+
+    def __init__(self, labels: List[Dict[str, str]], values: np.ndarray):
+        self.labels = labels
+        self.values = values
+
+
+# --- Expressions -------------------------------------------------------------
+
+class Selector:
+    """`metric{label="value", ...}`, with a range such as `[5m]` when passed to a function."""
+
+    __slots__ = ("metric", "matchers", "range")
+
+    def __init__(self, metric: str, matchers: List[Tuple[str, str, object]], range: Optional[int] = None):
+        self.metric = metric
+        self.matchers = matchers # (label, operator, value or compiled regex)
+        self.range = range
+
+    def rows(self, store: TimeSeriesStore) -> Tuple[np.ndarray, List[Dict[str, str]]]:
+        rows, labels = [], []
+        for row in store.metric_rows(self.metric):
+            values = store.labels(row)
+            if all(_matches(values.get(name, ""), op, value) for name, op, value in self.matchers):
+                rows.append(row)
+                labels.append(values)
+        return np.array(rows, dtype=np.int64), labels
+
+    def evaluate(self, store: TimeSeriesStore, steps: np.ndarray) -> Series:
+        if self.range is not None:
+            raise PromQLError("a range selector can only be passed to a function such as rate()")
+        rows, labels = self.rows(store)
+        values = _by_chunks(rows, steps, lambda chunk: _instant(store, chunk, steps))
+        return Series([dict(label_set, __name__=self.metric) for label_set in labels], values)
+
+
+class Call:
+    """`<function>(<range selector>)`."""
+
+    __slots__ = ("function", "selector")
+
+    def __init__(self, function: str, selector: Selector):
+        self.function = function
+        self.selector = selector
+
+    def evaluate(self, store: TimeSeriesStore, steps: np.ndarray) -> Series:
+        rows, labels = self.selector.rows(store)
+        window = self.selector.range
+        values = _by_chunks(rows, steps, lambda chunk: _over_time(self.function, store, chunk, steps, window))
+        return Series(labels, values)
+
+
+class Aggregation:
+    """`<sum|avg|min|max|count> [by (<labels>)] (<expression>)`."""
+
+    __slots__ = ("operator", "by", "expression")
+
+    def __init__(self, operator: str, by: Tuple[str, ...], expression):
+        self.operator = operator
+        self.by = by
+        self.expression = expression
+
+    def evaluate(self, store: TimeSeriesStore, steps: np.ndarray) -> Series:
+        inner = self.expression.evaluate(store, steps)
+        groups: Dict[Tuple[str, ...], int] = {}
+        ids = np.array([groups.setdefault(tuple(labels.get(name, "") for name in self.by), len(groups))
+                        for labels in inner.labels], dtype=np.int64)
+        if not groups:
+            return Series([], np.empty((0, len(steps)), dtype=np.float32))
+        # Sorting puts each group's rows next to each other, so each group reduces one contiguous slice.
+        order = np.argsort(ids, kind="stable")
+        values = inner.values[order]
+        bounds = np.flatnonzero(np.r_[True, np.diff(ids[order]) != 0]).tolist() + [len(values)]
+        slices = [slice(start, end) for start, end in zip(bounds, bounds[1:])]
+        present = ~np.isnan(values)
+        counts = np.stack([np.add.reduce(present[rows], axis=0) for rows in slices])
+        if self.operator in ("sum", "avg"):
+            zeroed = np.where(present, values, 0.0)
+            result = np.stack([np.add.reduce(zeroed[rows], axis=0, dtype=np.float64) for rows in slices])
+            if self.operator == "avg":
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    result = result / counts
+        elif self.operator in ("min", "max"):
+            reduce = np.fmin.reduce if self.operator == "min" else np.fmax.reduce # Both skip NaN
+            result = np.stack([reduce(values[rows], axis=0) for rows in slices])
+        else:
+            result = counts
+        result = np.where(counts > 0, result, np.nan)
+        labels = [{name: value for name, value in zip(self.by, key) if value} for key in groups]
+        return Series(labels, result)
+
+
+def _matches(actual: str, op: str, expected) -> bool:
+    if op == "=":
+        return actual == expected
+    if op == "!=":
+        return actual != expected
+    if op == "=~":
+        return expected.fullmatch(actual) is not None
+    return expected.fullmatch(actual) is None
+
+
+def _by_chunks(rows: np.ndarray, steps: np.ndarray, evaluate) -> np.ndarray:
+    result = np.full((len(rows), len(steps)), np.nan, dtype=np.float32)
+    for start in range(0, len(rows), ROW_CHUNK):
+        result[start:start + ROW_CHUNK] = evaluate(rows[start:start + ROW_CHUNK])
+    return result
+
+
+def _bounds(times: np.ndarray, steps: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """For each step, the first and last index of `times` in (step - window, step]."""
+    return np.searchsorted(times, steps - window, "right"), np.searchsorted(times, steps, "right") - 1
+
+
+def _cumulative(values: np.ndarray, dtype) -> np.ndarray:
+    """Running sums along each row after a zero column, so any window's sum is two lookups."""
+    sums = np.zeros((values.shape[0], values.shape[1] + 1), dtype=dtype)
+    np.cumsum(values, axis=1, dtype=dtype, out=sums[:, 1:])
+    return sums
+
+
+def _instant(store: TimeSeriesStore, rows: np.ndarray, steps: np.ndarray) -> np.ndarray:
+    """The latest sample of each series within LOOKBACK of each step."""
+    times, values = store.window(rows, int(steps[0]) - LOOKBACK + 1, int(steps[-1]), cover=int(steps[0]))
+    if len(times) == 0:
+        return np.nan
+    first, last = _bounds(times, steps, LOOKBACK)
+    present = ~np.isnan(values)
+    if present.all(): # No gaps: the latest sample is the last one in the window
+        latest = values.take(last.clip(0), axis=1)
+        return latest if (last >= first).all() else np.where(last >= first, latest, np.nan)
+    latest = np.maximum.accumulate(np.where(present, np.arange(len(times)), -1), axis=1)
+    index = latest[:, last.clip(0)]
+    found = (index >= first) & (last >= 0)
+    return np.where(found, np.take_along_axis(values, index.clip(0), axis=1), np.nan)
+
+
+def _over_time(function: str, store: TimeSeriesStore, rows: np.ndarray, steps: np.ndarray, window: int) -> np.ndarray:
+    """A range function of each series over (step - window, step] for each step."""
+    times, values = store.window(rows, int(steps[0]) - window + 1, int(steps[-1]))
+    if len(times) == 0:
+        return np.nan
+    first, last = _bounds(times, steps, window)
+    present = ~np.isnan(values)
+    dense = present.all() # No gaps, so windows start and end at the same samples for every series
+    if function in ("avg_over_time", "sum_over_time", "count_over_time"):
+        if dense:
+            counts = (last + 1 - first)[None, :]
+        else:
+            counts = _cumulative(present, np.int32)
+            counts = counts.take(last + 1, axis=1) - counts.take(first, axis=1)
+        empty = counts == 0
+        if function == "count_over_time":
+            return np.where(empty, np.nan, counts)
+        totals = _cumulative(values if dense else np.where(present, values, 0.0), np.float64)
+        totals = totals.take(last + 1, axis=1) - totals.take(first, axis=1)
+        if function == "avg_over_time":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                totals /= counts # An empty window gives 0 / 0, which is already NaN
+            return totals
+        return np.where(empty, np.nan, totals) if empty.any() else totals
+
+    # rate / increase: sum the rises between consecutive samples, counting a drop as a reset to zero.
+    if dense:
+        delta = np.diff(values, axis=1)
+        rises = _cumulative(np.where(delta >= 0, delta, values[:, 1:]), np.float64) # rises[:, i]: up to sample i
+        start, end = first.clip(max=len(times) - 1), last.clip(0)
+        increase = rises[:, end] - rises[:, start]
+        found = (first < last)[None, :]
+        elapsed = times[end] - times[start]
+    else:
+        positions = np.arange(len(times))
+        latest = np.maximum.accumulate(np.where(present, positions, -1), axis=1)
+        earliest = np.minimum.accumulate(np.where(present, positions, len(times))[:, ::-1], axis=1)[:, ::-1]
+        previous = np.full_like(latest, -1)
+        previous[:, 1:] = latest[:, :-1]
+        delta = values - np.take_along_axis(values, previous.clip(0), axis=1)
+        rises = _cumulative(np.where(present & (previous >= 0), np.where(delta >= 0, delta, values), 0.0), np.float64)
+        start = earliest[:, first.clip(max=len(times) - 1)]
+        end = latest[:, last.clip(0)]
+        found = (start < end) & (first < len(times)) & (last >= 0)
+        start, end = start.clip(0, len(times) - 1), end.clip(0)
+        increase = np.take_along_axis(rises, end + 1, axis=1) - np.take_along_axis(rises, start + 1, axis=1)
+        elapsed = times[end] - times[start]
+    if function == "rate":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            increase = increase / elapsed
+    return np.where(found, increase, np.nan)
+
+
+# --- Parser ------------------------------------------------------------------
+
+class _Parser:
+    """Recursive descent over the query's tokens."""
+
+    def __init__(self, text: str):
+        self.tokens = _TOKEN.findall(text) + [""]
+        self.position = 0
+
+    def peek(self) -> str:
+        return self.tokens[self.position]
+
+    def take(self) -> str:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def expect(self, value: str):
+        token = self.take()
+        if token != value:
+            raise PromQLError(f"expected '{value}', found {token!r}" if token else f"expected '{value}' before the end")
+
+    def parse(self):
+        expression = self.expression()
+        if self.peek():
+            raise PromQLError(f"unexpected {self.peek()!r}")
+        if isinstance(expression, Selector) and expression.range is not None:
+            raise PromQLError("a range selector can only be passed to a function such as rate()")
+        return expression
+
+    def expression(self):
+        name = self.take()
+        if not re.match(r"[A-Za-z_:]", name):
+            raise PromQLError(f"expected a metric, function or aggregation, found {name!r}" if name else "empty query")
+        if name in AGGREGATIONS and self.peek() in ("(", "by"):
+            by = self.grouping()
+            self.expect("(")
+            inner = self.expression()
+            self.expect(")")
+            if self.peek() == "by":
+                if by:
+                    raise PromQLError(f"{name} has two by clauses")
+                by = self.grouping()
+            return Aggregation(name, by, inner)
+        if self.peek() == "(":
+            if name not in FUNCTIONS:
+                raise PromQLError(f"unknown function {name}(); supported: {', '.join(sorted(FUNCTIONS))}")
+            self.take()
+            selector = self.expression()
+            self.expect(")")
+            if not isinstance(selector, Selector) or selector.range is None:
+                raise PromQLError(f"{name}() takes a range selector such as metric[5m]")
+            return Call(name, selector)
+        return self.selector(name)
+
+    def grouping(self) -> Tuple[str, ...]:
+        if self.peek() != "by":
+            return ()
+        self.take()
+        self.expect("(")
+        labels = []
+        while self.peek() != ")":
+            label = self.take()
+            if not re.fullmatch(r"[A-Za-z_]\w*", label):
+                raise PromQLError(f"expected a label name, found {label!r}")
+            labels.append(label)
+            if self.peek() == ",":
+                self.take()
+        self.take()
+        return tuple(labels)
+
+    def selector(self, metric: str) -> Selector:
+        matchers = []
+        if self.peek() == "{":
+            self.take()
+            while self.peek() != "}":
+                label = self.take()
+                op = self.take()
+                if not re.fullmatch(r"[A-Za-z_]\w*", label) or op not in ("=", "!=", "=~", "!~"):
+                    raise PromQLError(f"expected a label matcher such as node=\"node-0\", found {label!r} {op!r}")
+                value = _unquote(self.take())
+                if op in ("=~", "!~"):
+                    try:
+                        value = re.compile(value)
+                    except re.error as e:
+                        raise PromQLError(f"invalid regex {value!r}: {e}") from None
+                matchers.append((label, op, value))
+                if self.peek() == ",":
+                    self.take()
+                elif self.peek() != "}":
+                    raise PromQLError(f"expected ',' or '}}', found {self.peek()!r}")
+            self.take()
+        window = None
+        if self.peek().startswith("["):
+            try:
+                window = parse_duration(self.take()[1:-1].strip())
+            except ValueError as e:
+                raise PromQLError(str(e)) from None
+            if window == 0:
+                raise PromQLError("a range must be longer than zero")
+        return Selector(metric, matchers, window)
+
+
+def _unquote(token: str) -> str:
+    if len(token) < 2 or token[0] not in "\"'" or token[-1] != token[0]:
+        raise PromQLError(f"expected a quoted label value, found {token!r}")
+    return re.sub(r"\\(.)", r"\1", token[1:-1])
+
+
+def parse(text: str):
+    """The expression tree of a query. Raises PromQLError."""
+    return _Parser(text).parse()
+
+
+def evaluate(store: TimeSeriesStore, text: str, end: int, duration: int = 0, step: Optional[int] = None) -> Tuple[np.ndarray, Series]:
+    """Evaluates a query at every `step` seconds over [end - duration, end]; an instant query when duration is 0.
+
+    Returns the step times and the series that have a value at any of them.
+    """
+    expression = parse(text)
+    step = step or store.step
+    if step <= 0 or duration < 0:
+        raise PromQLError("the step must be positive and the range non-negative")
+    if duration // step + 1 > MAX_POINTS:
+        raise PromQLError(f"a range query may have at most {MAX_POINTS} steps; use a larger step")
+    steps = end - np.arange(duration // step, -1, -1, dtype=np.int64) * step
+    result = expression.evaluate(store, steps)
+    keep = ~np.isnan(result.values).all(axis=1) if len(result.labels) else np.zeros(0, dtype=bool)
+    return steps, Series([labels for labels, kept in zip(result.labels, keep) if kept], result.values[keep])
@@ -0,0 +1,171 @@
+# src/scheduler.py
+"""
+Batch placement of the pending job queue onto the cluster.
+
+A scheduling pass works directly on the cluster table: first-fit searches are
+vectorized comparisons over the table columns and best/worst-fit searches use
+the table's capacity index. The chosen node is then claimed through
+`TutorialManager.start_job`, so the job registry, node bookkeeping and event
+clock end up exactly as after a manual `submit`.
+"""
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.cluster_table import ANY_VERSION, UNKNOWN_VERSION, ClusterTable, ResourceVector
+
+# Rows examined at once when a first-fit search resumes from its cursor.
+FIRST_FIT_CHUNK = 4096
+
+
+def fit_mask(available: np.ndarray, versions: np.ndarray, requirements: Tuple[int, int, int], code: int) -> np.ndarray:
+    """Boolean mask of the nodes that can take the given requirements and version code."""
+    mask = available[0] >= requirements[0]
+    mask &= available[1] >= requirements[1]
+    mask &= available[2] >= requirements[2]
+    if code != ANY_VERSION:
+        mask &= versions == code
+    return mask
+
+
+class PlacementPolicy:
+    """Base class for bin-packing policies used by `schedule_all`."""
+
+    name = ""
+    description = ""
+
+    def begin(self, table: ClusterTable):
+        """Called once at the start of a scheduling pass."""
+
+    def order(self, jobs: List) -> List:
+        """The order in which pending jobs are considered."""
+        return jobs
+
+    def claimed(self, table: ClusterTable, row: int):
+        """Called after a job has been placed on the given row."""
+
+    def select(self, table: ClusterTable, requirements: Tuple[int, int, int], code: int) -> Optional[int]:
+        """Returns the table row to place the job on, or None if nothing fits."""
+        raise NotImplementedError("Subclasses must implement the select method")
+
+
+class FirstFitDecreasing(PlacementPolicy):
+    name = "first-fit-decreasing"
+    description = "Largest jobs first, each on the first node that fits"
+
+    def begin(self, table: ClusterTable):
+        # Availability only shrinks during a pass, so the first fitting row for a
+        # given job shape never moves backwards and can be resumed from a cursor.
+        self._cursors: Dict[Tuple[Tuple[int, int, int], int], int] = {}
+
+    def order(self, jobs: List) -> List:
+        return sorted(jobs, key=_sort_key, reverse=True)
+
+    def select(self, table: ClusterTable, requirements: Tuple[int, int, int], code: int) -> Optional[int]:
+        key = (requirements, code)
+        size = len(table)
+        start = self._cursors.get(key, 0)
+        while start < size:
+            stop = min(start + FIRST_FIT_CHUNK, size)
+            mask = fit_mask(table.available[:, start:stop], table.version[start:stop], requirements, code)
+            hits = np.flatnonzero(mask)
+            if len(hits):
+                row = start + int(hits[0])
+                self._cursors[key] = row
+                return row
+            start = stop
+        self._cursors[key] = size
+        return None
+
+
+class EarliestDeadlineFirst(FirstFitDecreasing):
+    name = "edf"
+    description = "Most urgent deadline first, each on the first node that fits"
+
+    def order(self, jobs: List) -> List:
+        # The pending queue already streams in deadline order, so this is a linear pass.
+        return sorted(jobs, key=_deadline_key)
+
+
+class BestFit(PlacementPolicy):
+    name = "best-fit"
+    description = "Each job on the node with the least free GPU/RAM that still fits"
+
+    def select(self, table: ClusterTable, requirements: Tuple[int, int, int], code: int) -> Optional[int]:
+        return table.best_fit_row(requirements, code)
+
+
+class WorstFit(PlacementPolicy):
+    name = "worst-fit"
+    description = "Each job on the node with the most free GPU/RAM, spreading load"
+
+    def select(self, table: ClusterTable, requirements: Tuple[int, int, int], code: int) -> Optional[int]:
+        return table.worst_fit_row(requirements, code)
+
+
+POLICIES: Dict[str, type] = {
+    FirstFitDecreasing.name: FirstFitDecreasing,
+    BestFit.name: BestFit,
+    WorstFit.name: WorstFit,
+    EarliestDeadlineFirst.name: EarliestDeadlineFirst,
+}
+
+
+def register_policy(policy_class: type):
+    """Makes a PlacementPolicy subclass available to `schedule_all` by its name."""
+    POLICIES[policy_class.name] = policy_class
+    return policy_class
+
+
+def _sort_key(job) -> Tuple[int, int, int]:
+    cpu, gpu, ram = ResourceVector.from_mapping(job.requirements)
+    return (gpu, ram, cpu)
+
+
+def _deadline_key(job) -> float:
+    return job.deadline if job.deadline is not None else float("inf")
+
+
+class ScheduleResult:
+    """Outcome of one scheduling pass."""
+
+    def __init__(self, policy: str, placed: int, leftover: int, seconds: float):
+        self.policy = policy
+        self.placed = placed
+        self.leftover = leftover
+        self.seconds = seconds
+
+    def __str__(self) -> str:
+        return (f"Policy '{self.policy}': placed {self.placed} jobs, "
+                f"{self.leftover} left in the queue ({self.seconds:.3f}s).")
+
+
+def schedule(manager, policy: str = FirstFitDecreasing.name) -> ScheduleResult:
+    """Places every pending job it can using the named policy."""
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown scheduling policy '{policy}'. Choose from: {', '.join(POLICIES)}")
+    start = time.perf_counter()
+    strategy: PlacementPolicy = POLICIES[policy]()
+    table = manager.cluster.table
+    strategy.begin(table)
+
+    placed = 0
+    pending = list(manager.job_queue)
+    exhausted = set()
+    for job in strategy.order(pending):
+        requirements = tuple(ResourceVector.from_mapping(job.requirements))
+        code = table.version_code(job.pytorch_version)
+        key = (requirements, code)
+        if code == UNKNOWN_VERSION or key in exhausted:
+            continue
+        row = strategy.select(table, requirements, code)
+        if row is None:
+            # Nothing is released mid-pass, so later jobs of this shape cannot fit either.
+            exhausted.add(key)
+            continue
+        manager.start_job(job, table.nodes[row])
+        strategy.claimed(table, row)
+        placed += 1
+
+    return ScheduleResult(policy, placed, len(pending) - placed, time.perf_counter() - start)
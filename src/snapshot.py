@@ -0,0 +1,208 @@
+# src/snapshot.py
+"""
+Binary snapshots of simulator state.
+
+A snapshot captures the cluster, every tracked job, the pending clock events,
+the simulated time and the Terraform/Prometheus configs. State is laid out in
+columns: node capacities, availability and versions, and job requirements,
+are NumPy arrays pickled with protocol 5 as out-of-band buffers, and the rest
+is plain lists. Restoring copies the arrays straight into a fresh table and
+builds the Node and Job objects without going through their constructors, so
+large clusters come back in a fraction of the time it takes to create them.
+
+Workload sources attached to the clock (generators, trace readers) are not
+captured; their pending arrivals are dropped from the snapshot.
+"""
+import gc
+import pickle
+import struct
+from typing import Any, Dict, List
+
+import numpy as np
+
+from src.cluster_table import ClusterTable, ResourceVector
+from src.event_clock import ARRIVAL
+from src.tutorial_manager import Job, JobStatus, JobType, Node
+
+MAGIC = b"AIOSNAP1"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sII")  # magic, format version, buffer count
+_LENGTH = struct.Struct("<Q")
+
+
+class Snapshot:
+    """An immutable image of simulator state: a pickle payload plus its out-of-band buffers."""
+
+    __slots__ = ("payload", "buffers")
+
+    def __init__(self, payload: bytes, buffers: List[memoryview]):
+        self.payload = payload
+        self.buffers = buffers
+
+    def __len__(self) -> int:
+        return len(self.payload) + sum(buffer.nbytes for buffer in self.buffers)
+
+    def state(self) -> Dict[str, Any]:
+        try:
+            return pickle.loads(self.payload, buffers=self.buffers)
+        except (pickle.UnpicklingError, EOFError, IndexError, struct.error) as e:
+            raise ValueError(f"Not a simulator snapshot, or a corrupt one: {e}") from e
+
+    def to_bytes(self) -> bytes:
+        parts = [_HEADER.pack(MAGIC, FORMAT_VERSION, len(self.buffers)), _LENGTH.pack(len(self.payload))]
+        parts.extend(_LENGTH.pack(buffer.nbytes) for buffer in self.buffers)
+        parts.append(self.payload)
+        parts.extend(self.buffers)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data) -> 'Snapshot':
+        view = memoryview(data)
+        if len(view) < _HEADER.size:
+            raise ValueError("Not a simulator snapshot: the file is too short.")
+        magic, version, count = _HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a simulator snapshot, or one written by an incompatible version.")
+        offset = _HEADER.size
+        if len(view) < offset + (count + 1) * _LENGTH.size:
+            raise ValueError("Not a simulator snapshot: the file is truncated.")
+        lengths = []
+        for _ in range(count + 1):
+            lengths.append(_LENGTH.unpack_from(view, offset)[0])
+            offset += _LENGTH.size
+        if len(view) < offset + sum(lengths):
+            raise ValueError("Not a simulator snapshot: the file is truncated.")
+        chunks = []
+        for length in lengths:
+            chunks.append(view[offset:offset + length])
+            offset += length
+        return cls(bytes(chunks[0]), chunks[1:])
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'Snapshot':
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def take_snapshot(manager) -> Snapshot:
+    """Captures the manager's simulation state."""
+    table = manager.cluster.table
+    size = len(table)
+    jobs = list(manager.jobs)
+    events = sorted(manager.clock._events, key=lambda event: event[:3])
+    state = {
+        "time": manager.time,
+        "seed": manager.seed,
+        "history_limit": manager.history_limit,
+        "terraform_config": manager.terraform_config,
+        "prometheus_config": manager.prometheus_config,
+        "job_id_counter": Job._job_id_counter,
+        "auto_schedule": manager.clock.auto_schedule,
+        "node_ids": [node.id for node in table.nodes],
+        # Swap-removes reorder table rows, so the cluster's own order is kept separately.
+        "node_order": [node._row for node in manager.cluster.values()],
+        "unmanaged": [node.unmanaged for node in table.nodes],
+        "versions": list(table._versions),
+        "capacity": pickle.PickleBuffer(np.ascontiguousarray(table.capacity[:, :size]).copy()),
+        "available": pickle.PickleBuffer(np.ascontiguousarray(table.available[:, :size]).copy()),
+        "version": pickle.PickleBuffer(table.version[:size].copy()),
+        "jobs": [
+            (job.id, job.type.value, job.deadline, job.pytorch_version, job.status.value, job.assigned_node,
+             job.progress, job.error_message, job.submission_time, job.completion_time, job.duration)
+            for job in jobs
+        ],
+        "requirements": pickle.PickleBuffer(np.array([job.requirements for job in jobs], dtype=np.int64).reshape(-1, 3)),
+        "events": [(time, kind, payload.id) for time, kind, _, payload in events if kind != ARRIVAL],
+    }
+    buffers: List[memoryview] = []
+    payload = pickle.dumps(state, protocol=5, buffer_callback=lambda buffer: buffers.append(buffer.raw()))
+    return Snapshot(payload, buffers)
+
+
+def restore_snapshot(manager, snapshot: Snapshot):
+    """Replaces the manager's simulation state with the snapshot's."""
+    restore_state(manager, snapshot.state())
+
+
+def restore_state(manager, state: Dict[str, Any]):
+    """Replaces the manager's simulation state with an unpickled snapshot state.
+
+    The array entries may be any contiguous buffer, so callers that build the
+    state themselves can pass NumPy arrays directly.
+    """
+    # Restoring allocates one object per node and job with nothing to collect;
+    # pausing the cyclic GC stops it from rescanning them as they are created.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        _restore(manager, state)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _restore(manager, state: Dict[str, Any]):
+    # The restored cluster no longer matches an attached terraform.tfstate, so it is detached.
+    manager.tfstate = None
+    node_ids = state["node_ids"]
+    size = len(node_ids)
+
+    table = ClusterTable(capacity=size, indexed=True)
+    table.capacity[:, :size] = np.frombuffer(state["capacity"], dtype=np.int64).reshape(3, size)
+    table.available[:, :size] = np.frombuffer(state["available"], dtype=np.int64).reshape(3, size)
+    table.version[:size] = np.frombuffer(state["version"], dtype=np.int32)
+    for version in state["versions"]:
+        table.intern_version(version)
+    new_node = Node.__new__
+    nodes = table.nodes
+    for row, node_id, unmanaged in zip(range(size), node_ids, state["unmanaged"]):
+        node = new_node(Node)
+        node.id = node_id
+        node._running = {}
+        node.unmanaged = unmanaged
+        node._table = table
+        node._row = row
+        nodes.append(node)
+    table.rebuild_index()
+
+    manager.jobs.clear()
+    manager.clock.clear()
+    cluster = manager.cluster
+    cluster.table = table
+    cluster._nodes = {nodes[row].id: nodes[row] for row in state["node_order"]}
+    requirements = np.frombuffer(state["requirements"], dtype=np.int64).reshape(-1, 3).tolist()
+    new_job = Job.__new__
+    jobs = manager.jobs
+    by_id = {}
+    for row, need in zip(state["jobs"], requirements):
+        job = new_job(Job)
+        (job.id, job_type, job.deadline, job.pytorch_version, status, node_id, job.progress,
+         job.error_message, job.submission_time, job.completion_time, job.duration) = row
+        job._registry = None
+        job.type = JobType(job_type)
+        job.requirements = ResourceVector(*need)
+        job._status = JobStatus(status)
+        job._assigned_node = node_id
+        jobs.add(job)
+        by_id[job.id] = job
+        if job._status is JobStatus.RUNNING and node_id in cluster:
+            cluster[node_id]._running[job.id] = job
+    for time, kind, job_id in state["events"]:
+        job = by_id.get(job_id)
+        if job is not None:
+            manager.clock.schedule(time, kind, job)
+
+    manager.time = state["time"]
+    manager.seed = state["seed"]
+    manager.history_limit = state["history_limit"]
+    manager.terraform_config = state["terraform_config"]
+    manager.prometheus_config = state["prometheus_config"]
+    manager.clock.auto_schedule = state["auto_schedule"]
+    # Samples scraped on the abandoned timeline no longer describe this one.
+    manager.reset_time_series()
+    # Keep new job ids from colliding with restored ones.
+    Job._job_id_counter = max(Job._job_id_counter, state["job_id_counter"])
@@ -0,0 +1,184 @@
+# src/terraform_graph.py
+"""
+Resource dependency graph and the simulated parallel walk of `terraform apply`.
+
+A resource depends on every resource named in its `depends_on` list and on
+every resource its attributes (`count` included) reference, such as
+`cluster_node.base.ram`. `dependency_graph` collects those edges and orders
+the resources so that each comes after everything it depends on, rejecting
+cycles.
+
+`schedule_apply` then runs the plan's node actions on a pool of `parallelism`
+simulated workers: an action becomes ready once every action of the resources
+its resource depends on has finished, ready actions start in topological order
+as workers free up, and each takes its resource's provisioning latency (its
+`provision_latency` attribute, or a default). The walk is simulated, so it
+costs O(n log parallelism) however long the latencies are; it reports the
+simulated wall time next to the critical path (the time with unlimited
+workers) and the total work (the time with one worker).
+Edges are kept between resources rather than instances, so a counted resource
+depending on another costs one edge, not one per pair of instances.
+"""
+import heapq
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.hcl import HCLError, TerraformConfig, references
+
+DEFAULT_PARALLELISM = 10 # As in Terraform
+DEFAULT_LATENCY = 1.0 # Simulated seconds to create, change or destroy one node
+
+# (resource address or None for nodes no longer in the config, payload, latency)
+Action = Tuple[Optional[str], Any, float]
+
+
+class DependencyGraph:
+    """Resource address -> the addresses it depends on, plus a topological order."""
+
+    __slots__ = ("dependencies", "dependents", "order")
+
+    def __init__(self, dependencies: Dict[str, List[str]]):
+        self.dependencies = dependencies
+        self.dependents: Dict[str, List[str]] = {address: [] for address in dependencies}
+        for address, needs in dependencies.items():
+            for need in needs:
+                self.dependents[need].append(address)
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        waiting = {address: len(needs) for address, needs in self.dependencies.items()}
+        ready = deque(address for address, count in waiting.items() if count == 0)
+        order = []
+        while ready:
+            address = ready.popleft()
+            order.append(address)
+            for dependent in self.dependents[address]:
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(self.dependencies):
+            raise HCLError(f"dependency cycle: {' -> '.join(self._cycle(waiting))}")
+        return order
+
+    def _cycle(self, waiting: Dict[str, int]) -> List[str]:
+        # Every resource left waiting depends on another one left waiting, so following them loops.
+        address = next(address for address, count in waiting.items() if count)
+        path: List[str] = []
+        seen: Dict[str, int] = {}
+        while address not in seen:
+            seen[address] = len(path)
+            path.append(address)
+            address = next(need for need in self.dependencies[address] if waiting[need])
+        return path[seen[address]:] + [address]
+
+
+def dependency_graph(config: TerraformConfig) -> DependencyGraph:
+    """The graph of the config's resources. Raises HCLError for unknown resources or a cycle."""
+    dependencies: Dict[str, List[str]] = {}
+    for address, resource in config.resources.items():
+        needs: Dict[str, None] = {}
+        for name, expression in resource.attributes.items():
+            for reference in references(expression):
+                parts = reference.parts
+                if len(parts) < 2 or parts[0] in ("var", "count"):
+                    continue
+                target = f"{parts[0]}.{parts[1]}"
+                if target not in config.resources:
+                    if name == "depends_on":
+                        raise HCLError(f"{address} depends on unknown resource {target}", reference.line)
+                    continue # Left for evaluation to report
+                if target == address:
+                    raise HCLError(f"{address} refers to itself", reference.line)
+                needs[target] = None
+        dependencies[address] = list(needs)
+    return DependencyGraph(dependencies)
+
+
+def resource_address(instance_address: str) -> str:
+    """`cluster_node.gpu` for `cluster_node.gpu[3]`."""
+    return instance_address.split("[", 1)[0]
+
+
+def resource_latencies(config: TerraformConfig, default: float = DEFAULT_LATENCY) -> Dict[str, float]:
+    """Each resource's `provision_latency` in simulated seconds per node, `default` where it has none."""
+    variables = config.variable_values()
+    latencies = {}
+    for address, resource in config.resources.items():
+        expression = resource.attributes.get("provision_latency")
+        latency = default if expression is None else expression.evaluate({"var": variables})
+        if isinstance(latency, bool) or not isinstance(latency, (int, float)) or latency < 0:
+            raise HCLError(f"provision_latency of {address} must be a non-negative number, not {latency!r}", resource.line)
+        latencies[address] = float(latency)
+    return latencies
+
+
+class ApplySchedule:
+    """The order in which a simulated worker pool finished the actions, and how long it took."""
+
+    __slots__ = ("finished", "parallelism", "elapsed", "critical_path", "total_work")
+
+    def __init__(self, finished: List[Any], parallelism: int, elapsed: float, critical_path: float, total_work: float):
+        self.finished = finished # Action payloads in completion order
+        self.parallelism = parallelism
+        self.elapsed = elapsed
+        self.critical_path = critical_path
+        self.total_work = total_work
+
+    def summary(self) -> str:
+        return (f"Simulated apply time: {self.elapsed:g}s with -parallelism={self.parallelism} "
+                f"(critical path {self.critical_path:g}s, total work {self.total_work:g}s).")
+
+
+def schedule_apply(actions: List[Action], graph: DependencyGraph, parallelism: int = DEFAULT_PARALLELISM) -> ApplySchedule:
+    """Walks the actions over the graph with `parallelism` simulated workers."""
+    if parallelism < 1:
+        raise ValueError("parallelism must be at least 1")
+    by_resource: Dict[Optional[str], List[Action]] = {}
+    for action in actions:
+        by_resource.setdefault(action[0], []).append(action)
+
+    # Critical path: a resource's instances can all run at once, so it takes its slowest action.
+    finish: Dict[str, float] = {}
+    for address in graph.order:
+        start = max((finish[need] for need in graph.dependencies[address]), default=0.0)
+        finish[address] = start + max((action[2] for action in by_resource.get(address, ())), default=0.0)
+    critical_path = max(finish.values(), default=0.0)
+    critical_path = max(critical_path, max((action[2] for action in by_resource.get(None, ())), default=0.0))
+    total_work = sum(action[2] for action in actions)
+
+    waiting = {address: len(needs) for address, needs in graph.dependencies.items()}
+    remaining = {address: len(by_resource.get(address, ())) for address in graph.dependencies}
+    ready: deque = deque(by_resource.get(None, ()))
+    released = deque(address for address in graph.order if waiting[address] == 0)
+    running: List[Tuple[float, int, Action]] = []
+    finished = []
+    now = 0.0
+    sequence = 0
+    while True:
+        # Resources whose dependencies are done contribute their actions; ones without actions finish at once.
+        while released:
+            address = released.popleft()
+            if remaining[address]:
+                ready.extend(by_resource[address])
+                continue
+            for dependent in graph.dependents[address]:
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    released.append(dependent)
+        while ready and len(running) < parallelism:
+            action = ready.popleft()
+            heapq.heappush(running, (now + action[2], sequence, action))
+            sequence += 1
+        if not running:
+            break
+        now, _, action = heapq.heappop(running)
+        finished.append(action[1])
+        address = action[0]
+        if address is not None:
+            remaining[address] -= 1
+            if remaining[address] == 0:
+                for dependent in graph.dependents[address]:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        released.append(dependent)
+    return ApplySchedule(finished, parallelism, now, critical_path, total_work)
@@ -0,0 +1,187 @@
+# src/terraform_plan.py
+"""
+Diffs the Terraform config against the simulated cluster.
+
+`desired_nodes` expands every `cluster_node` resource of a parsed config, count
+included, into the nodes it declares, keyed by node id and evaluated in
+dependency order so resources can reference each other: instances of
+`cluster_node.default` are `node-0`, `node-1`, ...; other resources are named
+after the resource, with `-<index>` under `count`, unless they set `name`.
+
+`compute_plan` compares each desired node's (cpu, gpu, ram, pytorch_version)
+with the managed nodes of the cluster, read straight from its table, and
+returns the nodes to create, update in place and destroy. Unmanaged nodes are
+never changed. Both are one pass over the config and one over the cluster, and
+applying a plan makes exactly its changes, so a second apply of the same
+config finds nothing to do.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.hcl import HCLError, Resource, TerraformConfig, references
+from src.terraform_graph import dependency_graph
+
+# (cpu, gpu, ram, pytorch_version): compared as a whole to decide whether a node changed.
+NodeSpec = Tuple[int, int, int, str]
+
+REQUIRED = ("cpu", "gpu", "ram", "pytorch_version")
+LISTED_CHANGES = 20 # Changes printed per kind of action; the rest are counted
+
+
+def node_id(resource_name: str, index: Optional[int]) -> str:
+    if resource_name == "default":
+        return f"node-{index or 0}"
+    return resource_name if index is None else f"{resource_name}-{index}"
+
+
+def node_spec(resource: Resource, attributes: Dict) -> NodeSpec:
+    for name in REQUIRED:
+        if name not in attributes:
+            raise HCLError(f"{resource.address} has no {name}", resource.line)
+    try:
+        cpu, gpu, ram = (int(attributes[name]) for name in ("cpu", "gpu", "ram"))
+    except (TypeError, ValueError):
+        raise HCLError(f"cpu, gpu and ram of {resource.address} must be numbers", resource.line) from None
+    if min(cpu, gpu, ram) < 0:
+        raise HCLError(f"cpu, gpu and ram of {resource.address} cannot be negative", resource.line)
+    return (cpu, gpu, ram, str(attributes["pytorch_version"]))
+
+
+def desired_nodes(config: TerraformConfig) -> Dict[str, Tuple[str, NodeSpec]]:
+    """node id -> (resource address, spec) for every cluster_node instance the config declares.
+
+    Resources are evaluated in dependency order, so attributes may reference
+    resources declared later in the file. Raises HCLError for a resource that
+    does not evaluate, lacks an attribute, declares a node id another instance
+    already has, or is part of a dependency cycle.
+    """
+    variables = config.variable_values()
+    graph = dependency_graph(config)
+    evaluated: Dict[str, Dict[str, Any]] = {} # resource type -> name -> values, for references
+    desired: Dict[str, Tuple[str, NodeSpec]] = {}
+    for address in graph.order:
+        resource = config.resources[address]
+        referenced = bool(graph.dependents[address])
+        if resource.type != "cluster_node":
+            if referenced:
+                count = resource.count(variables, evaluated)
+                values = (resource.evaluate(variables, None, evaluated) if count is None
+                          else [resource.evaluate(variables, index, evaluated) for index in range(count)])
+                evaluated.setdefault(resource.type, {})[resource.name] = values
+            continue
+        count = resource.count(variables, evaluated)
+        # Instances only differ if an attribute reads count.index; otherwise evaluate once.
+        per_instance = any(
+            reference.parts[0] == "count"
+            for expression in resource.attributes.values()
+            for reference in references(expression)
+        )
+        shared = None
+        instances = []
+        for index in (None,) if count is None else range(count):
+            if shared is None or per_instance:
+                attributes = resource.evaluate(variables, index, evaluated)
+                shared = attributes, node_spec(resource, attributes)
+            attributes, spec = shared
+            instance = resource.address if index is None else f"{resource.address}[{index}]"
+            name = attributes.get("name") or node_id(resource.name, index)
+            if name in desired:
+                raise HCLError(f"{instance} and {desired[name][0]} both declare node '{name}'", resource.line)
+            desired[name] = (instance, spec)
+            if referenced:
+                instances.append(dict(attributes, id=name))
+        if referenced:
+            evaluated.setdefault(resource.type, {})[resource.name] = instances[0] if count is None else instances
+    return desired
+
+
+class Plan:
+    """The changes that bring the managed nodes in line with the config."""
+
+    __slots__ = ("create", "update", "destroy", "unchanged", "errors")
+
+    def __init__(self):
+        self.create: List[Tuple[str, str, NodeSpec]] = [] # (node id, address, spec)
+        self.update: List[Tuple[str, str, NodeSpec]] = []
+        self.destroy: List[str] = []
+        self.unchanged = 0
+        self.errors: List[str] = [] # Changes that cannot be made; a plan with errors is not applied
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.create or self.update or self.destroy)
+
+    def summary(self) -> str:
+        return f"Plan: {len(self.create)} to add, {len(self.update)} to change, {len(self.destroy)} to destroy."
+
+    def describe(self) -> str:
+        """The plan as `terraform plan` prints it."""
+        if self.errors:
+            return "\n".join(f"Error: {error}" for error in self.errors)
+        if not self.has_changes:
+            return "No changes. Your infrastructure matches the configuration."
+        lines = []
+        for symbol, changes in (("+", self.create), ("~", self.update)):
+            lines.extend(f"  {symbol} {node} ({address}): {_format(spec)}" for node, address, spec in changes[:LISTED_CHANGES])
+            if len(changes) > LISTED_CHANGES:
+                lines.append(f"  ... and {len(changes) - LISTED_CHANGES} more")
+        lines.extend(f"  - {node}" for node in self.destroy[:LISTED_CHANGES])
+        if len(self.destroy) > LISTED_CHANGES:
+            lines.append(f"  ... and {len(self.destroy) - LISTED_CHANGES} more")
+        lines.append(self.summary())
+        if self.create and not self.update and not self.destroy:
+            lines.append(f"Terraform will create {len(self.create)} new nodes.")
+        return "\n".join(lines)
+
+
+def _format(spec: NodeSpec) -> str:
+    cpu, gpu, ram, version = spec
+    return f"cpu={cpu} gpu={gpu} ram={ram} pytorch_version={version}"
+
+
+def compute_plan(desired: Dict[str, Tuple[str, NodeSpec]], cluster, target: Optional[str] = None) -> Plan:
+    """The plan that turns the managed nodes of `cluster` into `desired`, or only the `target` node."""
+    table = cluster.table
+    size = len(table.nodes)
+    cpus, gpus, rams = table.capacity[:, :size].tolist()
+    used = (table.capacity[:, :size] - table.available[:, :size]).T.tolist()
+    names = {}
+    versions = [names.get(code) or names.setdefault(code, table.version_name(code)) for code in table.version[:size].tolist()]
+
+    plan = Plan()
+    seen = set()
+    for row, node in enumerate(table.nodes):
+        name = node.id
+        if target is not None and name != target:
+            continue
+        found = desired.get(name)
+        if node.unmanaged:
+            if found is not None:
+                plan.errors.append(f"node '{name}' already exists but is not managed by Terraform; import it first.")
+                seen.add(name)
+            continue
+        if found is None:
+            if node.running_jobs:
+                plan.errors.append(f"cannot destroy node '{name}': it has running jobs.")
+            plan.destroy.append(name)
+            continue
+        seen.add(name)
+        address, spec = found
+        if spec == (cpus[row], gpus[row], rams[row], versions[row]):
+            plan.unchanged += 1
+            continue
+        if node.running_jobs:
+            if spec[3] != versions[row]:
+                plan.errors.append(f"cannot update node '{name}' in place: its running jobs need pytorch_version {versions[row]}.")
+            elif any(new < need for new, need in zip(spec, used[row])):
+                plan.errors.append(f"cannot update node '{name}' in place: its running jobs need more than the new capacity.")
+        plan.update.append((name, address, spec))
+
+    if target is None:
+        plan.create = [(name, address, spec) for name, (address, spec) in desired.items() if name not in seen]
+    elif target not in seen and not plan.destroy:
+        if target in desired:
+            address, spec = desired[target]
+            plan.create.append((target, address, spec))
+        elif target not in cluster:
+            plan.errors.append(f"target node '{target}' is neither in the config nor in the cluster.")
+    return plan
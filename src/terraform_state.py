@@ -0,0 +1,256 @@
+# src/terraform_state.py
+"""
+A `terraform.tfstate` file for the simulated cluster, with a write-ahead journal.
+
+The state file is JSON in the layout Terraform uses (version 4, one resource
+per managed node), written one resource per line so it can be read back in
+runs of lines instead of being parsed as a single document. State files in
+any other JSON layout are still read, just not streamed.
+
+Changes are not written to the state file itself. Each `commit` appends its
+node puts and deletes to `<state>.journal` as JSON lines, followed by a commit
+record carrying the new serial, and fsyncs the journal. Loading replays the
+committed transactions in order; a transaction cut short by a crash has no
+commit record and is dropped, along with any torn last line. Once the
+journal holds more records than the state has nodes, it is compacted: the
+whole state is written to a temporary file, fsynced and renamed over the state
+file, and only then is the journal emptied. Replay skips commits whose serial
+the state file already includes, so a crash between the rename and the
+truncation loses nothing and applies nothing twice.
+"""
+import json
+import os
+import tempfile
+import uuid
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from src.terraform_plan import NodeSpec
+
+STATE_VERSION = 4
+TERRAFORM_VERSION = "1.5.7"
+PROVIDER_NAME = "registry.terraform.io/ai-ops/simulator"
+PROVIDER = f'provider["{PROVIDER_NAME}"]'
+JOURNAL_SUFFIX = ".journal"
+STREAM_CHUNK = 4_096 # Resource lines parsed per json.loads call while streaming a state file
+COMPACT_MIN = 1_000 # Journal records always allowed before compacting, however small the state
+
+_dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class StateError(ValueError):
+    """A state file that cannot be read as Terraform state."""
+
+
+def _resource_line(node_id: str, spec: NodeSpec) -> str:
+    cpu, gpu, ram, version = spec
+    attributes = _dumps({"id": node_id, "cpu": cpu, "gpu": gpu, "ram": ram, "pytorch_version": version})
+    return (f'{{"mode":"managed","type":"cluster_node","name":{_dumps(node_id)},"provider":{_dumps(PROVIDER)},'
+            f'"instances":[{{"schema_version":0,"attributes":{attributes}}}]}}')
+
+
+def _spec(attributes: Dict) -> Tuple[str, NodeSpec]:
+    try:
+        return str(attributes["id"]), (int(attributes["cpu"]), int(attributes["gpu"]), int(attributes["ram"]),
+                                        str(attributes["pytorch_version"]))
+    except (KeyError, TypeError, ValueError) as e:
+        raise StateError(f"cluster_node instance with bad attributes: {e}") from None
+
+
+def _instances(resource: Dict) -> Iterator[Tuple[str, NodeSpec]]:
+    if resource.get("mode", "managed") != "managed" or resource.get("type") != "cluster_node":
+        return
+    for instance in resource.get("instances") or ():
+        yield _spec(instance.get("attributes") or {})
+
+
+def _parse_lines(lines: List[bytes]) -> List[Tuple[str, NodeSpec]]:
+    # Resource lines end in commas, so a run of them is a JSON array once bracketed.
+    body = b"".join(lines).rstrip().rstrip(b",")
+    parsed = []
+    for resource in json.loads(b"[" + body + b"]"):
+        instances = resource.get("instances")
+        if resource.get("type") == "cluster_node" and resource.get("mode") == "managed" and isinstance(instances, list) and len(instances) == 1:
+            parsed.append(_spec(instances[0].get("attributes") or {})) # The layout `lines` writes
+        else:
+            parsed.extend(_instances(resource))
+    return parsed
+
+
+class TerraformState:
+    """The managed nodes recorded in a state file and its journal."""
+
+    def __init__(self, path: str, compact_min: int = COMPACT_MIN):
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.compact_min = compact_min
+        self.resources: Dict[str, NodeSpec] = {} # node id -> spec
+        self.serial = 0
+        self.lineage = str(uuid.uuid4())
+        self._journal_records = 0
+
+    @classmethod
+    def open(cls, path: str, compact_min: int = COMPACT_MIN) -> 'TerraformState':
+        """Loads the state at `path`, replaying its journal, or starts an empty one if there is none."""
+        state = cls(path, compact_min)
+        exists = os.path.exists(path)
+        if exists:
+            state._read_state()
+        state._replay_journal()
+        if not exists:
+            state.compact() # Creates the file, so a bad path fails here rather than on the first apply
+        return state
+
+    # --- Reading ---
+    def _read_state(self):
+        with open(self.path, "rb") as f:
+            header = f.readline()
+            if not header.rstrip().endswith(b'"resources":['):
+                f.seek(0)
+                self._read_document(f)
+                return
+            try:
+                head = json.loads(header.rstrip()[:-len(b'"resources":[')].rstrip(b", ") + b"}")
+                resources = self.resources
+                chunk: List[bytes] = []
+                for line in f:
+                    if line.strip() == b"]}":
+                        break
+                    chunk.append(line)
+                    if len(chunk) == STREAM_CHUNK:
+                        resources.update(_parse_lines(chunk))
+                        chunk = []
+                else:
+                    raise StateError(f"{self.path} ends before its resource list does")
+                resources.update(_parse_lines(chunk))
+            except ValueError as e:
+                raise StateError(f"{self.path} is not valid Terraform state: {e}") from None
+            self._read_head(head)
+
+    def _read_document(self, f):
+        try:
+            document = json.load(f)
+        except ValueError as e:
+            raise StateError(f"{self.path} is not valid Terraform state: {e}") from None
+        if not isinstance(document, dict) or not isinstance(document.get("resources", []), list):
+            raise StateError(f"{self.path} is not valid Terraform state")
+        for resource in document.get("resources", []):
+            for node_id, spec in _instances(resource):
+                self.resources[node_id] = spec
+        self._read_head(document)
+
+    def _read_head(self, head: Dict):
+        if head.get("version") != STATE_VERSION:
+            raise StateError(f"{self.path} is state version {head.get('version')}, not {STATE_VERSION}")
+        self.serial = int(head.get("serial", 0))
+        self.lineage = head.get("lineage") or self.lineage
+
+    def _replay_journal(self):
+        """Applies every committed transaction newer than the state file and cuts off anything after the last."""
+        try:
+            f = open(self.journal_path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            pending = []
+            committed_end = 0
+            records = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break # Torn write
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not isinstance(record, dict):
+                    break
+                if "commit" not in record:
+                    pending.append(record)
+                    continue
+                serial = record["commit"]
+                if serial > self.serial:
+                    for change in pending:
+                        if "put" in change:
+                            self.resources[change["put"]] = tuple(change["spec"])
+                        else:
+                            self.resources.pop(change["delete"], None)
+                    self.serial = serial
+                records += len(pending) + 1
+                pending = []
+                committed_end = f.tell()
+            size = f.seek(0, os.SEEK_END)
+        self._journal_records = records
+        if committed_end != size:
+            # Appending after a torn transaction would glue new records onto it.
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(committed_end)
+                os.fsync(f.fileno())
+
+    # --- Writing ---
+    def commit(self, puts: Iterable[Tuple[str, NodeSpec]] = (), deletes: Iterable[str] = ()):
+        """Records node changes as one transaction; compacts the journal once it outgrows the state."""
+        puts = list(puts)
+        deletes = [node_id for node_id in deletes if node_id in self.resources]
+        if not puts and not deletes:
+            return
+        lines = [_dumps({"put": node_id, "spec": spec}) for node_id, spec in puts]
+        lines.extend(_dumps({"delete": node_id}) for node_id in deletes)
+        lines.append(_dumps({"commit": self.serial + 1}))
+        with open(self.journal_path, "ab") as f:
+            f.write(("\n".join(lines) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        # Only a durable transaction changes the state in memory.
+        self.serial += 1
+        self.resources.update(puts)
+        for node_id in deletes:
+            del self.resources[node_id]
+        self._journal_records += len(lines)
+        if self._journal_records > max(self.compact_min, len(self.resources)):
+            try:
+                self.compact()
+            except OSError:
+                pass # The journal already holds the transaction; compaction is retried on the next commit
+
+    def compact(self):
+        """Writes the whole state to the state file and empties the journal."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tfstate-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for chunk in self.lines():
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        _fsync_directory(directory)
+        with open(self.journal_path, "wb") as f:
+            os.fsync(f.fileno())
+        self._journal_records = 0
+
+    def lines(self) -> Iterator[str]:
+        """The state file's text, a line at a time."""
+        head = _dumps({"version": STATE_VERSION, "terraform_version": TERRAFORM_VERSION, "serial": self.serial,
+                       "lineage": self.lineage, "outputs": {}})
+        yield head[:-1] + ',"resources":[\n'
+        last = len(self.resources) - 1
+        for i, (node_id, spec) in enumerate(self.resources.items()):
+            yield _resource_line(node_id, spec) + (",\n" if i != last else "\n")
+        yield "]}\n"
+
+
+def _fsync_directory(directory: str):
+    """Makes a rename in `directory` durable, where the platform allows opening directories."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,345 @@
+# src/timeseries.py
+"""
+An embedded time-series store for the simulation, kept in NumPy ring buffers.
+
+Series are rows and sample times are columns. Each retention tier is a
+(series x slots) float32 array used as a ring: the sample for time t lives in
+column (t // step) % slots, and the tier remembers which time each column
+holds, so every series shares one time axis and a scrape writes one column for
+all of them at once. The raw tier is written at the scrape interval; each
+coarser tier receives the averages of the tier below as its buckets complete,
+stamped with the time each bucket starts.
+
+Memory is fixed by the tiers and `max_series`. With the default tiers (15s for
+a day, 5m for a week, 1h for 30 days) a series costs 34 KB, so 10,000 series
+take 340 MB however long the simulation runs. Once the store is full, new
+series take over the rows of series that are no longer scraped, oldest first,
+and are only dropped when every series is still live.
+
+`Scraper` samples the manager at every scrape time the event clock passes:
+the cpu/gpu/ram utilisation of each node and the progress of each running
+job. Between two events only job progress changes, and it grows linearly, so
+all the scrapes between two events are computed as one block.
+"""
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.cluster_table import RESOURCE_KEYS
+
+DAY = 86_400
+# (step, slots) per tier, finest first: 15s for a day, 5m for a week, 1h for 30 days.
+DEFAULT_TIERS = ((15, 5_760), (300, 2_016), (3_600, 720))
+DEFAULT_SCRAPE_INTERVAL = 15
+MAX_SERIES = 10_000
+APPEND_CHUNK = 256 # Scrapes written per block, which bounds the temporary (series x scrapes) array
+
+NODE_UTILIZATION = "ai_ops_node_utilization"
+JOB_PROGRESS = "ai_ops_job_progress"
+LABEL_NAMES = {
+    NODE_UTILIZATION: ("node", "resource"),
+    JOB_PROGRESS: ("job", "node", "type"),
+}
+
+# (metric, *label values)
+SeriesKey = Tuple[str, ...]
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3_600, "d": DAY, "w": 7 * DAY}
+_DURATION = re.compile(r"(\d+)([smhdw])")
+
+
+def parse_duration(text: str) -> int:
+    """Seconds in a Prometheus duration such as `15s`, `5m` or `1h30m`. Raises ValueError."""
+    parts = _DURATION.findall(text)
+    if not parts or "".join(number + unit for number, unit in parts) != text:
+        raise ValueError(f"invalid duration {text!r}")
+    return sum(int(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def scrape_interval(prometheus_config: str) -> int:
+    """The global `scrape_interval` of a prometheus.yml, in seconds, or the default."""
+    match = re.search(r"^\s*scrape_interval:\s*['\"]?(\w+)", prometheus_config, re.MULTILINE)
+    if match:
+        try:
+            return parse_duration(match.group(1)) or DEFAULT_SCRAPE_INTERVAL
+        except ValueError:
+            pass
+    return DEFAULT_SCRAPE_INTERVAL
+
+
+def tiers_for(interval: int) -> Tuple[Tuple[int, int], ...]:
+    """A day of raw samples at `interval`, then the default coarser tiers it divides evenly."""
+    tiers = [(interval, max(2, DAY // interval))]
+    for step, slots in DEFAULT_TIERS[1:]:
+        if step > tiers[-1][0] * 2 and step % tiers[-1][0] == 0:
+            tiers.append((step, slots))
+    return tuple(tiers)
+
+
+class Tier:
+    """One ring of (series x slots) samples at a fixed step."""
+
+    __slots__ = ("step", "slots", "values", "times", "flushed")
+
+    def __init__(self, step: int, slots: int, rows: int):
+        self.step = step
+        self.slots = slots
+        self.values = np.full((rows, slots), np.nan, dtype=np.float32)
+        self.times = np.full(slots, -1, dtype=np.int64) # The sample time each column holds
+        self.flushed: Optional[int] = None # Start of the first bucket not yet filled from the tier below
+
+    @property
+    def span(self) -> int:
+        return self.step * self.slots
+
+    def oldest(self) -> Optional[int]:
+        held = self.times[self.times >= 0]
+        return int(held.min()) if len(held) else None
+
+    def grid(self, start: int, end: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Step-aligned times in [start, end], their columns and whether the ring still holds them."""
+        first = -(-start // self.step) * self.step
+        times = np.arange(first, end + 1, self.step, dtype=np.int64)
+        columns = (times // self.step) % self.slots
+        return times, columns, self.times[columns] == times
+
+    def write(self, times: np.ndarray, rows: np.ndarray, block: np.ndarray, size: int):
+        """Stores a (rows x times) block; series not in `rows` have no sample at those times."""
+        columns = (times // self.step) % self.slots
+        if len(rows) < size: # Rows are distinct, so otherwise the block covers every series
+            self.values[:size, columns] = np.nan
+        self.values[rows[:, None], columns[None, :]] = block
+        self.times[columns] = times
+
+    def resize(self, rows: int):
+        values = np.full((rows, self.slots), np.nan, dtype=np.float32)
+        keep = min(rows, self.values.shape[0])
+        values[:keep] = self.values[:keep]
+        self.values = values
+
+
+class TimeSeriesStore:
+    """Series keyed by metric and label values, sampled on one shared clock into ring-buffer tiers."""
+
+    def __init__(self, tiers: Sequence[Tuple[int, int]] = DEFAULT_TIERS, max_series: int = MAX_SERIES):
+        for (fine, fine_slots), (coarse, _) in zip(tiers, tiers[1:]):
+            if coarse % fine or fine * fine_slots < 2 * coarse:
+                raise ValueError(f"a {coarse}s tier needs a finer tier whose step divides it and that spans two of its steps")
+        self.max_series = max_series
+        self.tiers = [Tier(step, slots, min(16, max_series)) for step, slots in tiers]
+        self.keys: List[Optional[SeriesKey]] = []
+        self.index: Dict[SeriesKey, int] = {}
+        self.by_metric: Dict[str, Dict[int, None]] = {}
+        self.last_seen = np.full(self.tiers[0].values.shape[0], -1, dtype=np.int64)
+        self.first: Optional[int] = None # Time of the first sample
+        self.latest = -1 # Time of the last sample
+        self.dropped = 0 # Samples of new series turned away because every row was live
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def step(self) -> int:
+        return self.tiers[0].step
+
+    @property
+    def horizon(self) -> int:
+        """How far back the coarsest tier reaches."""
+        return self.tiers[-1].span
+
+    def memory(self) -> int:
+        """Bytes held by the sample arrays."""
+        return sum(tier.values.nbytes + tier.times.nbytes for tier in self.tiers) + self.last_seen.nbytes
+
+    def labels(self, row: int) -> Dict[str, str]:
+        key = self.keys[row]
+        return dict(zip(LABEL_NAMES[key[0]], key[1:]))
+
+    def metric_rows(self, metric: str) -> List[int]:
+        return list(self.by_metric.get(metric, ()))
+
+    # --- Series ---
+    def rows(self, keys: List[SeriesKey], now: int) -> np.ndarray:
+        """The row of each series, adding missing ones; -1 for series the store has no room for."""
+        index = self.index
+        rows = [index.get(key, -1) for key in keys]
+        missing = [i for i, row in enumerate(rows) if row < 0]
+        if missing:
+            self.last_seen[[row for row in rows if row >= 0]] = now # Keep the found series from being evicted
+            for i, row in zip(missing, self._allocate(len(missing), now)):
+                if row < 0:
+                    self.dropped += 1
+                    continue
+                key = keys[i]
+                rows[i] = row
+                self.keys[row] = key
+                index[key] = row
+                self.by_metric.setdefault(key[0], {})[row] = None
+                self.last_seen[row] = now
+        return np.array(rows, dtype=np.int64)
+
+    def _allocate(self, count: int, now: int) -> List[int]:
+        rows: List[int] = []
+        grow = min(count, self.max_series - len(self.keys))
+        if grow > 0:
+            start = len(self.keys)
+            self.keys.extend([None] * grow)
+            if len(self.keys) > self.last_seen.shape[0]:
+                self._resize(min(self.max_series, max(len(self.keys), 2 * self.last_seen.shape[0])))
+            rows.extend(range(start, start + grow))
+            self.last_seen[start:start + grow] = now # Live from the start, so they are not evicted below
+        if len(rows) < count:
+            rows.extend(self._evict(count - len(rows)))
+        return rows + [-1] * (count - len(rows))
+
+    def _evict(self, count: int) -> List[int]:
+        """Takes over the rows of up to `count` series that missed the last scrape, oldest first."""
+        size = len(self.keys)
+        stale = np.flatnonzero(self.last_seen[:size] < self.latest)
+        if len(stale) > count:
+            stale = stale[np.argpartition(self.last_seen[stale], count - 1)[:count]]
+        rows = stale.tolist()
+        for row in rows:
+            key = self.keys[row]
+            del self.index[key]
+            del self.by_metric[key[0]][row]
+            self.keys[row] = None
+            for tier in self.tiers:
+                tier.values[row] = np.nan
+        return rows
+
+    def _resize(self, rows: int):
+        for tier in self.tiers:
+            tier.resize(rows)
+        last_seen = np.full(rows, -1, dtype=np.int64)
+        last_seen[:len(self.last_seen)] = self.last_seen
+        self.last_seen = last_seen
+
+    # --- Samples ---
+    def append(self, times: np.ndarray, rows: np.ndarray, block: np.ndarray):
+        """Records block[i, j] for series rows[i] at times[j], then downsamples into the coarser tiers.
+
+        `times` must be ascending multiples of the raw step after `latest`, and
+        span no more than the raw tier holds.
+        """
+        if len(times) == 0:
+            return
+        kept = rows >= 0
+        if not kept.all():
+            rows, block = rows[kept], block[kept]
+        size = len(self.keys)
+        self.tiers[0].write(times, rows, block, size)
+        self.last_seen[rows] = times[-1]
+        if self.first is None:
+            self.first = int(times[0])
+        self.latest = int(times[-1])
+        for fine, coarse in zip(self.tiers, self.tiers[1:]):
+            if coarse.flushed is None:
+                coarse.flushed = int(times[0]) - int(times[0]) % coarse.step
+            self._downsample(fine, coarse, size)
+
+    def _downsample(self, fine: Tier, coarse: Tier, size: int):
+        """Fills every coarse bucket the fine tier has completed with the mean of its samples."""
+        done = (self.latest // coarse.step) * coarse.step # Buckets before this one are complete
+        start = max(coarse.flushed, done - coarse.span)
+        if start >= done:
+            return
+        coarse.flushed = done
+        starts = np.arange(start, done, coarse.step, dtype=np.int64)
+        grid = starts[:, None] + np.arange(0, coarse.step, fine.step, dtype=np.int64)[None, :]
+        columns = (grid // fine.step) % fine.slots
+        samples = fine.values[:size][:, columns] # (series, buckets, fine steps per bucket)
+        samples[:, fine.times[columns] != grid] = np.nan
+        present = ~np.isnan(samples)
+        counts = present.sum(axis=2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(present, samples, 0).sum(axis=2) / counts
+        coarse.write(starts, np.arange(size), means, size)
+
+    def tier_for(self, start: int) -> Tier:
+        """The finest tier holding every sample taken since `start`, or the one reaching furthest back."""
+        best = None
+        for tier in self.tiers:
+            oldest = tier.oldest()
+            if oldest is None:
+                continue
+            if oldest <= max(-(-start // tier.step) * tier.step, self.first - self.first % tier.step):
+                return tier
+            if best is None or oldest < best[0]:
+                best = (oldest, tier)
+        return self.tiers[0] if best is None else best[1]
+
+    def window(self, rows: Sequence[int], start: int, end: int, cover: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(times, series x times matrix) for [start, end]; NaN where absent.
+
+        The samples come from the finest tier holding everything since `cover`
+        (by default `start`), for reads that can do without their oldest part.
+        """
+        tier = self.tier_for(start if cover is None else cover)
+        oldest = tier.oldest()
+        if oldest is not None:
+            start = max(start, oldest, end - tier.span + tier.step)
+        times, columns, held = tier.grid(start, end)
+        values = tier.values.take(rows, axis=0).take(columns, axis=1)
+        values[:, ~held] = np.nan
+        return times, values
+
+
+class Scraper:
+    """Samples node utilisation and job progress into a TimeSeriesStore at every scrape time."""
+
+    def __init__(self, manager, store: TimeSeriesStore):
+        self.manager = manager
+        self.store = store
+        step = store.step
+        self.next_due = -(-manager.time // step) * step
+        self._nodes: Optional[List] = None # The nodes _node_rows was looked up for
+        self._node_rows = np.empty(0, dtype=np.int64)
+
+    def scrape_until(self, until: int):
+        """Records every scrape due at or before `until`, with the current cluster and jobs."""
+        store = self.store
+        step = store.step
+        if until < self.next_due:
+            return
+        last = until - until % step
+        # Nothing older than the coarsest tier is kept, so a long jump skips straight to it.
+        first = max(self.next_due, last - store.horizon + step)
+        self.next_due = last + step
+
+        node_rows, node_values = self._node_samples(first)
+        job_rows, started, durations = self._job_samples(first)
+        rows = np.concatenate([node_rows, job_rows])
+        nodes = len(node_rows)
+        for start in range(first, last + 1, step * APPEND_CHUNK):
+            times = np.arange(start, min(last, start + step * (APPEND_CHUNK - 1)) + 1, step, dtype=np.int64)
+            block = np.empty((len(rows), len(times)), dtype=np.float32)
+            block[:nodes] = node_values[:, None]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                progress = (times[None, :] - started[:, None]) / durations[:, None]
+            block[nodes:] = np.clip(np.nan_to_num(progress, nan=1.0, posinf=1.0), 0.0, 1.0)
+            store.append(times, rows, block)
+
+    def _node_samples(self, now: int) -> Tuple[np.ndarray, np.ndarray]:
+        table = self.manager.cluster.table
+        size = len(table.nodes)
+        rows = self._node_rows
+        # Rows written at the last scrape cannot have been evicted since, so the lookup only repeats when nodes change.
+        if self._nodes != table.nodes or (self.store.last_seen[rows] < self.store.latest).any() or (rows < 0).any():
+            ids = [node.id for node in table.nodes]
+            self._node_rows = self.store.rows([(NODE_UTILIZATION, node, key) for key in RESOURCE_KEYS for node in ids], now)
+            self._nodes = list(table.nodes)
+        capacity = table.capacity[:, :size].astype(np.float64)
+        used = capacity - table.available[:, :size]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            utilization = np.where(capacity > 0, used / capacity, 0.0)
+        return self._node_rows, utilization.ravel()
+
+    def _job_samples(self, now: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        from src.tutorial_manager import JobStatus # The manager module imports this one
+        running = list(self.manager.jobs.with_status(JobStatus.RUNNING))
+        rows = self.store.rows([(JOB_PROGRESS, job.id, job.assigned_node or "", job.type.value) for job in running], now)
+        started = np.array([job.submission_time or 0 for job in running], dtype=np.float64)
+        durations = np.array([job.duration for job in running], dtype=np.float64)
+        return rows, started, durations
@@ -0,0 +1,343 @@
+# src/tutorial_catalog.py
+"""
+Lazily loaded tutorial catalog.
+
+Listing tutorials only needs each tutorial's id, name, description and
+skills, so the catalog reads those from the source of every tutorial module
+with `ast` instead of executing it. A module is executed, building its steps,
+trigger lambdas and imports, only when one of its tutorials is first asked
+for its `steps` or `module`. Modules whose metadata cannot be read statically
+(for example a computed TUTORIALS dict) are loaded eagerly, as before.
+
+The metadata and compiled modules are kept in an on-disk cache (see
+`catalog_cache`), so on a warm start only files that changed are read.
+
+When a module is loaded, string triggers are compiled into callables and every
+`custom_setup` snippet it passes to `setup_tutorial_state` is compiled once,
+so step transitions only run precompiled code. Snippets that do not compile
+are reported then, not when (or if) their step runs. Each tutorial is also
+compiled into its step state machine (see `tutorial_steps`) under `compiled`.
+"""
+import ast
+import functools
+import importlib.util
+import os
+import re
+import textwrap
+import types
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.catalog_cache import CatalogCache, default_cache_dir, source_hash
+from src.tutorial_steps import compile_tutorial
+
+TUTORIAL_DIR = "src/tutorials"
+DEFERRED_KEYS = ("steps", "module", "compiled")
+PARALLEL_SCAN_MIN = 64  # Files to scan before worker processes pay for their startup
+
+# A `"steps": [` line and the `]` that closes it at the same indentation.
+STEPS_BLOCK = re.compile(
+    r"""^(?P<indent>[ \t]*)(?P<key>(["'])steps\3[ \t]*:[ \t]*)\[[ \t]*\n(?:[^\n]*\n)*?(?P=indent)\]""",
+    re.MULTILINE,
+)
+
+Catalog = Dict[str, Dict[str, 'TutorialEntry']]
+
+
+class TutorialEntry(dict):
+    """A tutorial's info dict whose `steps` and `module` are loaded on first access."""
+
+    __slots__ = ("_source",)
+
+    def __init__(self, info: Dict[str, Any], source: Optional['TutorialModule'] = None):
+        super().__init__(info)
+        self._source = source
+
+    @property
+    def loaded(self) -> bool:
+        return self._source is None
+
+    def load(self) -> 'TutorialEntry':
+        if self._source is not None:
+            self._source.load()
+        return self
+
+    def __missing__(self, key):
+        if key in DEFERRED_KEYS and self._source is not None:
+            self._source.load()
+            if key in self:
+                return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+
+class TutorialModule:
+    """One tutorial file, executed at most once to fill in its entries."""
+
+    def __init__(self, path: str, digest: Optional[str] = None, cache: Optional[CatalogCache] = None):
+        self.path = path
+        self.digest = digest
+        self.cache = cache
+        self.entries: Dict[str, TutorialEntry] = {}
+        self.module = None
+
+    def load(self):
+        if self.module is not None:
+            return
+        self.module = _exec_module(self.path, _code(self.path, self.digest, self.cache))
+        _report(self.path, compile_snippets(self.module, self.path))
+        tutorials = getattr(self.module, 'TUTORIALS', {})
+        for tutorial_id, entry in self.entries.items():
+            entry.update(tutorials.get(tutorial_id, {}))
+            entry["module"] = self.module
+            entry._source = None
+            _compile_entry(tutorial_id, entry)
+
+
+def _compile_entry(tutorial_id: str, entry: 'TutorialEntry'):
+    try:
+        entry["compiled"] = compile_tutorial(tutorial_id, entry)
+    except (KeyError, TypeError, AttributeError):
+        pass  # Malformed steps; starting the tutorial raises, and `tutorial validate` explains
+
+
+def _exec_module(path: str, code=None):
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    if code is None:
+        spec.loader.exec_module(module)
+    else:
+        exec(code, module.__dict__)
+    return module
+
+
+def _code(path: str, digest: Optional[str], cache: Optional[CatalogCache]):
+    if cache is None:
+        return None
+    try:
+        return cache.code(path, digest)
+    except OSError:
+        return None  # Let the regular import report it
+
+
+@functools.lru_cache(maxsize=None)
+def compile_setup(source: str) -> types.CodeType:
+    """The code of a `custom_setup` snippet, dedented and compiled once per distinct snippet."""
+    return compile(textwrap.dedent(source), "<custom_setup>", "exec")
+
+
+def compile_snippets(module, path: str) -> List[str]:
+    """Compiles a loaded tutorial module's string triggers and custom_setup snippets.
+
+    String triggers are replaced by the callables they evaluate to, in the
+    module's namespace. Returns a message for every snippet that failed; a
+    trigger that fails is removed from its step.
+    """
+    errors = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            sources = [ast.parse(f.read(), filename=path)]
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        sources = []
+    tutorials = getattr(module, 'TUTORIALS', None)
+    for tutorial_id, info in (tutorials.items() if isinstance(tutorials, dict) else ()):
+        for number, step in enumerate(info.get("steps") or (), 1):
+            trigger = step.get("trigger") if isinstance(step, dict) else None
+            if not isinstance(trigger, str):
+                continue
+            where = f"tutorial '{tutorial_id}' step {number}"
+            try:
+                sources.append(ast.parse(trigger, filename=f"<{where}>", mode="eval"))
+                step["trigger"] = eval(compile(trigger, f"<{where}>", "eval"), module.__dict__)
+                if not callable(step["trigger"]):
+                    raise TypeError("trigger is not callable")
+            except Exception as e:
+                del step["trigger"]
+                errors.append(f"{where}: trigger {type(e).__name__}: {e}")
+    for tree in sources:
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call):
+                continue
+            for keyword in node.keywords:
+                if keyword.arg == "custom_setup" and isinstance(keyword.value, ast.Constant) \
+                        and isinstance(keyword.value.value, str):
+                    try:
+                        compile_setup(keyword.value.value)
+                    except SyntaxError as e:
+                        errors.append(f"custom_setup on line {node.lineno}: {e.msg} (snippet line {e.lineno})")
+    return errors
+
+
+def _report(path: str, errors: List[str]):
+    for error in errors:
+        print(f"Warning: Error in tutorial file {os.path.basename(path)}: {error}.")
+
+
+def scan_metadata(path: str) -> Optional[Tuple[str, Dict[str, Dict[str, Any]]]]:
+    """Reads (category, {id: info without steps}) from a tutorial file without running it.
+
+    Returns None if TUTORIAL_CATEGORY or TUTORIALS is missing or not a literal.
+    """
+    with open(path, encoding="utf-8") as f:
+        return scan_source(f.read(), path)
+
+
+def scan_source(source: str, path: str = "<tutorial>") -> Optional[Tuple[str, Dict[str, Dict[str, Any]]]]:
+    """`scan_metadata` for source text that has already been read."""
+    # Steps make up most of a tutorial file, so parse a copy with them cut out
+    # first, and only parse the full source if the cut copy does not check out.
+    try:
+        scanned = _metadata(ast.parse(STEPS_BLOCK.sub(_skip_steps, source)))
+    except SyntaxError:
+        scanned = None
+    return scanned if scanned is not None else _metadata(ast.parse(source, filename=path))
+
+
+def _skip_steps(match) -> str:
+    return match.group("indent") + match.group("key") + "None"
+
+
+def _metadata(tree: ast.Module) -> Optional[Tuple[str, Dict[str, Dict[str, Any]]]]:
+    category, tutorials = None, None
+    for statement in tree.body:
+        if not isinstance(statement, ast.Assign) or len(statement.targets) != 1:
+            continue
+        target = statement.targets[0]
+        if not isinstance(target, ast.Name):
+            continue
+        if target.id == 'TUTORIAL_CATEGORY':
+            category = statement.value
+        elif target.id == 'TUTORIALS':
+            tutorials = statement.value
+    if category is None or not isinstance(tutorials, ast.Dict):
+        return None
+    try:
+        category = ast.literal_eval(category)
+        metadata = {}
+        for key, value in zip(tutorials.keys, tutorials.values):
+            if key is None or not isinstance(value, ast.Dict):
+                return None
+            info = {}
+            for field, field_value in zip(value.keys, value.values):
+                field = ast.literal_eval(field)
+                if field not in DEFERRED_KEYS:
+                    info[field] = ast.literal_eval(field_value)
+            metadata[ast.literal_eval(key)] = info
+    except (ValueError, TypeError, SyntaxError):
+        return None
+    return category, metadata
+
+
+def tutorial_files(tutorial_dir: str = TUTORIAL_DIR) -> List[str]:
+    """Absolute paths of the tutorial modules in a directory, in filename order."""
+    return [
+        os.path.abspath(os.path.join(tutorial_dir, filename))
+        for filename in sorted(os.listdir(tutorial_dir))
+        if filename.endswith(".py") and not filename.startswith("__")
+    ]
+
+
+def parallel_map(function, items: List[Any], workers: Optional[int] = None, min_items: int = 2) -> List[Any]:
+    """`[function(item) for item in items]`, spread over worker processes.
+
+    By default one worker per CPU is used once there are `min_items` items;
+    with fewer, one worker, or no way to start processes, it runs in this
+    process. Results are in the order of `items` either way.
+    """
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(items) >= min_items else 1
+    workers = min(workers, len(items))
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(function, items, chunksize=max(1, len(items) // (workers * 4))))
+        except (OSError, RuntimeError):
+            pass  # Worker processes are unavailable here
+    return [function(item) for item in items]
+
+
+def load_catalog(tutorial_dir: str = TUTORIAL_DIR, cache_dir: Optional[str] = None,
+                 use_cache: bool = True, workers: Optional[int] = None) -> Catalog:
+    """Indexes every tutorial file in the directory, deferring the modules that allow it.
+
+    Metadata is taken from the cache in `cache_dir` (by default `default_cache_dir()`)
+    for files that have not changed; pass `use_cache=False` to read every file.
+    When many files need scanning they are scanned in `workers` processes.
+    """
+    cache = CatalogCache(cache_dir or default_cache_dir(), tutorial_dir) if use_cache else None
+    catalog: Catalog = {}
+    paths = tutorial_files(tutorial_dir)
+    for path, (digest, scanned) in zip(paths, _scan_all(paths, cache, workers)):
+        if scanned is not None:
+            category, metadata = scanned
+            source = TutorialModule(path, digest, cache)
+            tutorials = catalog.setdefault(category, {})
+            for tutorial_id, info in metadata.items():
+                tutorials[tutorial_id] = source.entries[tutorial_id] = TutorialEntry(info, source)
+            continue
+        _load_eagerly(catalog, path, os.path.basename(path), _code(path, digest, cache))
+    if cache is not None:
+        cache.save()
+    return catalog
+
+
+def _scan_all(paths: List[str], cache: Optional[CatalogCache], workers: Optional[int]) -> List[tuple]:
+    """(content hash, metadata) for each path: from the cache where current, otherwise scanned.
+
+    The hash is None without a cache, and the metadata None for files that
+    have to be loaded eagerly.
+    """
+    results: List[tuple] = [(None, None)] * len(paths)
+    pending = []
+    for i, path in enumerate(paths):
+        try:
+            stat = os.stat(path) if cache is not None else None
+            entry = cache.lookup(path, stat) if cache is not None else None
+            if entry is None:
+                with open(path, "rb") as f:
+                    data = f.read()
+                digest = source_hash(data) if cache is not None else None
+                entry = cache.match(path, stat, digest) if cache is not None else None
+        except OSError:
+            continue  # The eager load reports the error
+        if entry is not None:
+            results[i] = entry[2], entry[3]
+        else:
+            pending.append((i, path, stat, digest, data))
+    scans = parallel_map(_scan_source, [(data, path) for _, path, _, _, data in pending], workers, PARALLEL_SCAN_MIN)
+    for (i, path, stat, digest, _), scanned in zip(pending, scans):
+        if cache is not None:
+            cache.store(path, stat, digest, scanned)
+        results[i] = digest, scanned
+    return results
+
+
+def _scan_source(item: Tuple[bytes, str]):
+    data, path = item
+    try:
+        return scan_source(data.decode("utf-8"), path)
+    except (SyntaxError, UnicodeDecodeError):
+        return None
+
+
+def _load_eagerly(catalog: Catalog, path: str, filename: str, code=None):
+    module = _exec_module(path, code)
+    _report(path, compile_snippets(module, path))
+    if hasattr(module, 'TUTORIAL_CATEGORY') and hasattr(module, 'TUTORIALS'):
+        try:
+            category = getattr(module, 'TUTORIAL_CATEGORY')
+            tutorials_data = getattr(module, 'TUTORIALS')
+
+            if category not in catalog:
+                catalog[category] = {}
+
+            for tutorial_id, tutorial_info in tutorials_data.items():
+                # Copy all existing info and then add the module
+                tutorial_entry = TutorialEntry(tutorial_info)
+                tutorial_entry["module"] = module
+                _compile_entry(tutorial_id, tutorial_entry)
+                catalog[category][tutorial_id] = tutorial_entry
+        except (AttributeError, KeyError, TypeError) as e:
+            print(f"Warning: Error loading tutorial from {filename}: {e}. Skipping this tutorial.")
+    else:
+        print(f"Warning: Tutorial file {filename} is missing TUTORIAL_CATEGORY or TUTORIALS variable.")
@@ -1,11 +1,30 @@
 # src/tutorial_manager.py
+import fnmatch
 import json
-import random
 import re
-import os
-import importlib.util
+import sys
+import time
 from enum import Enum
-from typing import Dict, List, Optional, Any
+from itertools import islice
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Set, Tuple
+
+import numpy as np
+
+from src.cluster_table import RESOURCE_KEYS, Cluster, ClusterTable, ResourceVector, ResourceView
+from src.deadline_queue import DeadlineQueue
+from src.job_registry import JobRegistry, JobView
+from src.scheduler import FirstFitDecreasing, ScheduleResult, schedule
+from src.event_clock import EventClock
+from src.hcl import HCLError, TerraformConfig, parse_config
+from src.metrics import SimulatorMetrics
+from src.promql import evaluate as evaluate_query
+from src.terraform_graph import (DEFAULT_LATENCY, DEFAULT_PARALLELISM, dependency_graph, resource_address,
+                                 resource_latencies, schedule_apply)
+from src.terraform_plan import NodeSpec, compute_plan, desired_nodes
+from src.terraform_state import PROVIDER_NAME, TERRAFORM_VERSION, StateError, TerraformState
+from src.timeseries import Scraper, TimeSeriesStore, scrape_interval, tiers_for
+from src.tutorial_catalog import TutorialEntry, compile_setup, load_catalog
+from src.tutorial_steps import CompiledTutorial, Step, compile_tutorial
 
 # Simplified data structures for tutorials
 class JobStatus(Enum):
@@ -20,337 +39,670 @@ class JobType(Enum):
     ONNX = "onnx"
     ONNX_INFERENCE = "onnx_inference" # Added for clarity
 
+# The mock configs every tutorial starts from
+DEFAULT_TERRAFORM_CONFIG = """
+resource "cluster_node" "default" {
+  count           = 1
+  cpu             = 8
+  gpu             = 2
+  ram             = 64
+  pytorch_version = "2.0"
+}
+"""
+
+DEFAULT_PROMETHEUS_CONFIG = """
+global:
+  scrape_interval: 15s
+
+scrape_configs:
+  - job_name: 'prometheus'
+    static_configs:
+      - targets: ['localhost:9090']
+"""
+
+# Distinct setup_tutorial_state scenarios kept as snapshots for instant resets
+BAKED_STATE_LIMIT = 64
+
+# Completed/failed jobs kept while a workload generator or trace streams jobs in, unless --history says otherwise
+DEFAULT_STREAM_HISTORY = 10_000
+
+# Simulated run time, in ticks, for jobs created without an explicit duration
+DEFAULT_DURATIONS = {
+    JobType.PYTORCH_TRAINING: 20,
+    JobType.INFERENCE: 5,
+    JobType.ONNX: 5,
+    JobType.ONNX_INFERENCE: 3,
+}
+
+def _series_name(labels: Dict[str, str]) -> str:
+    """`metric{label="value",...}`, as Prometheus prints a series."""
+    pairs = ",".join(f'{name}="{value}"' for name, value in labels.items() if name != "__name__")
+    return f"{labels.get('__name__', '')}{{{pairs}}}"
+
 class Node:
+    __slots__ = ("id", "_running", "unmanaged", "_table", "_row")
+
     def __init__(self, name: str, cpu: int, gpu: int, ram: int, pytorch_version: str, unmanaged: bool = False):
         self.id = name
-        self.resources = {"cpu": cpu, "gpu": gpu, "ram": ram}
-        self.available_resources = {"cpu": cpu, "gpu": gpu, "ram": ram}
-        self.pytorch_version = pytorch_version
-        self.running_jobs: List[Job] = []
+        self._running: Dict[str, Job] = {}
         self.unmanaged = unmanaged
+        ClusterTable(1).append(self, (cpu, gpu, ram), (cpu, gpu, ram), pytorch_version)
+
+    @classmethod
+    def in_table(cls, table: ClusterTable, name: str, cpu: int, gpu: int, ram: int, pytorch_version: str, unmanaged: bool = False) -> 'Node':
+        """Creates a node directly in a shared table, skipping the private one."""
+        node = cls.__new__(cls)
+        node.id = name
+        node._running = {}
+        node.unmanaged = unmanaged
+        table.append(node, (cpu, gpu, ram), (cpu, gpu, ram), pytorch_version)
+        return node
+
+    @classmethod
+    def many_in_table(cls, table: ClusterTable, specs: Iterable[Tuple[str, 'NodeSpec']]) -> List['Node']:
+        """Creates managed nodes from (id, (cpu, gpu, ram, pytorch_version)) pairs in one bulk table write."""
+        nodes, capacities, versions = [], [], []
+        for name, (cpu, gpu, ram, version) in specs:
+            node = cls.__new__(cls)
+            node.id = name
+            node._running = {}
+            node.unmanaged = False
+            nodes.append(node)
+            capacities.append((cpu, gpu, ram))
+            versions.append(version)
+        table.extend(nodes, capacities, versions)
+        return nodes
+
+    @property
+    def resources(self) -> ResourceView:
+        return ResourceView(self, "capacity")
+
+    @resources.setter
+    def resources(self, values: Dict[str, int]):
+        for key, value in values.items():
+            self.resources[key] = value
+
+    @property
+    def available_resources(self) -> ResourceView:
+        return ResourceView(self, "available")
+
+    @available_resources.setter
+    def available_resources(self, values: Dict[str, int]):
+        for key, value in values.items():
+            self.available_resources[key] = value
+
+    @property
+    def pytorch_version(self) -> str:
+        return self._table.version_name(self._table.version[self._row])
+
+    @pytorch_version.setter
+    def pytorch_version(self, version: str):
+        self._table.version[self._row] = self._table.intern_version(version)
+        self._table.reindex(self._row)
+
+    @property
+    def running_jobs(self) -> JobView:
+        return JobView(self._running)
 
     def can_run_job(self, job: 'Job') -> bool:
         if job.pytorch_version and job.pytorch_version != self.pytorch_version:
             return False
-        return (self.available_resources["cpu"] >= job.requirements.get("cpu", 0) and
-                self.available_resources["gpu"] >= job.requirements.get("gpu", 0) and
-                self.available_resources["ram"] >= job.requirements.get("ram", 0))
+        cpu, gpu, ram = self._table.available[:, self._row].tolist()
+        need_cpu, need_gpu, need_ram = ResourceVector.from_mapping(job.requirements)
+        return cpu >= need_cpu and gpu >= need_gpu and ram >= need_ram
 
     def assign_job(self, job: 'Job'):
         if not self.can_run_job(job):
             raise ValueError("Insufficient resources or version mismatch to assign job.")
-        self.available_resources["cpu"] -= job.requirements.get("cpu", 0)
-        self.available_resources["gpu"] -= job.requirements.get("gpu", 0)
-        self.available_resources["ram"] -= job.requirements.get("ram", 0)
+        self._adjust_available(job, -1)
         job.status = JobStatus.RUNNING
         job.assigned_node = self.id
-        self.running_jobs.append(job)
+        self._running[job.id] = job
 
     def release_job(self, job: 'Job'):
-        if job in self.running_jobs:
-            self.available_resources["cpu"] += job.requirements.get("cpu", 0)
-            self.available_resources["gpu"] += job.requirements.get("gpu", 0)
-            self.available_resources["ram"] += job.requirements.get("ram", 0)
-            self.running_jobs.remove(job)
+        if self._running.pop(job.id, None) is not None:
+            self._adjust_available(job, 1)
+
+    def _adjust_available(self, job: 'Job', sign: int):
+        available, row = self._table.available, self._row
+        cpu, gpu, ram = ResourceVector.from_mapping(job.requirements)
+        available[0, row] += sign * cpu
+        available[1, row] += sign * gpu
+        available[2, row] += sign * ram
+        self._table.reindex(row)
 
 class Job:
+    __slots__ = (
+        "id", "_registry", "type", "requirements", "deadline", "pytorch_version", "_status",
+        "_assigned_node", "progress", "error_message", "submission_time", "completion_time", "duration",
+    )
     _job_id_counter = 0
 
-    def __init__(self, job_type: JobType, requirements: Dict[str, int], deadline: int, pytorch_version: Optional[str] = None):
+    def __init__(self, job_type: JobType, requirements: Dict[str, int], deadline: int, pytorch_version: Optional[str] = None, duration: Optional[int] = None):
         Job._job_id_counter += 1
         self.id = f"job-{Job._job_id_counter}"
+        self._registry: Optional[JobRegistry] = None
         self.type = job_type
-        self.requirements = requirements
+        self.requirements = ResourceVector.from_mapping(requirements)
         self.deadline = deadline
-        self.pytorch_version = pytorch_version
-        self.status = JobStatus.PENDING
-        self.assigned_node: Optional[str] = None
+        self.pytorch_version = sys.intern(pytorch_version) if pytorch_version else pytorch_version
+        self._status = JobStatus.PENDING
+        self._assigned_node: Optional[str] = None
         self.progress = 0
         self.error_message: Optional[str] = None
         self.submission_time: Optional[int] = None
         self.completion_time: Optional[int] = None
+        self.duration = duration if duration is not None else DEFAULT_DURATIONS.get(job_type, 10)
+
+    @property
+    def status(self) -> JobStatus:
+        return self._status
+
+    @status.setter
+    def status(self, value: JobStatus):
+        if self._registry is not None:
+            self._registry._status_changed(self, self._status, value)
+        self._status = value
+
+    @property
+    def assigned_node(self) -> Optional[str]:
+        return self._assigned_node
+
+    @assigned_node.setter
+    def assigned_node(self, value: Optional[str]):
+        if self._registry is not None:
+            self._registry._node_changed(self, self._assigned_node, value)
+        self._assigned_node = value
 
 class TutorialManager:
     def __init__(self):
-        self.cluster: Dict[str, Node] = {}
-        self.job_queue: List[Job] = []
-        self.completed_jobs: List[Job] = []
-        self.failed_jobs: List[Job] = []
+        self.cluster = Cluster()
+        self.jobs = JobRegistry(bucket_types={JobStatus.PENDING: DeadlineQueue})
         self.active_tutorial: Optional[Dict] = None
+        self.active_steps: Optional[CompiledTutorial] = None # The active tutorial's compiled steps
         self.active_tutorial_id: Optional[str] = None
         self.tutorial_step = 0
         self.completed_tutorials: List[str] = []
+        self._completed_ids: Set[str] = set() # completed_tutorials, for membership tests
         self.time = 0 # Simplified time for tutorials
-        self.terraform_config = """
-resource "cluster_node" "default" {
-  count           = 1
-  cpu             = 8
-  gpu             = 2
-  ram             = 64
-  pytorch_version = "2.0"
-}
-"""
-        self.prometheus_config = """
-global:
-  scrape_interval: 15s
-
-scrape_configs:
-  - job_name: 'prometheus'
-    static_configs:
-      - targets: ['localhost:9090']
-"""
+        self.clock = EventClock(self)
+        self.seed = 0 # Seed for generated workloads, so tutorial scenarios are reproducible
+        self.history_limit: Optional[int] = None # Completed/failed jobs to keep; None keeps all until a stream is attached
+        self.snapshots: Dict[str, 'Snapshot'] = {} # Named snapshots taken with the `snapshot` command
+        self._baked_states: Dict[tuple, 'Snapshot'] = {} # setup_tutorial_state results, keyed by their inputs
+        self.checkpoints = CheckpointLog() # State at the start of each step of the active tutorial
+        self.terraform_parallelism = DEFAULT_PARALLELISM # Simulated workers for `terraform apply`
+        self.terraform_latency = DEFAULT_LATENCY # Simulated seconds per node change, unless a resource sets provision_latency
+        self.tfstate: Optional[TerraformState] = None # The terraform.tfstate file, once `terraform init -state=` attached one
+        self.metrics = SimulatorMetrics(self) # Exported by `metrics serve`
+        self.terraform_config = DEFAULT_TERRAFORM_CONFIG
+        self.prometheus_config = DEFAULT_PROMETHEUS_CONFIG
+        self.tsdb = TimeSeriesStore(tiers_for(scrape_interval(self.prometheus_config))) # Samples for `query`
+        self.scraper = Scraper(self, self.tsdb) # Fills tsdb as the event clock advances
         self.tutorials: Dict[str, Dict[str, Any]] = {}
+        self.tutorial_index: Dict[str, Tuple[str, Dict[str, Any]]] = {} # tutorial id -> (category, entry)
         self._load_tutorials()
 
     def _load_tutorials(self):
-        self.tutorials = {}
-        tutorial_dir = "src/tutorials"
-        for filename in os.listdir(tutorial_dir):
-            if filename.endswith(".py") and not filename.startswith("__"):
-                module_name = filename[:-3]
-                file_path = os.path.join(tutorial_dir, filename)
-                spec = importlib.util.spec_from_file_location(module_name, file_path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-
-                if hasattr(module, 'TUTORIAL_CATEGORY') and hasattr(module, 'TUTORIALS'):
-                    try:
-                        category = getattr(module, 'TUTORIAL_CATEGORY')
-                        tutorials_data = getattr(module, 'TUTORIALS')
-
-                        if category not in self.tutorials:
-                            self.tutorials[category] = {}
-
-                        for tutorial_id, tutorial_info in tutorials_data.items():
-                            # Copy all existing info and then add the module
-                            tutorial_entry = tutorial_info.copy()
-                            tutorial_entry["module"] = module
-                            self.tutorials[category][tutorial_id] = tutorial_entry
-                    except (AttributeError, KeyError, TypeError) as e:
-                        print(f"Warning: Error loading tutorial from {filename}: {e}. Skipping this tutorial.")
-                else:
-                    print(f"Warning: Tutorial file {filename} is missing TUTORIAL_CATEGORY or TUTORIALS variable.")
+        # Only tutorial metadata is read here; steps load when a tutorial is first used.
+        self.tutorials = load_catalog()
+        self._index_tutorials()
+
+    def _index_tutorials(self):
+        index: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        for category, tutorials in self.tutorials.items():
+            for tutorial_id, entry in tutorials.items():
+                index.setdefault(tutorial_id, (category, entry)) # The first category wins, as in a scan
+        self.tutorial_index = index
+
+    def find_tutorial(self, tutorial_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """The (category, entry) of a tutorial, or None if there is no such tutorial."""
+        return self.tutorial_index.get(tutorial_id)
+
+    def get_tutorial(self, tutorial_id: str) -> Optional[Dict[str, Any]]:
+        """A tutorial's full entry, steps included, or None if there is no such tutorial."""
+        found = self.tutorial_index.get(tutorial_id)
+        if found is None:
+            return None
+        entry = found[1]
+        return entry.load() if isinstance(entry, TutorialEntry) else entry
+
+    @property
+    def job_queue(self) -> JobView:
+        return self.jobs.with_status(JobStatus.PENDING)
+
+    @property
+    def completed_jobs(self) -> JobView:
+        return self.jobs.with_status(JobStatus.COMPLETED)
+
+    @property
+    def failed_jobs(self) -> JobView:
+        return self.jobs.with_status(JobStatus.FAILED)
 
     def get_all_tutorials(self):
         return self.tutorials
 
+    @property
+    def terraform_config(self) -> str:
+        return self._terraform_config
+
+    @terraform_config.setter
+    def terraform_config(self, config: str):
+        self._terraform_config = config
+        self._terraform_ast: Optional[TerraformConfig] = None # Parsed on the next plan or apply
+        self._terraform_desired: Optional[Dict[str, Tuple[str, NodeSpec]]] = None
+
     def get_terraform_config(self) -> str:
         return self.terraform_config
 
     def set_terraform_config(self, config: str):
         self.terraform_config = config
 
+    def parsed_terraform_config(self) -> TerraformConfig:
+        """The parsed Terraform config, parsed at most once per distinct config text.
+
+        Raises HCLError if the config does not parse.
+        """
+        if self._terraform_ast is None:
+            self._terraform_ast = parse_config(self._terraform_config)
+        return self._terraform_ast
+
+    def desired_terraform_nodes(self) -> Dict[str, Tuple[str, NodeSpec]]:
+        """node id -> (resource address, spec) for the config, expanded once per config text."""
+        if self._terraform_desired is None:
+            self._terraform_desired = desired_nodes(self.parsed_terraform_config())
+        return self._terraform_desired
+
     def get_prometheus_config(self) -> str:
         return self.prometheus_config
 
     def set_prometheus_config(self, config: str):
         self.prometheus_config = config
 
+    def restart_prometheus(self) -> str:
+        """Applies the config's scrape_interval to the time-series store, which starts empty if it changed."""
+        interval = scrape_interval(self.prometheus_config)
+        if interval == self.tsdb.step:
+            return f"Prometheus restarted; scraping every {interval}s."
+        self.reset_time_series(interval)
+        return f"Prometheus restarted; scraping every {interval}s. Samples taken at the old interval were dropped."
+
+    def reset_time_series(self, interval: Optional[int] = None):
+        """Starts an empty time-series store, scraping from the current time every `interval` (the store's step by default)."""
+        if self.tsdb.keys or (interval or self.tsdb.step) != self.tsdb.step:
+            self.tsdb = TimeSeriesStore(tiers_for(interval or self.tsdb.step), self.tsdb.max_series)
+        self.scraper = Scraper(self, self.tsdb)
+
     def setup_tutorial_state(self, jobs: int = 0, nodes: int = 0, custom_setup: str = None, clear_terraform_config: bool = False):
-        """Sets up a clean state for a tutorial scenario."""
-        self.job_queue.clear()
-        self.completed_jobs.clear()
-        self.failed_jobs.clear()
+        """Sets up a clean state for a tutorial scenario.
+
+        Each distinct scenario is built once and snapshotted; asking for it again
+        with the same inputs restores the snapshot instead of rebuilding it.
+        """
+        key = (jobs, nodes, custom_setup, clear_terraform_config, self.time, self.seed,
+               self.terraform_config, self.prometheus_config, self.history_limit, self.clock.auto_schedule)
+        baked = self._baked_states.get(key)
+        if baked is not None:
+            self.restore(baked)
+            return
+        self._build_tutorial_state(jobs, nodes, custom_setup, clear_terraform_config)
+        if len(self._baked_states) >= BAKED_STATE_LIMIT:
+            del self._baked_states[next(iter(self._baked_states))]
+        self._baked_states[key] = self.snapshot()
+
+    def _build_tutorial_state(self, jobs: int, nodes: int, custom_setup: Optional[str], clear_terraform_config: bool):
+        self.tfstate = None # The rebuilt cluster no longer matches the state file
+        self.jobs.clear()
+        self.clock.clear()
         self.cluster.clear() # Clear existing nodes
 
         if clear_terraform_config:
-            self.terraform_config = """
-resource "cluster_node" "default" {
-  count           = 1
-  cpu             = 8
-  gpu             = 2
-  ram             = 64
-  pytorch_version = "2.0"
-}
-"""
+            self.terraform_config = DEFAULT_TERRAFORM_CONFIG
 
         for i in range(nodes):
-            node = Node(f"node-{i}", 8, 2, 64, "2.0")
+            node = Node.in_table(self.cluster.table, f"node-{i}", 8, 2, 64, "2.0")
             self.cluster[node.id] = node
 
-        for _ in range(jobs):
-            job_type = random.choice([JobType.PYTORCH_TRAINING, JobType.INFERENCE])
-            requirements = {"cpu": random.randint(1, 2), "gpu": random.randint(0, 1), "ram": random.randint(4, 8)}
-            new_job = Job(job_type, requirements, self.time + 50, "2.0" if job_type == JobType.PYTORCH_TRAINING else None)
-            self.job_queue.append(new_job)
+        for _, new_job in WorkloadGenerator(count=jobs, seed=self.seed, arrival=BATCH, start_time=self.time):
+            self.add_job(new_job)
         
         if custom_setup:
             # This is a security risk in a real application, but for a local CLI tutorial, it's acceptable.
-            # The custom_setup string comes from the trusted tutorials.py file.
-            exec(custom_setup, {'game': self, 'Node': Node, 'Job': Job, 'JobType': JobType, 'TERRAFORM_CONFIG': self.terraform_config, 'PROMETHEUS_CONFIG': self.prometheus_config, 're': re})
+            # The custom_setup string comes from the trusted tutorials.py file, and was compiled when it loaded.
+            namespace = {'game': self, 'Node': Node, 'Job': Job, 'JobType': JobType, 'TERRAFORM_CONFIG': self.terraform_config, 'PROMETHEUS_CONFIG': self.prometheus_config, 're': re}
+            exec(compile_setup(custom_setup), namespace)
+            # Snippets edit the configs through these globals; keep what they assigned.
+            if namespace['TERRAFORM_CONFIG'] is not self.terraform_config:
+                self.terraform_config = namespace['TERRAFORM_CONFIG']
+            if namespace['PROMETHEUS_CONFIG'] is not self.prometheus_config:
+                self.prometheus_config = namespace['PROMETHEUS_CONFIG']
 
 
+    def reset_configs(self):
+        """Puts back the default Terraform and Prometheus configs, so one tutorial's edits don't leak into the next."""
+        self.terraform_config = DEFAULT_TERRAFORM_CONFIG
+        self.prometheus_config = DEFAULT_PROMETHEUS_CONFIG
+
     def start_tutorial(self, tutorial_id: str, tutorials_data: Optional[Dict] = None) -> bool:
-        """Starts an interactive tutorial by searching through categories."""
-        tutorials_to_use = tutorials_data if tutorials_data is not None else self.tutorials
-        for category, tutorials in tutorials_to_use.items():
-            if tutorial_id in tutorials:
-                self.active_tutorial = tutorials[tutorial_id]
-                self.active_tutorial_id = tutorial_id
-                self.tutorial_step = 0
-                first_step = self.active_tutorial["steps"][0]
-                if "trigger" in first_step and callable(first_step["trigger"]):
-                    first_step["trigger"](self)
-                return True
-        return False
+        """Starts an interactive tutorial, from the loaded catalog or from `tutorials_data` if given."""
+        if tutorials_data is None:
+            found = self.tutorial_index.get(tutorial_id)
+            tutorial = found[1] if found is not None else None
+        else:
+            tutorial = next((tutorials[tutorial_id] for tutorials in tutorials_data.values() if tutorial_id in tutorials), None)
+        if tutorial is None:
+            return False
+        if isinstance(tutorial, TutorialEntry):
+            tutorial.load()
+        self.active_steps = tutorial.get("compiled") or compile_tutorial(tutorial_id, tutorial)
+        self.active_tutorial = tutorial
+        self.active_tutorial_id = tutorial_id
+        self.tutorial_step = 0
+        self.checkpoints.clear()
+        self.reset_configs()
+        start = time.perf_counter()
+        first_step = self.active_steps.steps[0]
+        if first_step.trigger is not None:
+            first_step.trigger(self)
+        self.checkpoints.record(self, 0)
+        self.metrics.step_transition_seconds.labels(tutorial_id).observe(time.perf_counter() - start)
+        return True
 
     def end_tutorial(self):
         """Ends the current tutorial and marks it as complete."""
         if self.active_tutorial:
             tutorial_id = self.active_tutorial_id
             
-            if tutorial_id and tutorial_id not in self.completed_tutorials:
+            if tutorial_id and tutorial_id not in self._completed_ids:
+                self._completed_ids.add(tutorial_id)
                 self.completed_tutorials.append(tutorial_id)
             
             self.active_tutorial = None
+            self.active_steps = None
             self.active_tutorial_id = None
             self.tutorial_step = 0
+            self.checkpoints.clear()
             # self.log_event(f"Tutorial '{tutorials_data[cat][tutorial_id]['name']}\' completed!") # No event log in simplified version
             # Reset to a default state
+            self.reset_configs()
             self.setup_tutorial_state(jobs=0, nodes=0) # Start with a clean slate after tutorial
 
+    @property
+    def current_step(self) -> Optional[Step]:
+        """The active tutorial's current compiled step, or None outside a tutorial."""
+        return self.active_steps.steps[self.tutorial_step] if self.active_steps is not None else None
+
     def get_tutorial_prompt(self) -> str:
         """Gets the instructional text for the current tutorial step."""
-        if not self.active_tutorial:
-            return ""
-        return self.active_tutorial["steps"][self.tutorial_step]["text"]
+        step = self.current_step
+        return step.text if step is not None else ""
 
     def check_tutorial_input(self, user_input: str) -> bool:
         """Checks if the user input matches the expectation for the current tutorial step."""
-        if not self.active_tutorial:
-            return False
-
-        step = self.active_tutorial["steps"][self.tutorial_step]
-        expected = step["expected_command"]
-        
-        if expected is None: # End of tutorial
-            return True
-
-        # For dynamic commands like \'submit\', just check the command itself
-        if step.get("is_dynamic"):
-            return user_input.strip().startswith(expected)
-        
-        return user_input.strip() == expected
+        step = self.current_step
+        return step is not None and step.matcher(user_input)
 
     def advance_tutorial(self):
-        """Moves to the next step in the tutorial."""
-        if not self.active_tutorial:
+        """Moves to the next step in the tutorial, or ends it after its last step."""
+        step = self.current_step
+        if step is None:
             return
-
-        self.tutorial_step += 1
-        if self.tutorial_step >= len(self.active_tutorial["steps"]):
+        if step.next is None:
             self.end_tutorial()
-        else:
-            # Trigger action for the new step
-            next_step = self.active_tutorial["steps"][self.tutorial_step]
-            if "trigger" in next_step and callable(next_step["trigger"]):
-                next_step["trigger"](self)
+            return
+        start = time.perf_counter()
+        self.tutorial_step = step.next
+        # Trigger action for the new step
+        trigger = self.active_steps.steps[step.next].trigger
+        if trigger is not None:
+            trigger(self)
+        self.checkpoints.record(self, self.tutorial_step)
+        self.metrics.step_transition_seconds.labels(self.active_tutorial_id).observe(time.perf_counter() - start)
+
+    def undo(self) -> str:
+        """Goes back to the start of the previous tutorial step, as it was before it was answered."""
+        if not self.active_tutorial:
+            return "No tutorial is active."
+        if self.tutorial_step == 0:
+            return "Already at the first step."
+        return self.rewind(self.tutorial_step - 1)
+
+    def rewind(self, step: int) -> str:
+        """Restores the state from the start of an earlier (or the current) tutorial step."""
+        if not self.active_tutorial:
+            return "No tutorial is active."
+        checkpoint = self.checkpoints.get(step) if 0 <= step <= self.tutorial_step else None
+        if checkpoint is None:
+            return f"No checkpoint for step {step + 1}. You can rewind to steps 1-{self.tutorial_step + 1}."
+        self.checkpoints.restore(self, checkpoint)
+        self.tutorial_step = step
+        return f"Rewound to step {step + 1} of {len(self.active_steps)}."
 
     # --- Mocked Game-like functions for tutorials ---
     def get_job(self, job_id: str) -> Optional[Job]:
-        """Finds a job by its ID across all lists."""
-        for job_list in [self.job_queue, self.completed_jobs, self.failed_jobs]:
-            for job in job_list:
-                if job.id == job_id:
-                    return job
-        for node in self.cluster.values():
-            for job in node.running_jobs:
-                if job.id == job_id:
-                    return job
-        return None
-
-    def submit_job(self, job_id: str, node_id: str) -> str:
-        """Submits a job to a specific node."""
-        job = self.get_job(job_id)
-        node = self.cluster.get(node_id)
+        """Finds a job by its ID, whatever its status."""
+        return self.jobs.get(job_id)
 
+    def submit_job(self, job_id: str, node_id: Optional[str] = None) -> str:
+        """Submits a job to a specific node, or to the best-fitting node if none is given."""
+        job = self.get_job(job_id)
         if not job:
             return "Job not found."
-        if not node:
-            return "Node not found."
         if job.status != JobStatus.PENDING:
             return "Job is not pending."
+        if node_id is None:
+            node = self.best_fit_node(job)
+            if not node:
+                return f"No node can currently run job '{job_id}'."
+        else:
+            node = self.cluster.get(node_id)
+
+        if not node:
+            return "Node not found."
 
         if node.can_run_job(job):
             try:
-                node.assign_job(job)
-                self.job_queue.remove(job)
-                job.submission_time = self.time
+                self.start_job(job, node)
                 return f"Job '{job_id}' submitted successfully."
             except ValueError as e:
                 return str(e)
         else:
             if job.pytorch_version and job.pytorch_version != node.pytorch_version:
-                job.status = JobStatus.FAILED
-                job.error_message = f"PyTorch version mismatch: Job needs {job.pytorch_version}, node has {node.pytorch_version}"
-                self.failed_jobs.append(job)
-                if job in self.job_queue: self.job_queue.remove(job)
+                self.fail_job(job, None, f"PyTorch version mismatch: Job needs {job.pytorch_version}, node has {node.pytorch_version}")
                 return f"Failed to submit job '{job_id}': PyTorch version mismatch."
             else:
-                job.status = JobStatus.FAILED
-                job.error_message = "Insufficient resources"
-                self.failed_jobs.append(job)
-                if job in self.job_queue: self.job_queue.remove(job)
+                self.fail_job(job, None, "Insufficient resources")
                 return f"Failed to submit job '{job_id}': Resource mismatch."
 
+    def add_job(self, job: Job) -> Job:
+        """Registers a pending job and schedules its deadline on the event clock."""
+        self.jobs.add(job)
+        self.clock.schedule_deadline(job)
+        return job
+
+    def start_job(self, job: Job, node: Node):
+        """Runs a job on a node from the current time and schedules its completion."""
+        node.assign_job(job)
+        job.submission_time = self.time
+        self.clock.schedule_completion(job)
+
+    def update_progress(self, job: Job) -> int:
+        """Brings a running job's progress up to the current simulated time."""
+        if job.status == JobStatus.RUNNING and job.submission_time is not None:
+            elapsed = self.time - job.submission_time
+            job.progress = min(100, elapsed * 100 // job.duration) if job.duration > 0 else 100
+        return job.progress
+
+    def generate_workload(self, count: Optional[int] = None, rate: float = 1.0, seed: Optional[int] = None,
+                          arrival: str = "poisson", auto_schedule: Optional[str] = None) -> 'WorkloadGenerator':
+        """Attaches a streaming synthetic workload to the event clock, starting now.
+
+        Finished jobs are trimmed to `DEFAULT_STREAM_HISTORY` unless `history_limit` is already set.
+        """
+        if self.history_limit is None:
+            self.history_limit = DEFAULT_STREAM_HISTORY
+        workload = WorkloadGenerator(count=count, rate=rate, seed=self.seed if seed is None else seed,
+                                     arrival=arrival, start_time=self.time)
+        self.clock.auto_schedule = auto_schedule
+        self.clock.attach(workload)
+        return workload
+
+    def replay_trace(self, path: str, trace_format: Optional[str] = None, auto_schedule: Optional[str] = "first-fit-decreasing",
+                     until: Optional[int] = None) -> 'ReplayReport':
+        """Streams a CSV/JSONL job trace through the event clock and reports throughput.
+
+        Without `until` the replay runs until the trace and every event it caused
+        are exhausted. Finished jobs are trimmed to `DEFAULT_STREAM_HISTORY` unless
+        `history_limit` is already set.
+        """
+        if self.history_limit is None:
+            self.history_limit = DEFAULT_STREAM_HISTORY
+        reader = TraceReader(path, trace_format)
+        self.clock.auto_schedule = auto_schedule
+        self.clock.attach(reader)
+        start = time.perf_counter()
+        events = self.clock.run() if until is None else self.clock.advance_to(until)
+        return ReplayReport(reader, events, time.perf_counter() - start, self.time)
+
+    def snapshot(self) -> 'Snapshot':
+        """Captures the cluster, jobs, clock events, time and configs as a binary snapshot."""
+        return take_snapshot(self)
+
+    def restore(self, snapshot: 'Snapshot'):
+        """Replaces the current simulation state with a snapshot's."""
+        restore_snapshot(self, snapshot)
+
+    def trim_history(self):
+        """Drops the oldest completed and failed jobs beyond `history_limit`."""
+        if self.history_limit is not None:
+            self.jobs.trim(JobStatus.COMPLETED, self.history_limit)
+            self.jobs.trim(JobStatus.FAILED, self.history_limit)
+
+    def tick(self, ticks: int = 1) -> int:
+        """Advances simulated time by a number of ticks. Returns how many events fired."""
+        return self.clock.advance(ticks)
+
+    def run_until(self, time: int) -> int:
+        """Advances simulated time to an absolute timestamp. Returns how many events fired."""
+        return self.clock.advance_to(time)
+
+    def schedule_all(self, policy: str = FirstFitDecreasing.name) -> ScheduleResult:
+        """Places the whole pending queue onto the cluster in one pass using a bin-packing policy."""
+        return schedule(self, policy)
+
     def complete_job(self, job: Job, node: Node):
         """Marks a job as complete and awards points."""
         node.release_job(job)
         job.status = JobStatus.COMPLETED
         job.completion_time = self.time
-        self.completed_jobs.append(job)
+        job.progress = 100
 
     def fail_job(self, job: Job, node: Optional[Node], reason: str):
         """Marks a job as failed and logs the reason."""
         if node and job in node.running_jobs:
             node.release_job(job)
-        if job in self.job_queue:
-            self.job_queue.remove(job)
 
         job.status = JobStatus.FAILED
         job.error_message = reason
-        self.failed_jobs.append(job)
 
-    def terraform_plan(self) -> str:
-        """Generates a plan for provisioning resources from the mock config."""
-        match = re.search(r'count = (\d+)', self.terraform_config)
-        count = int(match.group(1)) if match else 0
-        self.terraform_plan_preview = f"Terraform will create {count} new nodes."
-        return self.terraform_plan_preview
-
-    def terraform_apply(self, target: Optional[str] = None) -> str:
-        """Applies the terraform plan to provision new nodes."""
-        match_count = re.search(r'count = (\d+)', self.terraform_config)
-        match_cpu = re.search(r'cpu = (\d+)', self.terraform_config)
-        match_gpu = re.search(r'gpu = (\d+)', self.terraform_config)
-        match_ram = re.search(r'ram = (\d+)', self.terraform_config)
-        match_version = re.search(r'pytorch_version = "([\d.]+)"', self.terraform_config)
+    def attach_terraform_state(self, path: str) -> str:
+        """Backs Terraform with the state file at `path`, creating it if needed.
+
+        The state's nodes that are not in the cluster are created, those that
+        are become managed, and from then on apply, destroy and import are
+        recorded in the file.
+        """
+        try:
+            state = TerraformState.open(path)
+        except (OSError, StateError) as e:
+            return f"Error loading Terraform state: {e}"
+        missing = []
+        for node_id, spec in state.resources.items():
+            node = self.cluster.get(node_id)
+            if node is None:
+                missing.append((node_id, spec))
+            else:
+                node.unmanaged = False
+        for node in Node.many_in_table(self.cluster.table, missing):
+            self.cluster[node.id] = node
+        self.tfstate = state
+        return f"Terraform state '{path}' loaded: {len(state.resources)} resources, serial {state.serial}."
 
-        if not all([match_count, match_cpu, match_gpu, match_ram, match_version]):
-            return "Error parsing Terraform config."
+    def _record_terraform_state(self, puts=(), deletes=()) -> str:
+        """Journals changes to the attached state before they are made; an error message if that failed."""
+        if self.tfstate is None:
+            return ""
+        try:
+            self.tfstate.commit(puts, deletes)
+        except OSError as e:
+            return f"Error saving Terraform state, nothing was changed: {e}"
+        return ""
+
+    def terraform_plan(self, target: Optional[str] = None) -> str:
+        """Diffs the mock config against the managed nodes and describes the changes."""
+        try:
+            plan = compute_plan(self.desired_terraform_nodes(), self.cluster, target)
+        except HCLError as e:
+            return f"Error parsing Terraform config: {e}"
+        self.terraform_plan_preview = plan.describe()
+        return self.terraform_plan_preview
 
-        if target:
-            node = self.cluster.get(target)
-            if not node:
-                return f"Target node '{target}' not found."
-            node.resources["cpu"] = int(match_cpu.group(1))
-            node.resources["gpu"] = int(match_gpu.group(1))
-            node.resources["ram"] = int(match_ram.group(1))
-            node.available_resources = node.resources.copy() # Reset available resources
-            return f"Node '{target}' has been updated."
-
-        count = int(match_count.group(1))
-        for i in range(count):
-            node_name = f"node-{len(self.cluster) + i}"
-            new_node = Node(
-                name=node_name,
-                cpu=int(match_cpu.group(1)),
-                gpu=int(match_gpu.group(1)),
-                ram=int(match_ram.group(1)),
-                pytorch_version=match_version.group(1)
-            )
-            self.cluster[new_node.id] = new_node
-        return f"{count} nodes have been provisioned."
+    def terraform_validate(self) -> str:
+        """Checks that the config parses and every cluster_node resource evaluates."""
+        try:
+            self.desired_terraform_nodes()
+        except HCLError as e:
+            return f"Error: {e}"
+        return "Terraform configuration is valid."
+
+    def terraform_apply(self, target: Optional[str] = None, parallelism: Optional[int] = None) -> str:
+        """Makes the changes a fresh plan calls for, and nothing else; an up-to-date cluster is left as is.
+
+        The changes are walked in dependency order by `parallelism` simulated
+        workers, and the report gives the simulated time that took.
+        """
+        try:
+            plan = compute_plan(self.desired_terraform_nodes(), self.cluster, target)
+            config = self.parsed_terraform_config()
+            graph = dependency_graph(config)
+            latencies = resource_latencies(config, self.terraform_latency)
+        except HCLError as e:
+            return f"Error parsing Terraform config: {e}"
+        if plan.errors:
+            return plan.describe()
+        if not plan.has_changes:
+            return "No changes. Your infrastructure matches the configuration."
+
+        error = self._record_terraform_state(
+            puts=[(node_id, spec) for node_id, _, spec in plan.update + plan.create], deletes=plan.destroy,
+        )
+        if error:
+            return error
+        actions = [(None, ("destroy", node_id, None), self.terraform_latency) for node_id in plan.destroy]
+        for kind, changes in (("update", plan.update), ("create", plan.create)):
+            for node_id, address, spec in changes:
+                resource = resource_address(address)
+                actions.append((resource, (kind, node_id, spec), latencies[resource]))
+        schedule = schedule_apply(actions, graph, parallelism or self.terraform_parallelism)
+
+        creates = []
+        for kind, node_id, spec in schedule.finished:
+            if kind == "destroy":
+                del self.cluster[node_id]
+            elif kind == "update":
+                cpu, gpu, ram, version = spec
+                node = self.cluster[node_id]
+                # Keep what running jobs use; the plan checked that it fits the new capacity.
+                used = {key: node.resources[key] - node.available_resources[key] for key in RESOURCE_KEYS}
+                node.resources = {"cpu": cpu, "gpu": gpu, "ram": ram}
+                node.available_resources = {key: node.resources[key] - used[key] for key in RESOURCE_KEYS}
+                node.pytorch_version = version
+            else:
+                creates.append((node_id, spec))
+        for node in Node.many_in_table(self.cluster.table, creates):
+            self.cluster[node.id] = node
+        return (f"Apply complete! Resources: {len(plan.create)} added, {len(plan.update)} changed, {len(plan.destroy)} destroyed.\n"
+                + schedule.summary())
 
     def terraform_destroy(self, node_id: str) -> str:
         """Removes a node from the cluster."""
@@ -361,23 +713,55 @@ resource "cluster_node" "default" {
         if node.running_jobs:
             return f"Cannot destroy node '{node_id}': it has running jobs."
 
+        error = self._record_terraform_state(deletes=[node_id]) if not node.unmanaged else ""
+        if error:
+            return error
         del self.cluster[node_id]
         return f"Node '{node_id}' destroyed."
 
-    def terraform_show(self) -> str:
-        """Displays a simplified view of the Terraform state."""
-        output = "# Terraform State:\n"
+    def _managed_nodes(self) -> Iterator[Tuple[str, int, int, int, str]]:
+        """(node id, cpu, gpu, ram, pytorch_version) of each managed node, in cluster order."""
+        table = self.cluster.table
+        size = len(table)
+        cpus, gpus, rams = table.capacity[:, :size].tolist()
+        codes = table.version[:size].tolist()
+        version_name = table.version_name
         for node_id, node in self.cluster.items():
-            if node.unmanaged:
-                continue
-            output += f"""resource \"cluster_node\" \"{node_id}\" {{
-  cpu             = {node.resources["cpu"]}
-  gpu             = {node.resources["gpu"]}
-  ram             = {node.resources["ram"]}
-  pytorch_version = \"{node.pytorch_version}\" 
-}}
-"""
-        return output
+            if not node.unmanaged:
+                row = node._row
+                yield node_id, cpus[row], gpus[row], rams[row], version_name(codes[row])
+
+    def terraform_show(self, json_output: bool = False, limit: Optional[int] = None, offset: int = 0) -> Iterator[str]:
+        """Yields the Terraform state a resource at a time, as HCL blocks or as `terraform show -json` lines.
+
+        `offset` and `limit` page through the managed nodes; the JSON lines always
+        form one complete document.
+        """
+        nodes = islice(self._managed_nodes(), offset, None if limit is None else offset + limit)
+        if not json_output:
+            yield "# Terraform State:"
+            for node_id, cpu, gpu, ram, version in nodes:
+                yield (f'resource "cluster_node" "{node_id}" {{\n'
+                       f'  cpu             = {cpu}\n'
+                       f'  gpu             = {gpu}\n'
+                       f'  ram             = {ram}\n'
+                       f'  pytorch_version = "{version}"\n'
+                       f'}}')
+            return
+        dumps = json.dumps
+        yield f'{{"format_version": "1.0", "terraform_version": {dumps(TERRAFORM_VERSION)}, "values": {{"root_module": {{"resources": ['
+        provider = dumps(PROVIDER_NAME)
+        versions: Dict[str, str] = {}
+        separator = ""
+        for node_id, cpu, gpu, ram, version in nodes:
+            # Only the strings need encoding; the numbers are formatted as they are.
+            name = dumps(node_id)
+            quoted = versions.get(version) or versions.setdefault(version, dumps(version))
+            yield (f'{separator}{{"address": {dumps("cluster_node." + node_id)}, "mode": "managed", "type": "cluster_node", '
+                   f'"name": {name}, "provider_name": {provider}, "schema_version": 0, "values": '
+                   f'{{"id": {name}, "cpu": {cpu}, "gpu": {gpu}, "ram": {ram}, "pytorch_version": {quoted}}}}}')
+            separator = ","
+        yield "]}}}"
 
     def terraform_import(self, node_id: str) -> str:
         """Imports an unmanaged node into the Terraform state."""
@@ -387,16 +771,43 @@ resource "cluster_node" "default" {
         if not node.unmanaged:
             return f"Node '{node_id}' is already managed by Terraform."
         
+        resources = node.resources
+        error = self._record_terraform_state(puts=[(node_id, (resources["cpu"], resources["gpu"], resources["ram"], node.pytorch_version))])
+        if error:
+            return error
         node.unmanaged = False
         return f"Successfully imported '{node_id}' into Terraform state."
 
-    def terraform_state_list(self) -> str:
-        """Lists all resources in the Terraform state."""
-        output = ""
-        for node_id, node in self.cluster.items():
-            if not node.unmanaged:
-                output += f"{node_id}\n"
-        return output
+    def terraform_state_list(self, pattern: Optional[str] = None, limit: Optional[int] = None, offset: int = 0) -> Iterator[str]:
+        """Yields the id of each managed node, only those matching the glob `pattern` if one is given."""
+        ids = (node_id for node_id, node in self.cluster.items() if not node.unmanaged)
+        if pattern is not None:
+            ids = filter(re.compile(fnmatch.translate(pattern)).match, ids)
+        return islice(ids, offset, None if limit is None else offset + limit)
+
+    def query_metrics(self, expression: str, at: Optional[int] = None, duration: int = 0, step: Optional[int] = None) -> Iterator[str]:
+        """Evaluates a PromQL query against the time-series store and yields its result a line at a time.
+
+        An instant query gives one `<series> <value>` line per series; with a
+        `duration` each series is followed by one `<value> @<time>` line per step.
+        Raises PromQLError before yielding anything if the query is invalid.
+        """
+        steps, result = evaluate_query(self.tsdb, expression, self.time if at is None else at, duration, step)
+
+        def lines() -> Iterator[str]:
+            if not result.labels:
+                yield "No series matched."
+                return
+            for labels, values in zip(result.labels, result.values.tolist()):
+                name = _series_name(labels)
+                if not duration:
+                    yield f"{name} {values[0]:.6g}"
+                    continue
+                yield name
+                for when, value in zip(steps.tolist(), values):
+                    if value == value: # Not NaN
+                        yield f"  {value:.6g} @{when}"
+        return lines()
 
     def convert_to_onnx(self, job_id: str) -> str:
         """Converts a completed PyTorch job to an ONNX job for optimization."""
@@ -409,20 +820,45 @@ resource "cluster_node" "default" {
             requirements={k: v // 2 for k, v in job.requirements.items()},  # Reduced requirements
             deadline=self.time + 30,
         )
-        self.job_queue.append(onnx_job)
+        self.add_job(onnx_job)
         return f"Created new ONNX job '{onnx_job.id}' with reduced resource needs."
 
     # Helper functions for commands that need to inspect state
-    def ls_jobs(self) -> List[Job]:
-        return self.job_queue
+    def ls_jobs(self, top: Optional[int] = None) -> Iterable[Job]:
+        """Pending jobs in deadline order, optionally only the `top` most urgent."""
+        if top is None:
+            return self.job_queue
+        return list(islice(self.job_queue, top))
+
+    def find_nodes_for_job(self, job: Job) -> List[Node]:
+        """Every node that can run the job right now, found with one vectorized query."""
+        table = self.cluster.table
+        requirements = ResourceVector.from_mapping(job.requirements)
+        return [table.nodes[row] for row in table.fitting_rows(requirements, job.pytorch_version)]
+
+    def best_fit_node(self, job: Job) -> Optional[Node]:
+        """The node with the least free GPU, then RAM, that can still run the job."""
+        table = self.cluster.table
+        row = table.best_fit_row(ResourceVector.from_mapping(job.requirements), table.version_code(job.pytorch_version))
+        return None if row is None else table.nodes[row]
+
+    def feasible_placements(self, jobs: Optional[Iterable[Job]] = None) -> Iterator[Tuple[Job, Node]]:
+        """Yields every (job, node) pair where the node can run the job, for the whole queue by default."""
+        jobs = list(self.job_queue if jobs is None else jobs)
+        table = self.cluster.table
+        requirements = np.array([ResourceVector.from_mapping(job.requirements) for job in jobs], dtype=np.int64).reshape(-1, len(RESOURCE_KEYS))
+        codes = np.array([table.version_code(job.pytorch_version) for job in jobs], dtype=np.int32)
+        for job_index, rows in table.feasible_pairs(requirements, codes):
+            for i, row in zip(job_index.tolist(), rows.tolist()):
+                yield jobs[i], table.nodes[row]
 
     def get_cluster_status(self) -> Dict[str, Node]:
         return self.cluster
 
-    def get_completed_jobs(self) -> List[Job]:
+    def get_completed_jobs(self) -> JobView:
         return self.completed_jobs
 
-    def get_failed_jobs(self) -> List[Job]:
+    def get_failed_jobs(self) -> JobView:
         return self.failed_jobs
 
     def get_active_tutorial_id(self) -> Optional[str]:
@@ -431,16 +867,23 @@ resource "cluster_node" "default" {
     def get_completed_tutorials(self) -> List[str]:
         return self.completed_tutorials
 
+    def is_tutorial_completed(self, tutorial_id: str) -> bool:
+        return tutorial_id in self._completed_ids
+
     def create_node_trigger(self, node_id, cpu, gpu, ram, pytorch_version, unmanaged=False):
         """A trigger to create a specific node for a tutorial step."""
-        new_node = Node(node_id, cpu, gpu, ram, pytorch_version, unmanaged=unmanaged)
+        new_node = Node.in_table(self.cluster.table, node_id, cpu, gpu, ram, pytorch_version, unmanaged=unmanaged)
         self.cluster[new_node.id] = new_node
 
     def create_job_trigger(self, job_type, requirements, deadline, pytorch_version=None):
         """A trigger to create a specific job for a tutorial step."""
         new_job = Job(job_type, requirements, deadline, pytorch_version)
-        self.job_queue.append(new_job)
+        self.add_job(new_job)
 
 # This import needs to be at the bottom to avoid circular dependencies
 # as TUTORIALS uses TutorialManager methods in its triggers.
+from src.workload import BATCH, WorkloadGenerator
+from src.trace_replay import ReplayReport, TraceReader
+from src.snapshot import Snapshot, restore_snapshot, take_snapshot
+from src.checkpoints import CheckpointLog
 
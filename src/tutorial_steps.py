@@ -0,0 +1,173 @@
+# src/tutorial_steps.py
+"""
+Tutorials compiled into step state machines.
+
+Tutorial steps are written as plain dicts. `compile_tutorial` turns them, once,
+into immutable `Step` objects holding everything the REPL needs on each
+prompt: a matcher for the expected input, the instruction and documentation
+text already rendered as rich markup, the trigger to run on entering the
+step, and the index of the step that follows (None when the tutorial ends
+after it).
+
+Expected commands match exactly, by prefix for `is_dynamic` steps, or as a
+token pattern when they contain placeholders: `submit <job_id> node-0`
+accepts any single word in place of `<job_id>`.
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PLACEHOLDER = re.compile(r"<[A-Za-z_][\w-]*>")
+
+
+class _Frozen:
+    """Slotted objects whose attributes are set once, in the constructor."""
+
+    __slots__ = ()
+
+    def _init(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+class Matcher(_Frozen):
+    """Decides whether an input line answers a step."""
+
+    __slots__ = ("expected",)
+
+    def __init__(self, expected: Optional[str] = None):
+        self._init(expected=expected)
+
+    def __call__(self, user_input: str) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.expected!r})"
+
+
+class AnyInput(Matcher):
+    """Any input answers the step."""
+
+    __slots__ = ()
+
+
+class ExactMatch(Matcher):
+    __slots__ = ()
+
+    def __call__(self, user_input: str) -> bool:
+        return user_input.strip() == self.expected
+
+
+class PrefixMatch(Matcher):
+    __slots__ = ()
+
+    def __call__(self, user_input: str) -> bool:
+        return user_input.strip().startswith(self.expected)
+
+
+class AnswerMatch(Matcher):
+    """An MCQ answer letter, compared case-insensitively."""
+
+    __slots__ = ()
+
+    def __call__(self, user_input: str) -> bool:
+        return user_input.strip().lower() == self.expected
+
+
+class TokenPattern(Matcher):
+    """Words of the expected command in order, `<placeholders>` matching any one word."""
+
+    __slots__ = ("pattern",)
+
+    def __init__(self, expected: str, allow_extra: bool = False):
+        tokens = []
+        for word in expected.split():
+            parts = PLACEHOLDER.split(word)
+            tokens.append(r"\S+".join(re.escape(part) for part in parts))
+        tail = r"(?:\s+.*)?" if allow_extra else ""
+        super().__init__(expected)
+        self._init(pattern=re.compile(r"\s+".join(tokens) + tail))
+
+    def __call__(self, user_input: str) -> bool:
+        return self.pattern.fullmatch(user_input.strip()) is not None
+
+
+def compile_matcher(expected: Optional[str], dynamic: bool = False) -> Matcher:
+    if expected is None:
+        return AnyInput()
+    if PLACEHOLDER.search(expected):
+        return TokenPattern(expected, allow_extra=dynamic)
+    return PrefixMatch(expected) if dynamic else ExactMatch(expected)
+
+
+class Step(_Frozen):
+    """One compiled tutorial step."""
+
+    __slots__ = ("index", "is_mcq", "text", "prompt", "doc", "answers", "matcher", "trigger",
+                 "final_message", "next")
+
+    def __init__(self, index: int, is_mcq: bool, text: str, prompt: str, doc: str, answers: Tuple[str, ...],
+                 matcher: Matcher, trigger: Optional[Callable], final_message: str, next: Optional[int]):
+        self._init(index=index, is_mcq=is_mcq, text=text, prompt=prompt, doc=doc, answers=answers,
+                   matcher=matcher, trigger=trigger, final_message=final_message, next=next)
+
+    @property
+    def is_last(self) -> bool:
+        return self.next is None
+
+
+class CompiledTutorial(_Frozen):
+    """A tutorial's steps, in order, and the input prompt shown while it is active."""
+
+    __slots__ = ("id", "name", "steps", "input_prompt")
+
+    def __init__(self, tutorial_id: str, name: str, steps: Tuple[Step, ...]):
+        # prompt_toolkit takes formatted text as a list of (style, text) pairs
+        input_prompt = [('bold cyan', f'\n({tutorial_id}) '), ('', 'Enter command: ')]
+        self._init(id=tutorial_id, name=name, steps=steps, input_prompt=input_prompt)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+
+def compile_step(index: int, step: Dict[str, Any], last: bool) -> Step:
+    text = step.get("text", "")
+    is_mcq = step.get("type") == "mcq"
+    if is_mcq:
+        prompt = f"\n[bold cyan]QUESTION:[/bold cyan] {text}"
+        matcher: Matcher = AnswerMatch(str(step.get("correct_answer", "")).strip().lower())
+    else:
+        prompt = f"\n[bold cyan]TUTORIAL:[/bold cyan] {text}"
+        # A step without an expected_command accepts any input; `tutorial validate` reports it.
+        matcher = compile_matcher(step.get("expected_command"), bool(step.get("is_dynamic")))
+    doc = ""
+    if step.get("doc_link"):
+        doc += f"[dim]For more info, see:[/dim] [link={step['doc_link']}]{step['doc_link']}[/link]"
+    if step.get("doc_quote"):
+        doc += " [dim](Type [bold]docs[/bold] to see a quote)[/dim]"
+    final = last or bool(step.get("final_step"))
+    trigger = step.get("trigger")
+    return Step(
+        index=index,
+        is_mcq=is_mcq,
+        text=text,
+        prompt=prompt,
+        doc=doc,
+        answers=tuple(step.get("answers") or ()),
+        matcher=matcher,
+        trigger=trigger if callable(trigger) else None,
+        final_message=f"[bold green]{step['final_message']}[/bold green]" if step.get("final_message") else "",
+        next=None if final else index + 1,
+    )
+
+
+def compile_tutorial(tutorial_id: str, info: Dict[str, Any]) -> CompiledTutorial:
+    """The step state machine for a tutorial's info dict."""
+    steps: List[Dict[str, Any]] = info["steps"]
+    return CompiledTutorial(
+        tutorial_id,
+        info.get("name", tutorial_id),
+        tuple(compile_step(i, step, i == len(steps) - 1) for i, step in enumerate(steps)),
+    )
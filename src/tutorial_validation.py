@@ -0,0 +1,124 @@
+# src/tutorial_validation.py
+"""
+Schema checks for tutorial files.
+
+`validate_catalog` loads every file of a tutorial directory from source, in a
+pool of worker processes, and checks each tutorial and step: steps need text,
+command steps an `expected_command`, MCQ steps their `answers` and
+`correct_answer`, and triggers must be callables. Problems that the catalog
+would only print as warnings, or that would only surface as a crash in the
+middle of a tutorial, are collected into one report per file, in file order.
+"""
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from src.tutorial_catalog import TUTORIAL_DIR, _exec_module, compile_snippets, parallel_map, tutorial_files
+
+OPTIONAL_TEXT = ("doc_link", "doc_quote", "final_message")
+
+
+class FileReport:
+    """The outcome of validating one tutorial file."""
+
+    __slots__ = ("filename", "tutorials", "steps", "problems", "seconds")
+
+    def __init__(self, filename: str, tutorials: int = 0, steps: int = 0,
+                 problems: Optional[List[str]] = None, seconds: float = 0.0):
+        self.filename = filename
+        self.tutorials = tutorials
+        self.steps = steps
+        self.problems = problems if problems is not None else []
+        self.seconds = seconds
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+def validate_step(step: Any) -> List[str]:
+    """Problems with one step dict; an empty list if it is well formed."""
+    if not isinstance(step, dict):
+        return [f"is a {type(step).__name__}, not a dict"]
+    problems = []
+    if not isinstance(step.get("text"), str) or not step["text"].strip():
+        problems.append("has no text")
+    if step.get("type") == "mcq":
+        answers = step.get("answers")
+        if not isinstance(answers, list) or not answers or not all(isinstance(a, str) for a in answers):
+            problems.append("is an mcq without a list of answers")
+        if not isinstance(step.get("correct_answer"), str):
+            problems.append("is an mcq without a correct_answer")
+    elif "expected_command" not in step:
+        problems.append("has no expected_command")
+    elif step["expected_command"] is not None and not isinstance(step["expected_command"], str):
+        problems.append("has an expected_command that is not a string")
+    if "trigger" in step and not callable(step["trigger"]):
+        problems.append("has a trigger that is not callable")
+    for key in OPTIONAL_TEXT:
+        if key in step and not isinstance(step[key], str):
+            problems.append(f"has a {key} that is not a string")
+    return problems
+
+
+def validate_tutorial(info: Any) -> List[str]:
+    """Problems with one tutorial's info dict and each of its steps."""
+    if not isinstance(info, dict):
+        return [f"is a {type(info).__name__}, not a dict"]
+    problems = [f"has no {key}" for key in ("name", "description") if not isinstance(info.get(key), str)]
+    if "skills_learned" in info and not isinstance(info["skills_learned"], list):
+        problems.append("has skills_learned that is not a list")
+    steps = info.get("steps")
+    if not isinstance(steps, list) or not steps:
+        problems.append("has no steps")
+        return problems
+    for number, step in enumerate(steps, 1):
+        problems.extend(f"step {number} {problem}" for problem in validate_step(step))
+    return problems
+
+
+def validate_file(path: str) -> FileReport:
+    """Compiles, runs and checks one tutorial file from source."""
+    report = FileReport(os.path.basename(path))
+    start = time.perf_counter()
+    try:
+        module = _exec_module(path, compile(_read(path), path, "exec"))
+    except Exception as e:
+        report.problems.append(f"does not load: {type(e).__name__}: {e}")
+        report.seconds = time.perf_counter() - start
+        return report
+    report.problems.extend(compile_snippets(module, path))
+    tutorials = getattr(module, 'TUTORIALS', None)
+    if not hasattr(module, 'TUTORIAL_CATEGORY'):
+        report.problems.append("is missing TUTORIAL_CATEGORY")
+    if not isinstance(tutorials, dict):
+        report.problems.append("is missing a TUTORIALS dict")
+        tutorials = {}
+    for tutorial_id, info in tutorials.items():
+        report.tutorials += 1
+        report.steps += len(info.get("steps") or ()) if isinstance(info, dict) else 0
+        report.problems.extend(f"tutorial '{tutorial_id}' {problem}" for problem in validate_tutorial(info))
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def validate_catalog(tutorial_dir: str = TUTORIAL_DIR, workers: Optional[int] = None) -> List[FileReport]:
+    """A report for every file in the directory, in filename order.
+
+    Files are validated in `workers` processes, by default one per CPU.
+    """
+    return parallel_map(validate_file, tutorial_files(tutorial_dir), workers)
+
+
+def summarize(reports: List[FileReport]) -> Dict[str, int]:
+    return {
+        "files": len(reports),
+        "tutorials": sum(report.tutorials for report in reports),
+        "steps": sum(report.steps for report in reports),
+        "problems": sum(len(report.problems) for report in reports),
+    }
@@ -16,7 +16,7 @@ TUTORIALS = {
             {
                 "text": "Sometimes you need to apply changes to only a specific resource. Your configuration has been updated to give all nodes more RAM, but you only want to upgrade `node-0`.\nType `terraform apply -target=node-0`.",
                 "expected_command": "terraform apply -target=node-0",
-                "trigger": lambda game: game.setup_tutorial_state(jobs=0, nodes=2, custom_setup='''\nglobal TERRAFORM_CONFIG\nTERRAFORM_CONFIG = re.sub(r'ram = \\d+', 'ram = 128', TERRAFORM_CONFIG)\n''')
+                "trigger": lambda game: game.setup_tutorial_state(jobs=0, nodes=2, custom_setup='''\nglobal TERRAFORM_CONFIG\nTERRAFORM_CONFIG = re.sub(r'ram\\s*=\\s*\\d+', 'ram = 128', TERRAFORM_CONFIG)\n''')
             },
             {
                 "text": "You've successfully targeted `node-0` for an update. The `-target` flag directs Terraform's operations to a specific subset of resources.\nType `status` to confirm only `node-0` has 128GB RAM.",
@@ -19,6 +19,7 @@ TUTORIALS = {
             },
             {
                 "text": "The core of Terraform is the configuration file. These files describe the components needed to run a single application or your entire datacenter. In this simulation, we have a simple configuration that defines a single node.\n\nTo apply the configuration and create the node, use the `terraform apply` command.",
+                "expected_command": "terraform apply",
                 "trigger": lambda game: game.setup_tutorial_state(jobs=0, nodes=0)
             },
             {
@@ -55,7 +56,7 @@ TUTORIALS = {
                 "expected_command": "terraform plan",
                 "trigger": lambda game: game.setup_tutorial_state(jobs=0, nodes=1, custom_setup='''
 global TERRAFORM_CONFIG
-TERRAFORM_CONFIG = re.sub(r'count = \\d+', 'count = 3', TERRAFORM_CONFIG)
+TERRAFORM_CONFIG = re.sub(r'count\\s*=\\s*\\d+', 'count = 3', TERRAFORM_CONFIG)
 ''')
             },
             {
@@ -181,7 +182,7 @@ TERRAFORM_CONFIG = re.sub(r'count = \\d+', 'count = 3', TERRAFORM_CONFIG)
             {
                 "text": "Consistent formatting improves readability and maintainability of your Terraform configurations. Terraform has a built-in command to automatically format your files.\n\nLet's introduce a formatting error and then fix it. Type `terraform apply` to create a node, then we'll mess up the config.",
                 "expected_command": "terraform apply",
-                "trigger": "lambda game: game.setup_tutorial_state(jobs=0, nodes=0, custom_setup='''\n    global TERRAFORM_CONFIG\n    TERRAFORM_CONFIG = re.sub(r'count = \\d+', 'count = 1', TERRAFORM_CONFIG)\n''')"
+                "trigger": "lambda game: game.setup_tutorial_state(jobs=0, nodes=0, custom_setup='''\n    global TERRAFORM_CONFIG\n    TERRAFORM_CONFIG = re.sub(r'count\\s*=\\s*\\d+', 'count = 1', TERRAFORM_CONFIG)\n''')"
             },
             {
                 "text": "Now, let's intentionally mess up the formatting of your Terraform configuration. Type `edit-terraform-config` and remove some indentation or add extra spaces.",
@@ -14,14 +14,14 @@ TUTORIALS = {
             {
                 "text": "Sometimes infrastructure is created manually and needs to be brought under Terraform's control. An admin has manually created `node-manual`.\nType `status` to see it.",
                 "expected_command": "status",
-                "trigger": lambda game: game.setup_tutorial_state(jobs=0, nodes=0, custom_setup='''\ngame.create_node_trigger(\"node-manual\", 8, 2, 64, \"2.0\", unmanaged=True)\n''')
+                "trigger": lambda game: game.setup_tutorial_state(jobs=0, nodes=0, custom_setup='''\ngame.create_node_trigger(\"node-manual\", 8, 2, 64, \"2.0\", unmanaged=True)\nglobal TERRAFORM_CONFIG\nTERRAFORM_CONFIG = \'resource \"cluster_node\" \"manual\" {\\n  name            = \"node-manual\"\\n  cpu             = 8\\n  gpu             = 2\\n  ram             = 64\\n  pytorch_version = \"2.0\"\\n}\\n\'\n''')
             },
             {
                 "text": "Notice `node-manual` is there. Now, let's see what Terraform thinks. Type `terraform plan`.",
                 "expected_command": "terraform plan"
             },
             {
-                "text": "Terraform wants to create a new node because it doesn't know about `node-manual`. Let's import it.\nType `terraform import node-manual`.",
+                "text": "The configuration declares `node-manual`, but Terraform doesn't manage the existing node, so it refuses to plan rather than create a duplicate. Let's import it.\nType `terraform import node-manual`.",
                 "expected_command": "terraform import node-manual",
                 "doc_link": "https://www.terraform.io/cli/commands/import",
                 "doc_quote": "The `terraform import` command is used to bring existing infrastructure under Terraform's management."
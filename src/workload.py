@@ -0,0 +1,104 @@
+# src/workload.py
+"""
+Seeded, streaming synthetic workloads.
+
+A `WorkloadGenerator` is an iterator of `(arrival_time, Job)` pairs. Jobs are
+built one at a time as they are pulled, so a workload of any length only ever
+holds the jobs that have already arrived in the simulator. The event clock
+pulls the next arrival only when the previous one fires.
+"""
+import math
+import random
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.tutorial_manager import Job, JobType
+
+POISSON = "poisson"
+BURSTY = "bursty"
+BATCH = "batch"  # every job arrives at start_time
+ARRIVAL_PROCESSES = (POISSON, BURSTY, BATCH)
+
+
+class JobProfile:
+    """Requirement and duration ranges (inclusive) for one job type."""
+
+    def __init__(self, weight: float, cpu: Tuple[int, int], gpu: Tuple[int, int], ram: Tuple[int, int],
+                 duration: Tuple[int, int], pytorch_version: Optional[str] = None):
+        self.weight = weight
+        self.cpu = cpu
+        self.gpu = gpu
+        self.ram = ram
+        self.duration = duration
+        self.pytorch_version = pytorch_version
+
+
+# Matches the jobs `setup_tutorial_state` has always created.
+DEFAULT_PROFILES: Dict[JobType, JobProfile] = {
+    JobType.PYTORCH_TRAINING: JobProfile(1.0, cpu=(1, 2), gpu=(0, 1), ram=(4, 8), duration=(10, 30), pytorch_version="2.0"),
+    JobType.INFERENCE: JobProfile(1.0, cpu=(1, 2), gpu=(0, 1), ram=(4, 8), duration=(2, 8)),
+}
+
+
+class WorkloadGenerator:
+    """Lazily yields `(arrival_time, Job)` pairs from a seeded arrival process.
+
+    `rate` is the mean number of arrivals per tick. The bursty process groups
+    arrivals into bursts of geometric size with mean `burst_size`, keeping the
+    same long-run rate. `count=None` produces an endless stream.
+    """
+
+    def __init__(self, count: Optional[int] = None, rate: float = 1.0, seed: int = 0, arrival: str = POISSON,
+                 burst_size: float = 10.0, deadline_slack: int = 50, start_time: int = 0,
+                 profiles: Optional[Dict[JobType, JobProfile]] = None):
+        if arrival not in ARRIVAL_PROCESSES:
+            raise ValueError(f"Unknown arrival process '{arrival}'. Choose from: {', '.join(ARRIVAL_PROCESSES)}")
+        if rate <= 0:
+            raise ValueError("Arrival rate must be positive.")
+        self.count = count
+        self.rate = rate
+        self.seed = seed
+        self.arrival = arrival
+        self.burst_size = max(burst_size, 1.0)
+        self.deadline_slack = deadline_slack
+        self.start_time = start_time
+        self.profiles = profiles or DEFAULT_PROFILES
+        self.generated = 0
+
+    def __iter__(self) -> Iterator[Tuple[int, Job]]:
+        rng = random.Random(self.seed)
+        self.generated = 0
+        types = list(self.profiles)
+        weights = [self.profiles[t].weight for t in types]
+        for arrival_time in self._arrival_times(rng):
+            if self.count is not None and self.generated >= self.count:
+                return
+            job_type = rng.choices(types, weights)[0]
+            yield arrival_time, self._make_job(rng, job_type, arrival_time)
+
+    def _arrival_times(self, rng: random.Random) -> Iterator[int]:
+        clock = float(self.start_time)
+        if self.arrival == BATCH:
+            while True:
+                yield self.start_time
+        if self.arrival == POISSON:
+            while True:
+                clock += rng.expovariate(self.rate)
+                yield math.floor(clock)
+        burst_rate = self.rate / self.burst_size
+        continue_probability = 1.0 - 1.0 / self.burst_size
+        while True:
+            clock += rng.expovariate(burst_rate)
+            yield math.floor(clock)
+            while rng.random() < continue_probability:
+                yield math.floor(clock)
+
+    def _make_job(self, rng: random.Random, job_type: JobType, arrival_time: int) -> Job:
+        profile = self.profiles[job_type]
+        requirements = {
+            "cpu": rng.randint(*profile.cpu),
+            "gpu": rng.randint(*profile.gpu),
+            "ram": rng.randint(*profile.ram),
+        }
+        self.generated += 1
+        return Job(job_type, requirements, arrival_time + self.deadline_slack, profile.pytorch_version,
+                   duration=rng.randint(*profile.duration))